@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+''' The memory of the cohorts and of a long daily run, under tracemalloc.
+
+    python benchmarks/cohort_memory.py --years 30 --dt 1
+
+reports the bytes per cohort object (indeterminate, and female with its
+fruit) and the current and peak memory traced over the run.
+'''
+
+import os
+import sys
+import gc
+import time
+import argparse
+import tracemalloc
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from palmsim import PalmField
+from palmsim.components.generative import Indeterminate, Female
+
+CLIMATE_FILEPATH = os.path.join(
+    ROOT_DIR, 'calibration_lhoat', 'climate',
+    'ClimateData_Manuelita_QUITASUENO_313_2008-01-01_2018-12-01.csv')
+
+
+def bytes_per_object(make, n=2000):
+    """ The memory allocated per object made by make() (bytes). """
+
+    objects = []
+
+    gc.collect()
+    tracemalloc.start()
+
+    before = tracemalloc.take_snapshot()
+    objects.extend(make() for _ in range(n))
+    after = tracemalloc.take_snapshot()
+
+    tracemalloc.stop()
+
+    return sum(x.size_diff for x in after.compare_to(before, 'filename')) / n
+
+
+def flowered_female():
+    """ A female cohort bearing fruit: all four bunch components. """
+    female = Female(None, potential_mass=10, t_maturity=1200)
+    female.set_fruit()
+    return female
+
+
+def run(years=30, dt=1, climate_filepath=CLIMATE_FILEPATH):
+    """ The cohorts left, the current and peak memory (bytes) and the run time (s). """
+
+    weather = pd.read_csv(climate_filepath, index_col='Date')
+    weather.index = pd.to_datetime(weather.index)
+
+    pf = PalmField(year_of_planting=2008, month_of_planting=1, day_of_planting=1, dt=dt,
+                   latitude=3.9, soil_depth=1, soil_texture_class='clay loam')
+
+    pf.weather.radiation_series = weather['solar (MJ/m2/day)']
+    pf.weather.rainfall_series = weather['precip (mm/day)']
+    pf.weather.temperature_series = weather['temperature (degC)']
+    pf.weather.humidity_series = weather['humidity (%)']
+
+    tracemalloc.start()
+    start = time.time()
+
+    for _ in range(years * 365 // dt):
+        pf.update()
+
+    elapsed = time.time() - start
+
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(pf.generative.cohorts), current, peak, elapsed
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--dt', type=int, default=1)
+    parser.add_argument('--climate', default=CLIMATE_FILEPATH)
+
+    args = parser.parse_args(argv)
+
+    print('bytes per indeterminate cohort: {:.0f}'.format(bytes_per_object(Indeterminate)))
+    print('bytes per flowered female cohort: {:.0f}'.format(bytes_per_object(flowered_female)))
+
+    (cohorts, current, peak, elapsed) = run(args.years, args.dt, args.climate)
+
+    print('{:} years at dt={:}: {:} cohorts, current {:.1f} MB, peak {:.1f} MB ({:.0f} s)'.format(
+        args.years, args.dt, cohorts, current / 1e6, peak / 1e6, elapsed))
+
+
+if __name__ == '__main__':
+    main()
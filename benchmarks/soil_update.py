@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+''' The time of a soil water balance time-step, against as many daily steps.
+
+    python benchmarks/soil_update.py --years 4 --dt 10 --n 1000
+
+runs a palm field for some years, then times n updates of its soil over
+dt days (see "Soil.update") and n times dt daily updates re-evaluating
+all the rates, from the same state.
+'''
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from palmsim import PalmField
+
+CLIMATE_FILEPATH = os.path.join(
+    ROOT_DIR, 'calibration_lhoat', 'climate',
+    'ClimateData_Manuelita_QUITASUENO_313_2008-01-01_2018-12-01.csv')
+
+
+def daily_steps(soil, dt):
+    """ dt daily updates of the available water, re-evaluating all the rates. """
+    for _ in range(dt):
+        soil.available_water += soil.available_water_change_rate
+
+
+def make_soils(years=4, dt=10, climate_filepath=CLIMATE_FILEPATH):
+    """ The soil of a palm field that ran for some years, twice. """
+
+    weather = pd.read_csv(climate_filepath, index_col='Date')
+    weather.index = pd.to_datetime(weather.index)
+
+    soils = []
+
+    for _ in range(2):
+
+        pf = PalmField(year_of_planting=2008, month_of_planting=1, day_of_planting=1, dt=dt,
+                       latitude=3.9, soil_depth=1, soil_texture_class='clay loam')
+
+        pf.weather.radiation_series = weather['solar (MJ/m2/day)']
+        pf.weather.rainfall_series = weather['precip (mm/day)']
+        pf.weather.temperature_series = weather['temperature (degC)']
+        pf.weather.humidity_series = weather['humidity (%)']
+
+        pf.run(duration=years * 365)
+
+        soils.append(pf.soil)
+
+    return soils
+
+
+def run(years=4, dt=10, n=1000, climate_filepath=CLIMATE_FILEPATH):
+    """ The time (s) of n soil updates and of n times dt daily steps. """
+
+    (soil, other) = make_soils(years, dt, climate_filepath)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        soil.update(dt=dt)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        daily_steps(other, dt)
+    elapsed_daily = time.perf_counter() - start
+
+    return elapsed, elapsed_daily
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=4)
+    parser.add_argument('--dt', type=int, default=10)
+    parser.add_argument('--n', type=int, default=1000)
+    parser.add_argument('--climate', default=CLIMATE_FILEPATH)
+
+    args = parser.parse_args(argv)
+
+    (elapsed, elapsed_daily) = run(args.years, args.dt, args.n, args.climate)
+
+    print('{:} updates at dt={:}: {:.3f} s, {:} daily steps: {:.3f} s ({:.1f}x)'.format(
+        args.n, args.dt, elapsed, args.n * args.dt, elapsed_daily, elapsed_daily / elapsed))
+
+
+if __name__ == '__main__':
+    main()
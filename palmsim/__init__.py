@@ -1,2 +1,7 @@
 from .palm import *
-from .params import *
\ No newline at end of file
+from .params import *
+from .cache import ResultCache
+from . import sensitivity
+from . import calibrate
+from . import surrogate
+from . import metrics
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+''' An on-disk cache of simulation results. '''
+
+import os
+import re
+import sys
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .params import PARAMETER_SET_CLASSES, _freeze
+
+MODULE_FILEPATH = sys.modules[__name__].__file__
+MODULE_DIR = os.path.dirname(MODULE_FILEPATH)
+
+# the weather time-series of a palm field, see "Weather"
+WEATHER_SERIES = [
+    'radiation', 'rainfall', 'humidity', 'temperature', 'windspeed'
+]
+
+_MODEL_VERSION = None
+
+
+def get_model_version():
+    ''' The version of the model: the release plus a digest of the source code.
+
+    The source code is part of the version, such that cached results of a
+    modified model are not re-used.
+    '''
+
+    global _MODEL_VERSION
+
+    if _MODEL_VERSION is None:
+
+        with open(os.path.join(MODULE_DIR, '__version__.py'), 'r') as f:
+            match = re.search(r'__version__\s*=\s*"([^"]*)"', f.read())
+
+        release = match.group(1) if match else 'unknown'
+
+        digest = hashlib.sha256()
+
+        for (root, dirs, files) in sorted(os.walk(MODULE_DIR)):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.endswith('.py'):
+                    with open(os.path.join(root, filename), 'rb') as f:
+                        digest.update(f.read())
+
+        _MODEL_VERSION = '{:}+{:}'.format(release, digest.hexdigest()[:12])
+
+    return _MODEL_VERSION
+
+
+def get_weather_hash(weather):
+    ''' A digest of the weather time-series (or the means used instead). '''
+
+    digest = hashlib.sha256()
+
+    for name in WEATHER_SERIES:
+
+        series = getattr(weather, '_{:}_series'.format(name))
+
+        digest.update(name.encode())
+
+        if series is None:
+            digest.update(repr(getattr(weather, '{:}_series_mean'.format(name))).encode())
+            continue
+
+        # (year, month, day) keys and the values, in date order
+        dates = np.array(list(series), dtype=np.int64).reshape(-1, 3)
+        values = np.fromiter(series.values(), dtype=float, count=len(series))
+
+        order = np.lexsort(dates.T[::-1])
+
+        digest.update(dates[order].tobytes())
+        digest.update(values[order].tobytes())
+
+    return digest.hexdigest()
+
+
+def get_site_config(pf):
+    ''' The site configuration of a palm field (that did not run yet). '''
+
+    return (
+        ('time', pf.time.isoformat()),
+        ('time_of_planting', pf.time_of_planting.isoformat()),
+        ('planting_density', pf.planting_density),
+        ('latitude', pf.latitude),
+        ('soil_texture_class', pf.soil.soil_texture_class),
+        ('soil_depth', pf.soil.soil_depth),
+        ('available_water', pf.soil.available_water),
+        ('cohort_lumping_width', pf.generative._lumping_width),
+    )
+
+
+def get_parameters_key(pf):
+    ''' The parameters of a palm field, as sorted (prefix, name, value) triplets.
+
+    The parameters the sub-model objects actually use, i.e. those of the
+    parameter set of the palm field (if any) or of "set_parameters".
+    '''
+
+    objects = [pf.indeterminate, pf.female, pf.male] + pf.components
+
+    values = []
+
+    for kls in PARAMETER_SET_CLASSES:
+
+        obj = next((x for x in objects if isinstance(x, kls)), None)
+
+        if obj is not None:
+            parameters = obj.parameters
+        elif pf.parameter_set is not None:
+            parameters = pf.parameter_set.bind(kls).parameters
+        else:
+            parameters = kls.parameters
+
+        values.extend((kls._prefix, name, _freeze(entry['value']))
+                      for (name, entry) in parameters.items())
+
+    return tuple(sorted(values))
+
+
+class ResultCache(object):
+    ''' A size-bounded, content-addressed cache of simulation results on disk.
+
+    The results are keyed by a digest of everything that determines them:
+
+        - the parameters (see "get_parameters_key")
+        - the site configuration (planting, location, soil)
+        - the contents of the weather time-series
+        - the model version (see "get_model_version")
+        - the time-step, the duration and the selected outputs
+
+    so re-evaluating e.g. the same parameter vector at the same site
+    loads the results instead of running the palm field:
+
+        cache = ResultCache('palmsim_cache', max_bytes=2**30)
+
+        pf = PalmField(parameter_set=ps)
+        pf.weather.radiation_series = ...
+
+        df = cache.run(pf, duration=10 * 365, outputs=['FFB_production (kg/ha/yr)'])
+
+    Input
+    -----
+    directory: str
+        The cache directory, created if needed.
+    max_bytes: int
+        The maximum total size of the cached results; the least recently
+        used results are removed beyond it.
+
+    Notes
+    -----
+    Several processes can share a cache directory: results are written to
+    a temporary file which is then renamed, so a result is either complete
+    or missing, and a result removed by another process is just a miss.
+    Reading a result marks it as recently used (its modification time).
+    The total size is kept track of per process and re-counted from the
+    directory when beyond max_bytes or every _recount_interval results, so
+    the results of other processes may briefly exceed the limit. Beyond
+    it, results are removed down to _low_water times max_bytes, such that
+    a full cache is not re-counted upon every result.
+    '''
+
+    extension = '.pkl'
+
+    # the number of results cached between re-counts of the total size
+    _recount_interval = 100
+
+    # the fraction of max_bytes kept when removing results
+    _low_water = 0.9
+
+    def __init__(self, directory, max_bytes=2**30):
+
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+
+        # see "_evict"
+        self._size = None
+        self._puts = 0
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __repr__(self):
+        return 'ResultCache({:}, {:} results, {:.1f} MB)'.format(
+            self.directory, len(self), self.size / 1e6)
+
+    @property
+    def size(self):
+        """ The total size of the cached results (bytes). """
+        return sum(size for (_, size, _) in self._entries())
+
+    def key(self, pf, duration, outputs=None):
+        """ The key of the results of running palm field pf for duration days. """
+
+        content = (
+            ('parameters', get_parameters_key(pf)),
+            ('site', get_site_config(pf)),
+            ('weather', get_weather_hash(pf.weather)),
+            ('version', get_model_version()),
+            ('dt', pf.dt),
+            ('duration', duration),
+            ('outputs', None if outputs is None else tuple(outputs)),
+        )
+
+        return hashlib.sha256(repr(content).encode()).hexdigest()
+
+    def _filepath(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def _entries(self):
+        """ The (filepath, size, last use) of the cached results. """
+
+        entries = []
+
+        for entry in os.scandir(self.directory):
+
+            if not entry.name.endswith(self.extension):
+                continue
+
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((entry.path, stat.st_size, stat.st_mtime))
+
+        return entries
+
+    def get(self, key):
+        """ The cached results of key, None if not cached (or unreadable).
+
+        Results that fail to load (e.g. truncated, or pickled by an
+        incompatible pandas) are removed.
+        """
+
+        filepath = self._filepath(key)
+
+        try:
+            df = pd.read_pickle(filepath)
+            os.utime(filepath)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+            return None
+
+        return df
+
+    def put(self, key, df):
+        """ Caches results df under key. """
+
+        fd, tmp_filepath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                df.to_pickle(f)
+            size = os.path.getsize(tmp_filepath)
+            os.replace(tmp_filepath, self._filepath(key))
+        except BaseException:
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+            raise
+
+        self._puts += 1
+
+        if self._size is not None:
+            self._size += size
+
+        if (self._size is None or self._size > self.max_bytes
+                or self._puts % self._recount_interval == 0):
+            self._evict()
+
+    def _evict(self):
+        """ Removes the least recently used results beyond the size limit.
+
+        Re-counts the total size from the directory, see "put".
+        """
+
+        entries = self._entries()
+        size = sum(x[1] for x in entries)
+
+        max_bytes = self.max_bytes if size <= self.max_bytes else self._low_water * self.max_bytes
+
+        for (filepath, entry_size, _) in sorted(entries, key=lambda x: x[2]):
+
+            if size <= max_bytes:
+                break
+
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+
+            size -= entry_size
+
+        self._size = size
+
+    def clear(self):
+        """ Removes all cached results. """
+
+        for (filepath, _, _) in self._entries():
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+
+        self._size = 0
+
+    def run(self, pf, duration=30 * 365, outputs=None):
+        """ The results of running palm field pf, from the cache if possible.
+
+        Input
+        -----
+        pf: PalmField
+            The palm field, ready to run; it is not run on a cache hit.
+        duration: int
+            The duration (days), see "PalmField.run".
+        outputs: list
+            The columns of the results to keep (and cache), all if None.
+
+        Notes
+        -----
+        Only the results are cached: on a hit the palm field keeps its
+        initial state, e.g. its harvest ledger (see "HarvestLedger") is
+        empty. Run the palm field itself when its state is needed.
+        """
+        return self.run_with_key(pf, duration, outputs)[1]
+
+    def run_with_key(self, pf, duration=30 * 365, outputs=None):
+        """ The key and the results of running palm field pf, see "run". """
+
+        key = self.key(pf, duration, outputs)
+
+        df = self.get(key)
+
+        if df is not None:
+            self.hits += 1
+            return key, df
+
+        self.misses += 1
+
+        df = pf.run(duration=duration)
+
+        if outputs is not None:
+            df = df[list(outputs)]
+
+        self.put(key, df)
+
+        return key, df
@@ -0,0 +1,751 @@
+#!/usr/bin/env python
+''' Calibration of the model parameters against observations. '''
+
+import os
+import pickle
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from .palm import PalmField
+from .params import get_parameter_schema, apply_vector
+from .metrics import rmse
+from .sensitivity import evaluate, latin_hypercube
+
+# the weather series of a palm field by column of the climate files
+# (see "calibration_lhoat/climate")
+CLIMATE_COLUMNS = {
+    'solar (MJ/m2/day)': 'radiation',
+    'precip (mm/day)': 'rainfall',
+    'temperature (degC)': 'temperature',
+    'humidity (%)': 'humidity',
+}
+
+
+def monthly_FFB(df, dt=1):
+    ''' The monthly FFB production (t/ha/month) of the simulation results df.
+
+    Per time-step the production is the bunch count times the bunch weight,
+    summed per calendar month (cf. "calibration_lhoat/1.RunPALMSIMsims_function.R").
+    '''
+
+    count = df['generative_bunch_count_daily (1/ha/day)'] * dt
+    weight = df['generative_bunch_weight (kg)']
+
+    FFB = (count * weight / 1000).groupby(df.index.to_period('M')).sum()
+    FFB.index = FFB.index.to_timestamp()
+
+    return FFB
+
+
+class FFBError(object):
+    ''' The root mean square error (t/ha/month) of the simulated monthly FFB.
+
+    The statistic of a "ModelObjective", comparing the simulated monthly FFB
+    production (see "monthly_FFB") to the observed one in the months with an
+    observation:
+
+        observed = obs.set_index('Fecha')['RFF_ton_ha']
+        objective = ModelObjective(make_palm_field, FFBError(observed, dt=1),
+                                   duration=10 * 365)
+
+    Input
+    -----
+    observed: pd.Series
+        The observed FFB production (t/ha/month) indexed by (any day of) the month.
+    dt: int
+        The time-step of the simulations (days).
+    '''
+
+    def __init__(self, observed, dt=1):
+
+        observed = observed.dropna()
+        observed.index = pd.DatetimeIndex(observed.index).to_period('M').to_timestamp()
+
+        self.observed = observed.groupby(level=0).mean()
+        self.dt = dt
+
+    def __call__(self, df):
+
+        simulated = monthly_FFB(df, self.dt).reindex(self.observed.index)
+
+        return rmse(simulated.values, self.observed.values)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Sites
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class Site(object):
+    ''' A calibration site: the planting, location, soil and weather of a
+    palm field, the duration of its simulation and the statistic of its runs.
+
+    The site-invariant work is done once: the weather series are converted
+    when the site is made and shared by all its palm fields (the calendar,
+    solar height and soil water retention tables are shared by the model
+    itself). A site makes its palm fields when called, so it can serve as
+    the make_palm_field of a "ModelObjective":
+
+        site = Site('313', weather, observed, year_of_planting=2008,
+                    latitude=3.94, soil_texture_class='clay loam')
+        pf = site()
+
+    Input
+    -----
+    name: str
+        The name of the site.
+    weather: pd.DataFrame
+        The daily weather, date-time indexed, with columns named after the
+        weather series (e.g. 'radiation', see "Weather") or the columns
+        of the climate files (see "CLIMATE_COLUMNS").
+    observed: pd.Series
+        The observed FFB production (t/ha/month), see "FFBError".
+    duration: int
+        The duration of the simulations (days), up to the end of the weather if None.
+    statistic: callable
+        The objective of the simulation results, the "FFBError" of the
+        observations if None.
+    weight: float
+        The weight of the site in a "MultiSiteObjective".
+    kwargs:
+        The palm field settings e.g. year_of_planting, latitude, soil_depth
+        and dt, see "PalmField".
+    '''
+
+    def __init__(self, name, weather, observed=None, duration=None, statistic=None,
+                 weight=1.0, **kwargs):
+
+        self.name = name
+        self.settings = kwargs
+        self.weight = weight
+
+        template = PalmField(**kwargs)
+
+        for (column, series) in weather.items():
+            series_name = CLIMATE_COLUMNS.get(column, column)
+            setattr(template.weather, '{:}_series'.format(series_name), series)
+
+        self._weather = template.weather
+
+        if duration is None:
+            duration = (pd.Timestamp(weather.index.max()) - pd.Timestamp(template.time)).days
+
+        self.duration = duration
+
+        if statistic is None and observed is not None:
+            statistic = FFBError(observed, dt=template.dt)
+
+        self.observed = observed
+        self.statistic = statistic
+
+    def __repr__(self):
+        return 'Site({:}, duration={:})'.format(self.name, self.duration)
+
+    def __call__(self, parameter_set=None):
+        return self.make_palm_field(parameter_set)
+
+    def make_palm_field(self, parameter_set=None):
+        """ A new palm field of the site, ready to run. """
+
+        pf = PalmField(parameter_set=parameter_set, **self.settings)
+        pf.weather.copy_series(self._weather)
+
+        return pf
+
+    def evaluate(self, x, schema=None):
+        """ The statistic of a run with parameter vector x, see "apply_vector". """
+
+        pf = self.make_palm_field()
+
+        apply_vector(pf, x, schema)
+
+        return float(self.statistic(pf.run(duration=self.duration)))
+
+
+def read_sites(filepath, climate_dir=None, observed=None, dt=1):
+    ''' The sites of a locations file.
+
+    Input
+    -----
+    filepath: str
+        The locations, see "calibration_lhoat/InfoMejoresLotesSeleccionadosParaCalibracion.csv".
+    climate_dir: str
+        The directory of the climate files, the "climate" directory next
+        to the locations if None.
+    observed: pd.DataFrame
+        The observed FFB production (the "Empresa", "Finca", "Lote", "Fecha"
+        and "RFF_ton_ha" columns, see "calibration_lhoat/obs_data/obs_yield.csv"),
+        no observations if None.
+    dt: int
+        The time-step of the simulations (days).
+
+    Returns
+    -------
+    A list of Site, named "Empresa/Finca/Lote", simulated from planting
+    ("Siembra") to the final date ("FechaFinal").
+    '''
+
+    if climate_dir is None:
+        climate_dir = os.path.join(os.path.dirname(filepath), 'climate')
+
+    locations = pd.read_csv(filepath, sep=';', dtype={'Lote': str})
+
+    sites = []
+
+    for location in locations.itertuples():
+
+        planting = pd.to_datetime(location.Siembra, format='%d/%m/%Y')
+        end = pd.to_datetime(location.FechaFinal, format='%m/%d/%Y')
+
+        weather = pd.read_csv(os.path.join(climate_dir, location.clima), index_col='Date')
+        weather.index = pd.to_datetime(weather.index)
+
+        site_observed = None
+
+        if observed is not None:
+            selected = observed[(observed['Empresa'] == location.Empresa) &
+                                (observed['Finca'] == location.Finca) &
+                                (observed['Lote'].astype(str) == location.Lote)]
+            site_observed = pd.Series(selected['RFF_ton_ha'].values,
+                                      index=pd.to_datetime(selected['Fecha']))
+
+        sites.append(Site(
+            '{:}/{:}/{:}'.format(location.Empresa, location.Finca, location.Lote),
+            weather[[c for c in weather.columns if c in CLIMATE_COLUMNS]],
+            observed=site_observed,
+            duration=(end - planting).days,
+            year_of_planting=planting.year,
+            month_of_planting=planting.month,
+            day_of_planting=planting.day,
+            planting_density=143,
+            latitude=location.Latitud,
+            soil_texture_class=location.textura,
+            soil_depth=location.profundidad,
+            dt=dt))
+
+    return sites
+
+
+# the sites of the worker processes of a "MultiSiteObjective"
+_WORKER_SITES = None
+
+
+def _set_worker_sites(sites, schema):
+    global _WORKER_SITES
+    _WORKER_SITES = (sites, schema)
+
+
+def _evaluate_site(task):
+    (k, x) = task
+    (sites, schema) = _WORKER_SITES
+    return sites[k].evaluate(x, schema)
+
+
+class MultiSiteObjective(object):
+    ''' The weighted mean over several sites of the statistic of a parameter vector.
+
+    A batch of vectors is evaluated as one batch of (vector, site) runs,
+    longest sites first, so the workers stay busy up to the end of the
+    batch - rather than waiting per vector for its slowest site:
+
+        sites = read_sites('InfoMejoresLotesSeleccionadosParaCalibracion.csv',
+                           observed=pd.read_csv('obs_yield.csv'))
+        objective = MultiSiteObjective(sites, schema=schema, workers=32)
+
+        result = minimize(objective, schema, method='cmaes')
+
+    Input
+    -----
+    sites: list
+        The sites, see "Site".
+    weights: list
+        The weights of the sites, those of the sites if None.
+    schema: ParameterSchema
+        The layout of the parameter vectors, see "get_parameter_schema" if None.
+    workers: int
+        The number of processes; evaluated in this process if 1.
+
+    Notes
+    -----
+    The worker processes are started on the first batch and receive the
+    sites once; they are kept until "close". The workers of "minimize"
+    and "evaluate" are not used (nor started), the objective schedules
+    its own.
+    '''
+
+    def __init__(self, sites, weights=None, schema=None, workers=1):
+
+        self.sites = list(sites)
+        self.schema = schema or get_parameter_schema()
+        self.workers = workers
+
+        if weights is None:
+            weights = [site.weight for site in self.sites]
+
+        self.weights = np.asarray(weights, dtype=float)
+
+        if self.weights.shape != (len(self.sites),):
+            raise ValueError('Expected one weight per site')
+
+        self._executor = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Stops the worker processes. """
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __call__(self, x):
+        return float(self.batch(np.atleast_2d(x))[0])
+
+    def site_values(self, X):
+        """ The statistic per vector (row) of X and site, shape (n, sites). """
+
+        X = np.asarray(X, dtype=float)
+
+        durations = [site.duration for site in self.sites]
+        order = sorted(range(len(self.sites)), key=lambda k: -durations[k])
+
+        tasks = [(k, i) for k in order for i in range(len(X))]
+
+        if self.workers <= 1:
+            values = [self.sites[k].evaluate(X[i], self.schema) for (k, i) in tasks]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_set_worker_sites,
+                    initargs=(self.sites, self.schema))
+            values = list(self._executor.map(_evaluate_site,
+                                             [(k, X[i]) for (k, i) in tasks]))
+
+        site_values = np.empty((len(X), len(self.sites)))
+
+        for ((k, i), value) in zip(tasks, values):
+            site_values[i, k] = value
+
+        return site_values
+
+    def batch(self, X):
+        """ The weighted mean over the sites per vector (row) of X. """
+        return self.site_values(X) @ self.weights / self.weights.sum()
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Optimizers
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class Optimizer(object):
+    ''' A population-based minimizer on the unit hypercube.
+
+    Per generation the population is asked for, evaluated (as a batch)
+    and told its values:
+
+        X = optimizer.ask()
+        optimizer.tell(X, values)
+
+    The state - including the random generator - can be pickled, see
+    "minimize" for checkpointing.
+    '''
+
+    name = None
+
+    def __init__(self, d, popsize, seed=None):
+
+        self.d = d
+        self.popsize = popsize
+        self.rng = np.random.default_rng(seed)
+
+        self.generation = 0
+        self.evaluations = 0
+
+        self.best_x = None
+        self.best_value = np.inf
+
+    def ask(self):
+        """ The population to evaluate, shape (popsize, d). """
+        raise NotImplementedError
+
+    def tell(self, X, values):
+        """ Updates the state given the values of population X. """
+
+        values = np.asarray(values, dtype=float)
+
+        # failed simulations never make it to the best
+        values = np.where(np.isnan(values), np.inf, values)
+
+        k = int(np.argmin(values))
+
+        if values[k] < self.best_value:
+            self.best_value = float(values[k])
+            self.best_x = X[k].copy()
+
+        self._tell(X, values)
+
+        self.generation += 1
+        self.evaluations += len(X)
+
+    def _tell(self, X, values):
+        raise NotImplementedError
+
+
+class ParticleSwarm(Optimizer):
+    ''' Particle swarm optimization (constriction coefficients of Clerc, 2002). '''
+
+    name = 'pso'
+
+    def __init__(self, d, popsize=40, seed=None, w=0.7298, c1=1.4962, c2=1.4962):
+
+        super().__init__(d, popsize, seed)
+
+        self.w = w
+        self.c1 = c1
+        self.c2 = c2
+
+        self.X = latin_hypercube(popsize, np.zeros(d), np.ones(d), self.rng)
+        self.V = self.rng.uniform(-0.1, 0.1, size=(popsize, d))
+
+        self.pbest_X = self.X.copy()
+        self.pbest_values = np.full(popsize, np.inf)
+
+    def ask(self):
+        return self.X.copy()
+
+    def _tell(self, X, values):
+
+        improved = values < self.pbest_values
+
+        self.pbest_X[improved] = X[improved]
+        self.pbest_values[improved] = values[improved]
+
+        gbest = self.pbest_X[np.argmin(self.pbest_values)]
+
+        r1 = self.rng.random(self.X.shape)
+        r2 = self.rng.random(self.X.shape)
+
+        self.V = (self.w * self.V +
+                  self.c1 * r1 * (self.pbest_X - self.X) +
+                  self.c2 * r2 * (gbest - self.X))
+
+        self.X = self.X + self.V
+
+        # particles stop at the bounds
+        outside = (self.X < 0) | (self.X > 1)
+        self.V[outside] = 0
+        self.X = np.clip(self.X, 0, 1)
+
+
+class DifferentialEvolution(Optimizer):
+    ''' Differential evolution, DE/rand/1/bin (Storn and Price, 1997). '''
+
+    name = 'de'
+
+    def __init__(self, d, popsize=40, seed=None, F=0.8, CR=0.9):
+
+        super().__init__(d, max(4, popsize), seed)
+
+        self.F = F
+        self.CR = CR
+
+        self.population = latin_hypercube(self.popsize, np.zeros(d), np.ones(d), self.rng)
+        self.population_values = None
+
+    def ask(self):
+
+        if self.population_values is None:
+            return self.population.copy()
+
+        n, d = self.population.shape
+
+        # three distinct members other than the target
+        r = np.array([
+            self.rng.choice(np.delete(np.arange(n), j), 3, replace=False)
+            for j in range(n)
+        ])
+
+        P = self.population
+        mutants = P[r[:, 0]] + self.F * (P[r[:, 1]] - P[r[:, 2]])
+
+        crossover = self.rng.random((n, d)) < self.CR
+        crossover[np.arange(n), self.rng.integers(0, d, n)] = True
+
+        trials = np.where(crossover, mutants, P)
+
+        # mutants beyond the bounds are moved half-way to the bound
+        trials = np.where(trials < 0, P / 2, trials)
+        trials = np.where(trials > 1, (1 + P) / 2, trials)
+
+        return trials
+
+    def _tell(self, X, values):
+
+        if self.population_values is None:
+            self.population = X.copy()
+            self.population_values = values.copy()
+            return
+
+        better = values <= self.population_values
+
+        self.population[better] = X[better]
+        self.population_values[better] = values[better]
+
+
+class CMAES(Optimizer):
+    ''' The covariance matrix adaptation evolution strategy (Hansen, 2016).
+
+    The samples are clipped to the bounds before evaluation and the
+    clipped samples are used to update the distribution.
+    '''
+
+    name = 'cmaes'
+
+    def __init__(self, d, popsize=None, seed=None, sigma=0.3, mean=None):
+
+        if popsize is None:
+            popsize = 4 + int(3 * np.log(d))
+
+        super().__init__(d, popsize, seed)
+
+        self.mean = np.full(d, 0.5) if mean is None else np.array(mean, dtype=float)
+        self.sigma = sigma
+
+        mu = popsize // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+
+        self.mu = mu
+        self.weights = weights / weights.sum()
+        self.mueff = 1 / np.sum(self.weights ** 2)
+
+        mueff = self.mueff
+
+        self.cc = (4 + mueff / d) / (d + 4 + 2 * mueff / d)
+        self.cs = (mueff + 2) / (d + mueff + 5)
+        self.c1 = 2 / ((d + 1.3) ** 2 + mueff)
+        self.cmu = min(1 - self.c1, 2 * (mueff - 2 + 1 / mueff) / ((d + 2) ** 2 + mueff))
+        self.damps = 1 + 2 * max(0, np.sqrt((mueff - 1) / (d + 1)) - 1) + self.cs
+        self.chiN = np.sqrt(d) * (1 - 1 / (4 * d) + 1 / (21 * d ** 2))
+
+        self.pc = np.zeros(d)
+        self.ps = np.zeros(d)
+
+        self.C = np.eye(d)
+        self.B = np.eye(d)
+        self.D = np.ones(d)
+
+    def ask(self):
+
+        Z = self.rng.standard_normal((self.popsize, self.d))
+        X = self.mean + self.sigma * (Z * self.D) @ self.B.T
+
+        return np.clip(X, 0, 1)
+
+    def _tell(self, X, values):
+
+        d = self.d
+
+        order = np.argsort(values, kind='stable')[:self.mu]
+
+        old_mean = self.mean
+        self.mean = self.weights @ X[order]
+
+        y = (X[order] - old_mean) / self.sigma
+        y_w = (self.mean - old_mean) / self.sigma
+
+        # C^(-1/2) y_w
+        invsqrt_y = self.B @ ((self.B.T @ y_w) / self.D)
+
+        self.ps = (1 - self.cs) * self.ps + \
+            np.sqrt(self.cs * (2 - self.cs) * self.mueff) * invsqrt_y
+
+        norm_ps = np.linalg.norm(self.ps)
+        hsig = norm_ps / np.sqrt(1 - (1 - self.cs) ** (2 * (self.generation + 1))) / self.chiN \
+            < 1.4 + 2 / (d + 1)
+
+        self.pc = (1 - self.cc) * self.pc + \
+            hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+        self.C = ((1 - self.c1 - self.cmu) * self.C +
+                  self.c1 * (np.outer(self.pc, self.pc) +
+                             (1 - hsig) * self.cc * (2 - self.cc) * self.C) +
+                  self.cmu * (y.T * self.weights) @ y)
+
+        self.sigma *= np.exp((self.cs / self.damps) * (norm_ps / self.chiN - 1))
+
+        self.C = (self.C + self.C.T) / 2
+
+        D2, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(D2, 1e-20))
+
+
+OPTIMIZERS = {kls.name: kls for kls in [ParticleSwarm, DifferentialEvolution, CMAES]}
+
+
+class CalibrationResult(object):
+    ''' The outcome of a calibration, see "minimize". '''
+
+    def __init__(self, schema, optimizer, history, stop_reason):
+
+        self.schema = schema
+        self.x = schema.lower + optimizer.best_x * (schema.upper - schema.lower)
+        self.value = optimizer.best_value
+        self.generations = optimizer.generation
+        self.evaluations = optimizer.evaluations
+        self.history = pd.DataFrame(
+            history, columns=['generation', 'best', 'generation_best', 'generation_median'])
+        self.stop_reason = stop_reason
+
+    @property
+    def parameters(self):
+        """ The calibrated values per "sub-model.parameter" name. """
+        return self.schema.to_dict(self.x)
+
+    def __repr__(self):
+        return 'CalibrationResult(value={:.6g}, generations={:}, evaluations={:}, stop: {:})'.format(
+            self.value, self.generations, self.evaluations, self.stop_reason)
+
+
+def _save_checkpoint(filepath, state):
+    """ Pickles state to filepath - in full or not at all. """
+
+    tmp_filepath = filepath + '.tmp'
+
+    with open(tmp_filepath, 'wb') as f:
+        pickle.dump(state, f)
+
+    os.replace(tmp_filepath, filepath)
+
+
+def minimize(objective, schema=None, method='de', popsize=40, max_generations=100,
+             workers=1, seed=None, patience=None, tol=0, checkpoint=None, verbose=False,
+             **options):
+    ''' Minimizes the objective of a parameter vector within the bounds of the schema.
+
+    Each generation of the optimizer is evaluated as a batch, in parallel
+    given several workers:
+
+        objective = ModelObjective(make_palm_field, FFBError(observed), duration=10 * 365)
+        schema = ParameterSchema(names=['roots.specific_maintenance', ...])
+
+        result = minimize(objective, schema, method='cmaes', workers=32, seed=1,
+                          patience=10, checkpoint='calibration.pkl')
+        result.parameters
+
+    Input
+    -----
+    objective: callable
+        Returns the objective (float) of a parameter vector, e.g. a
+        "ModelObjective"; NaN counts as infinitely bad.
+    schema: ParameterSchema
+        The calibrated parameters and their bounds, see "get_parameter_schema"
+        if None.
+    method: str
+        The optimizer: 'pso' (particle swarm), 'de' (differential evolution)
+        or 'cmaes' (CMA-ES).
+    popsize: int
+        The population size, the CMA-ES default if None.
+    max_generations: int
+        The maximum number of generations.
+    workers: int
+        The number of processes evaluating the objective.
+    seed: int
+        The seed of the optimizer, for reproducible calibrations.
+    patience: int
+        Stops after this many generations without an improvement of the
+        best value by more than tol, never if None.
+    tol: float
+        The minimal improvement.
+    checkpoint: str
+        The file in which the optimizer state is saved after every
+        generation; an existing checkpoint is resumed.
+    options:
+        Passed to the optimizer e.g. F and CR for differential evolution.
+
+    Returns
+    -------
+    A CalibrationResult.
+
+    Notes
+    -----
+    The optimizers work on the unit hypercube, mapped linearly onto the
+    bounds of the schema. Given the seed the calibration does not depend
+    on the number of workers, nor on being resumed from a checkpoint.
+    '''
+
+    schema = schema or get_parameter_schema()
+
+    lower = schema.lower
+    width = schema.upper - schema.lower
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+
+        with open(checkpoint, 'rb') as f:
+            state = pickle.load(f)
+
+        optimizer = state['optimizer']
+        history = state['history']
+        stale = state['stale']
+
+        if optimizer.name != method or optimizer.d != len(schema):
+            raise ValueError('The checkpoint {:} is of another calibration'.format(checkpoint))
+
+    else:
+
+        if method not in OPTIMIZERS:
+            raise ValueError('Unknown method: {:}'.format(method))
+
+        optimizer = OPTIMIZERS[method](len(schema), popsize=popsize, seed=seed, **options)
+        history = []
+        stale = 0
+
+    stop_reason = 'max_generations'
+
+    # objectives evaluating their batches themselves schedule their own workers
+    pooled = workers > 1 and not hasattr(objective, 'batch')
+
+    with (ProcessPoolExecutor(max_workers=workers) if pooled
+          else nullcontext()) as executor:
+
+        while optimizer.generation < max_generations:
+
+            if patience is not None and stale >= patience:
+                stop_reason = 'patience'
+                break
+
+            previous_best = optimizer.best_value
+
+            X = optimizer.ask()
+            values = evaluate(objective, lower + X * width, workers, executor)
+
+            optimizer.tell(X, values)
+
+            if previous_best - optimizer.best_value > tol:
+                stale = 0
+            else:
+                stale += 1
+
+            history.append((optimizer.generation, optimizer.best_value,
+                            float(np.nanmin(values)), float(np.nanmedian(values))))
+
+            if verbose:
+                print('generation {:>4}: best {:.6g}'.format(
+                    optimizer.generation, optimizer.best_value))
+
+            if checkpoint is not None:
+                _save_checkpoint(checkpoint, {
+                    'optimizer': optimizer, 'history': history, 'stale': stale})
+
+    return CalibrationResult(schema, optimizer, history, stop_reason)
@@ -100,25 +100,54 @@ class Assimilates(object):
         self.set_attributes()
 
     def set_attributes(self):
-        """ Set all the instance variable values. """
+        """ Set all the instance variable values.
+
+        The demands of the organs are collected once (see "get_demands"),
+        the rest follows from those.
+        """
+
+        sinks, maintenance = self.get_demands()
+
+        self._potential_sink_strengths = sinks
+
+        self.potential_sink_strength_vegetative = sinks[0] + sinks[1] + sinks[2]
 
-        self.potential_sink_strength_vegetative = self.get_potential_sink_strength_vegetative(
-        )
         self.assim_produced = self.get_assim_produced()
-        self.assim_maintenance_fronds = self.get_assim_maintenance_fronds()
-        self.assim_maintenance_trunk = self.get_assim_maintenance_trunk()
-        self.assim_maintenance_roots = self.get_assim_maintenance_roots()
+        self.assim_maintenance_fronds = maintenance[0]
+        self.assim_maintenance_trunk = maintenance[1]
+        self.assim_maintenance_roots = maintenance[2]
         self.assim_maintenance_vegetative = self.get_assim_maintenance_vegetative(
         )
-        self.assim_maintenance_generative = self.get_assim_maintenance_generative(
-        )
+        self.assim_maintenance_generative = maintenance[3]
         self.assim_maintenance_total = self.get_assim_maintenance_total()
         self.assim_growth_total = self.get_assim_growth_total()
-        self.assim_growth_vegetative = self.get_assim_growth_vegetative()
+
+        vegetative, generative = self.partition_assim_growth()
+
+        self.assim_growth_vegetative = vegetative
         self.assim_growth_fronds = self.get_assim_growth_fronds()
         self.assim_growth_roots = self.get_assim_growth_roots()
         self.assim_growth_trunk = self.get_assim_growth_trunk()
-        self.assim_growth_generative = self.get_assim_growth_generative()
+        self.assim_growth_generative = generative
+
+    #~~~~~~~~~~
+
+    sinks = ['fronds', 'trunk', 'roots', 'generative']
+
+    def get_demands(self):
+        """ The potential sink strengths and maintenance requirements (kg_CH2O/ha/day).
+
+        Collected in one go, one value per sink (see "sinks").
+        """
+        if self._palm is None:
+            return [0, 0, 0, 0], [0., 0., 0., 0.]
+        else:
+            organs = [getattr(self._palm, x) for x in self.sinks]
+
+            sinks = [x.potential_sink_strength for x in organs]
+            maintenance = [x.maintenance_requirement for x in organs]
+
+            return sinks, maintenance
 
     #~~~~~~~~~~
 
@@ -178,15 +207,29 @@ class Assimilates(object):
 
     def get_assim_growth_fronds(self):
         """ Assimilates for growth (kg_CH2O/ha/day). """
-        return self.assim_veg_growth_fraction_fronds * self.assim_growth_vegetative
+        return self._get_veg_growth_fraction(0) * self.assim_growth_vegetative
 
     def get_assim_growth_roots(self):
         """ Assimilates for growth (kg_CH2O/ha/day). """
-        return self.assim_veg_growth_fraction_roots * self.assim_growth_vegetative
+        return self._get_veg_growth_fraction(2) * self.assim_growth_vegetative
 
     def get_assim_growth_trunk(self):
         """ Assimilates for growth (kg_CH2O/ha/day). """
-        return self.assim_veg_growth_fraction_trunk * self.assim_growth_vegetative
+        return self._get_veg_growth_fraction(1) * self.assim_growth_vegetative
+
+    def _get_veg_growth_fraction(self, i):
+        """ Fraction of assimilates (1) for vegetative growth of sink i.
+
+        As "assim_veg_growth_fraction_fronds" etc. - based on the
+        demands collected upon "set_attributes".
+        """
+        if self._palm is None:
+            return [self._assim_veg_growth_fraction_fronds_,
+                    self._assim_veg_growth_fraction_trunk_,
+                    self._assim_veg_growth_fraction_roots_][i]
+        else:
+            return self._potential_sink_strengths[i]\
+                    /self.potential_sink_strength_vegetative
 
     #~~~~~~~~~~
 
@@ -219,42 +262,34 @@ class Assimilates(object):
 
     #~~~~~~~~~~
 
-    def get_assim_growth_vegetative(self):
-        """ Assimilates for growth (kg_CH2O/ha/day). """
+    def partition_assim_growth(self):
+        """ Assimilates for vegetative and generative growth (kg_CH2O/ha/day). """
 
         S = self.assim_growth_total
 
+        potential = self.potential_sink_strength_generative
+
         Ds = [
             self.potential_sink_strength_vegetative,
-            self.potential_sink_strength_generative
+            potential
         ]
 
         k = self.parameters['vegetative_priority']['value']
 
-        res = float(parametrized_partitioning(S, Ds, k)[0])
-
-        if res <= 0:
-            return 0
-        else:
-            return res
+        vegetative, generative = parametrized_partitioning(S, Ds, k).tolist()
 
-    def get_assim_growth_generative(self):
-        """ Assimilates for growth (kg_CH2O/ha/day). """
+        if vegetative <= 0:
+            vegetative = 0
 
-        S = self.assim_growth_total
+        return vegetative, min(generative, potential)
 
-        potential = self.potential_sink_strength_generative
-
-        Ds = [
-            self.potential_sink_strength_vegetative,
-            self.potential_sink_strength_generative
-        ]
-
-        k = self.parameters['vegetative_priority']['value']
-
-        res = float(parametrized_partitioning(S, Ds, k)[1])
+    def get_assim_growth_vegetative(self):
+        """ Assimilates for growth (kg_CH2O/ha/day). """
+        return self.partition_assim_growth()[0]
 
-        return min(res, potential)
+    def get_assim_growth_generative(self):
+        """ Assimilates for growth (kg_CH2O/ha/day). """
+        return self.partition_assim_growth()[1]
 
     #~~~~~~~~~~
 
@@ -405,4 +440,95 @@ def parametrized_partitioning(S, Ds, k):
     """
 
     return k*prioritized_partitioning(S,Ds) + \
-            (1-k)*proportionate_partitioning(S,Ds)
\ No newline at end of file
+            (1-k)*proportionate_partitioning(S,Ds)
+
+#~~~~~~~~~~
+# Many runs at once
+#~~~~~~~~~~
+
+
+def prioritized_partitioning_batch(S, Ds):
+    """ Hard-priority partitioning, for many runs at once.
+
+    Same as "prioritized_partitioning" per run (row).
+
+    Parameters
+    ----------
+    S: array-float (N,), supply per run
+    Ds: array-float (N, sinks), demands per run
+
+    Returns
+    -------
+    Ss: array-float (N, sinks)
+
+    Examples
+    --------
+    >>> prioritized_partitioning_batch([2, 4], [[1.5, 1], [2, 1]])
+    array([[1.5, 0.5],
+           [2. , 2. ]])
+    """
+
+    S = np.array(S, dtype=float)
+    Ds = np.asarray(Ds, dtype=float)
+
+    Ss = np.empty(Ds.shape)
+
+    # a loop over the (few) sinks only
+    for j in range(Ds.shape[1] - 1):
+
+        D = Ds[:, j]
+
+        # D < S
+        fits = D < S
+
+        Ss[:, j] = np.where(fits, D, S)
+        S = np.where(fits, S - D, 0)
+
+    Ss[:, -1] = S
+    Ss[Ss < 0] = 0
+
+    return Ss
+
+
+def proportionate_partitioning_batch(S, Ds):
+    """ No-priority partitioning, for many runs at once.
+
+    Same as "proportionate_partitioning" per run (row).
+
+    Parameters
+    ----------
+    S: array-float (N,), supply per run
+    Ds: array-float (N, sinks), demands per run
+
+    Returns
+    -------
+    Ss: array-float (N, sinks)
+    """
+
+    S = np.asarray(S, dtype=float)
+    Ds = np.asarray(Ds, dtype=float)
+
+    # summed in the order of the sinks - as "sum" does
+    total_demand = Ds[:, 0].copy()
+    for j in range(1, Ds.shape[1]):
+        total_demand += Ds[:, j]
+
+    scalar = S / total_demand
+
+    return scalar[:, None] * Ds
+
+
+def parametrized_partitioning_batch(S, Ds, k):
+    """ Parametrized partitioning, for many runs at once.
+
+    Same as "parametrized_partitioning" per run (row); k is
+    either shared by all runs or given per run - shape (N,).
+    """
+
+    k = np.asarray(k, dtype=float)
+
+    if k.ndim == 1:
+        k = k[:, None]
+
+    return k*prioritized_partitioning_batch(S,Ds) + \
+            (1-k)*proportionate_partitioning_batch(S,Ds)
@@ -2,5 +2,7 @@
 ''' Contains the inflorescence modelling. '''
 
 from .cohorts_container import Cohorts
+from .cohorts_buffer import CohortBuffer, CohortPool
+from .harvest_ledger import HarvestLedger
 from .cohorts import Indeterminate, Male, Female
 from .bunch_components import Stalk, MesocarpFibers, MesocarpOil, Kernels
\ No newline at end of file
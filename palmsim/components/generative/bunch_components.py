@@ -3,7 +3,7 @@
 mesocarp oil and kernel). '''
 
 from ..helpers import add_dumps
-from ..helpers import make_quadratic_function
+from ..helpers import calc_quadratic_function
 from ..helpers import make_linear_function
 
 import yaml
@@ -50,6 +50,11 @@ class BunchComponent(object):
     """,
                       Loader=yaml.SafeLoader)
 
+    # no instance dicts: each cohort holds up to four bunch components.
+    __slots__ = ('_cohort', 'potential_mass', 't_maturity',
+                 '_t_growth_start', '_t_growth_end', 'mass', 'age',
+                 'potential_sink_strength', '_assim_growth', '_total_mass')
+
     def __init__(self,
                  cohort=None,
                  age=0,
@@ -70,14 +75,8 @@ class BunchComponent(object):
 
         # timing of events relative to the time of maturity of a female inflorescence
         self.t_maturity = t_maturity
-        t_growth_start = t_maturity * self.parameters['t_growth_start']['value']
-        t_growth_end = t_maturity * self.parameters['t_growth_end']['value']
-
-        self._potential_growth_function = \
-            make_quadratic_function(t_growth_start,
-                                    t_growth_end,
-                                      self.potential_mass,
-                                      )
+        self._t_growth_start = t_maturity * self.parameters['t_growth_start']['value']
+        self._t_growth_end = t_maturity * self.parameters['t_growth_end']['value']
 
         # state
         self.mass = 0
@@ -130,7 +129,10 @@ class BunchComponent(object):
 
         Is a function of palm age.
         """
-        return self._potential_growth_function(self.age)
+        return calc_quadratic_function(self.age,
+                                       self._t_growth_start,
+                                       self._t_growth_end,
+                                       self.potential_mass)
 
     @property
     def relative_sink_strength(self):
@@ -199,7 +201,23 @@ class BunchComponent(object):
 
 #~~~~~~~~~~~~~~~~
 
-    def copy(self):
+    def merge(self, other, weight=0.5):
+        """ Merges the state of another bunch component into this one.
+
+        Used when lumping cohorts: the mean component of the lumped cohort
+        follows from the weighted mean of both, where weight is the share
+        (in terms of inflorescences) of the other component.
+        """
+
+        w = weight
+
+        self.mass = (1 - w) * self.mass + w * other.mass
+        self.age = (1 - w) * self.age + w * other.age
+        self.potential_mass = (1 - w) * self.potential_mass + w * other.potential_mass
+
+        self.potential_sink_strength = self.get_potential_sink_strength()
+
+    def copy(self, into=None):
         """ Makes a copy of a bunch component.
 
         This is used in the "sex determination" stage where a
@@ -207,16 +225,23 @@ class BunchComponent(object):
         we make a copies of the bunch component(s) (the stalk)
         and assign these to the associated male and female cohort.
 
+        Copies into an existing bunch component of the same type
+        if passed in (into), which is re-initialized.
         """
 
-        # the constructor makes a new bunch component of the same type.
-        constructor = type(self)
-
         t_maturity = self.t_maturity
 
         # make sure to pass the potential mass which was set at inflorescence initiation
-        duplicate = constructor(potential_mass=self.potential_mass,
-                                t_maturity=t_maturity)
+        if into is None:
+            # the constructor makes a new bunch component of the same type.
+            constructor = type(self)
+
+            duplicate = constructor(potential_mass=self.potential_mass,
+                                    t_maturity=t_maturity)
+        else:
+            duplicate = into
+            duplicate.__init__(potential_mass=self.potential_mass,
+                               t_maturity=t_maturity)
 
         # carry over state (of basic types e.g. float so straightforward to do so)
         duplicate.mass = self.mass
@@ -237,6 +262,8 @@ class Stalk(BunchComponent):
 
     _prefix = 'stalk'
 
+    __slots__ = ()
+
     parameters = yaml.load("""
 
         conversion_efficiency:
@@ -283,6 +310,8 @@ class MesocarpFibers(BunchComponent):
 
     _prefix = 'mesocarp_fibers'
 
+    __slots__ = ()
+
     parameters = yaml.load("""
 
         conversion_efficiency:
@@ -329,6 +358,8 @@ class MesocarpOil(BunchComponent):
 
     _prefix = 'mesocarp_oil'
 
+    __slots__ = ()
+
     parameters = yaml.load("""
 
         conversion_efficiency:
@@ -375,6 +406,8 @@ class Kernels(BunchComponent):
 
     _prefix = 'kernel'
 
+    __slots__ = ()
+
     parameters = yaml.load("""
 
         conversion_efficiency:
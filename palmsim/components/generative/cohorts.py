@@ -65,6 +65,15 @@ class Cohort(object):
 
     _prefix = 'cohort'
 
+    # the state shared by all cohorts, no instance dicts:
+    # thousands of cohorts are alive at daily time-steps.
+    __slots__ = ('_container', '_span', 'num_inflorescences', 'age',
+                 'relative_sink_strength', 'stalk')
+
+    # the class of the stalk; replaced in the classes bound to
+    # a parameter set, see "ParameterSet"
+    _stalk_class = Stalk
+
     @property
     def _MAP(self):
         """ The palm age in months after planting (month). """
@@ -169,18 +178,22 @@ class Cohort(object):
 
 #~~~~~~~~~~~~~~~~
 
-    def update(self, dt=1):
+    def update(self, dt=1, abortion_fraction=None):
         """ Update the cohort by dt days. """
-        self._update(dt=dt)
+        self._update(dt=dt, abortion_fraction=abortion_fraction)
 
     def set_relative_sink_strength(self):
         """ Set the relative sink strength. """
         res = self.get_relative_sink_strength()
         self.relative_sink_strength = res
 
-    def _update(self, dt=1):
+    def _update(self, dt=1, abortion_fraction=None):
         """ Update the cohort by dt days.
 
+        The abortion fraction can be passed in, e.g. when calculated
+        for all cohorts at once by the container; by default it is the
+        abortion fraction of the cohort itself.
+
         Note
         ----
         We assume abortion fraction is "small"
@@ -204,7 +217,10 @@ class Cohort(object):
             component.update_age(dt=dt)
 
         # 2. apply the abortion fractions
-        survival_fraction = max(0, (1 - self.abortion_fraction * dt))
+        if abortion_fraction is None:
+            abortion_fraction = self.abortion_fraction
+
+        survival_fraction = max(0, (1 - abortion_fraction * dt))
         self.num_inflorescences *= survival_fraction
 
         # 3. increment age
@@ -273,21 +289,39 @@ class Indeterminate(Cohort):
     _prefix = 'indeterminate'
     sex = 'indeterminate'
 
+    __slots__ = ('components', 't_maturity_', '_female_fraction',
+                 '_days_in_year', '_abortion_fraction', 't_differentiation')
+
     def __init__(self, container=None):
 
+        # components - here only a stalk, see "reset"
+        self.stalk = self._stalk_class(potential_mass=0)
+        self.components = [self.stalk]
+
+        self.reset(container=container)
+
+    def reset(self, container=None):
+        """ (Re-)initializes the cohort, keeping the stalk object.
+
+        Allows re-using the cohort objects, see "CohortPool".
+        """
+
         # the container keeps track of the cohorts
         self._container = container
 
         # state
         self.num_inflorescences = 1
 
+        # the days of initiation represented (> dt if lumped)
+        self._span = 1
+
         # for prototyping only
         self.t_maturity_ = 1200
         self._female_fraction = 0.9
         self._days_in_year = 365
 
         # components - here only a stalk
-        self.stalk = Stalk(self)
+        self.stalk.__init__(self)
 
         # in days after frond initiation
         self.age = 0
@@ -350,11 +384,6 @@ class Indeterminate(Cohort):
 
         return res_DM
 
-    @property
-    def components(self):
-        """ The sub-organs. """
-        return [self.stalk]
-
     @property
     def female_fraction(self):
         """ Fraction female at sex determination (1). """
@@ -365,20 +394,26 @@ class Indeterminate(Cohort):
         else:
             return self._container.female_fraction
 
-    def to_male(self):
+    def to_male(self, cohort=None):
         """ Returns the associated male inflorescence cohort after sex determination.
 
         Conceptually converts the indeterminate to a male inflorescence.
+        A (deleted) male cohort can be passed in for re-use.
         """
 
-        cohort = Male(self._container,
-                      potential_mass=self.potential_mass,
-                      t_maturity=self._t_maturity)
+        if cohort is None:
+            cohort = self._male_class(self._container,
+                                      potential_mass=self.potential_mass,
+                                      t_maturity=self._t_maturity)
+        else:
+            cohort.reset(self._container,
+                         potential_mass=self.potential_mass,
+                         t_maturity=self._t_maturity)
 
-        cohort.stalk = self.stalk.copy()
+        self.stalk.copy(into=cohort.stalk)
         cohort.stalk._cohort = cohort
-        cohort.components = [cohort.stalk]
         cohort.age = self.age
+        cohort._span = self._span
 
         # fractionality
         f = 1 - self.female_fraction
@@ -389,21 +424,27 @@ class Indeterminate(Cohort):
 
         return cohort
 
-    def to_female(self):
+    def to_female(self, cohort=None):
         """ Returns the associated female inflorescence cohort after sex determination.
 
         Conceptually converts the indeterminate to a female inflorescence.
+        A (deleted) female cohort can be passed in for re-use.
         """
 
-        cohort = Female(self._container,
-                        potential_mass=self.potential_mass,
-                        t_maturity=self._t_maturity)
+        if cohort is None:
+            cohort = self._female_class(self._container,
+                                        potential_mass=self.potential_mass,
+                                        t_maturity=self._t_maturity)
+        else:
+            cohort.reset(self._container,
+                         potential_mass=self.potential_mass,
+                         t_maturity=self._t_maturity)
 
         # Pass on cohort mean organ state/components
-        cohort.stalk = self.stalk.copy()
+        self.stalk.copy(into=cohort.stalk)
         cohort.stalk._cohort = cohort
-        cohort.components = [cohort.stalk]
         cohort.age = self.age
+        cohort._span = self._span
 
         # fractionality
         f = self.female_fraction
@@ -414,6 +455,29 @@ class Indeterminate(Cohort):
 
         return cohort
 
+    def merge(self, other):
+        """ Lumps another indeterminate cohort into this cohort.
+
+        The number of inflorescences and the total mass are conserved,
+        the age and the mean bunch components follow from the
+        average weighted by the number of inflorescences.
+        """
+
+        N = self.num_inflorescences + other.num_inflorescences
+
+        if N > 0:
+            w = other.num_inflorescences / N
+        else:
+            w = 0
+
+        self.age = (1 - w) * self.age + w * other.age
+
+        for component, other_component in zip(self.components, other.components):
+            component.merge(other_component, weight=w)
+
+        self.num_inflorescences = N
+        self._span += other._span
+
     @property
     def is_deletable(self):
         """ When to delete this cohort? (bool)
@@ -510,16 +574,46 @@ class Female(Cohort):
     _prefix = 'female'
     sex = 'female'
 
+    __slots__ = ('components', 'potential_mass', 'has_flowered', 't_maturity',
+                 't_anthesis', 'inflorescence_abortion_t0',
+                 'inflorescence_abortion_dt', 'inflorescence_abortion_t1',
+                 'bunch_failure_t0', 'bunch_failure_dt', 'bunch_failure_t1',
+                 'mesocarp_oil', 'mesocarp_fibers', 'kernel', '_fruit',
+                 '_stress_index_')
+
     def __init__(self, container=None, potential_mass=0, t_maturity=1200):
 
+        # components - see "reset"
+        self.stalk = self._stalk_class(potential_mass=0)
+        self.components = [self.stalk]
+
+        # the fruit components of a previous life - see "set_fruit"
+        self._fruit = None
+
+        self.reset(container=container,
+                   potential_mass=potential_mass,
+                   t_maturity=t_maturity)
+
+    def reset(self, container=None, potential_mass=0, t_maturity=1200):
+        """ (Re-)initializes the cohort, keeping the bunch component objects.
+
+        Allows re-using the cohort objects, see "CohortPool".
+        """
+
         self._container = container
 
         # state
         self.num_inflorescences = 1
         self.potential_mass = potential_mass
+        self._span = 1
 
-        self.stalk = Stalk(self)
-        self.components = [self.stalk]
+        self.stalk.__init__(self)
+        del self.components[1:]
+
+        # set upon flowering - see "set_fruit"
+        self.mesocarp_oil = None
+        self.mesocarp_fibers = None
+        self.kernel = None
 
         # in days after frond initiation
         self.age = 0
@@ -555,10 +649,10 @@ class Female(Cohort):
 
 #~~~~~~~~~~~~~~~~
 
-    def update(self, dt=1):
+    def update(self, dt=1, abortion_fraction=None):
         """ Update the cohort by dt days. """
 
-        self._update(dt=dt)
+        self._update(dt=dt, abortion_fraction=abortion_fraction)
 
         if self.should_trigger_flowering:
             self.set_fruit()
@@ -600,12 +694,15 @@ class Female(Cohort):
     @property
     def _inflorescence_abortion_fraction(self):
         """ The inflorescence abortion fraction (1/day). """
+        return self.calc_inflorescence_abortion_fraction(self._stress_index)
 
-        x = self._stress_index
+    @classmethod
+    def calc_inflorescence_abortion_fraction(cls, x):
+        """ The inflorescence abortion fraction (1/day) at stress index x. """
 
-        a = self.parameters['stress_inflorescence_abortion_asymptote']['value']
-        s = self.parameters['stress_inflorescence_abortion_increase']['value']
-        x0 = self.parameters['stress_inflorescence_abortion_x0']['value']
+        a = cls.parameters['stress_inflorescence_abortion_asymptote']['value']
+        s = cls.parameters['stress_inflorescence_abortion_increase']['value']
+        x0 = cls.parameters['stress_inflorescence_abortion_x0']['value']
 
         res = 1 - (1 / exp(a * x))
         #res = 1-((1-a)/(1+exp(s*x-x0))+a) -(1-((1-a)/(1+exp(s*0-x0))+a))
@@ -636,12 +733,15 @@ class Female(Cohort):
     @property
     def _bunch_failure_fraction(self):
         """ The bunch failure fraction (1/day). """
+        return self.calc_bunch_failure_fraction(self._stress_index)
 
-        x = self._stress_index
+    @classmethod
+    def calc_bunch_failure_fraction(cls, x):
+        """ The bunch failure fraction (1/day) at stress index x. """
 
-        a = self.parameters['stress_bunch_failure_asymptote']['value']
-        s = self.parameters['stress_bunch_failure_increase']['value']
-        x0 = self.parameters['stress_bunch_failure_x0']['value']
+        a = cls.parameters['stress_bunch_failure_asymptote']['value']
+        s = cls.parameters['stress_bunch_failure_increase']['value']
+        x0 = cls.parameters['stress_bunch_failure_x0']['value']
 
         res = 1 - (exp(-a * x))
         #res = 1-((1-a)/(1+exp(s*x-x0))+a) -(1-((1-a)/(1+exp(s*0-x0))+a))
@@ -664,19 +764,17 @@ class Female(Cohort):
         
         """
 
-        self.mesocarp_oil = MesocarpOil(self,
-                                        age=self.age,
-                                        t_maturity=self.t_maturity)
+        if self._fruit is None:
 
-        self.mesocarp_fibers = MesocarpFibers(self,
-                                              age=self.age,
-                                              t_maturity=self.t_maturity)
+            self._fruit = tuple(kls(potential_mass=0) for kls in self._fruit_classes)
 
-        self.kernel = Kernels(self, age=self.age, t_maturity=self.t_maturity)
+        # (re-)initialize in place
+        for component in self._fruit:
+            component.__init__(self, age=self.age, t_maturity=self.t_maturity)
 
-        self.components = [
-            self.stalk, self.mesocarp_fibers, self.mesocarp_oil, self.kernel
-        ]
+        self.mesocarp_fibers, self.mesocarp_oil, self.kernel = self._fruit
+
+        self.components.extend(self._fruit)
 
         self.has_flowered = True
 
@@ -714,8 +812,25 @@ class Male(Cohort):
     _prefix = 'male'
     sex = 'male'
 
+    __slots__ = ('components', 'potential_mass', 'has_flowered', 't_maturity',
+                 '_abortion_fraction')
+
     def __init__(self, container=None, potential_mass=0, t_maturity=1200):
 
+        # components - see "reset"
+        self.stalk = self._stalk_class(potential_mass=0)
+        self.components = [self.stalk]
+
+        self.reset(container=container,
+                   potential_mass=potential_mass,
+                   t_maturity=t_maturity)
+
+    def reset(self, container=None, potential_mass=0, t_maturity=1200):
+        """ (Re-)initializes the cohort, keeping the stalk object.
+
+        Allows re-using the cohort objects, see "CohortPool".
+        """
+
         self._container = container
 
         # state
@@ -726,10 +841,10 @@ class Male(Cohort):
 
         self.potential_mass = potential_mass
         self.num_inflorescences = 1
+        self._span = 1
 
         # components
-        self.stalk = Stalk(self)
-        self.components = [self.stalk]
+        self.stalk.__init__(self)
 
         # in days after frond initiation
         self.age = 0
@@ -748,3 +863,9 @@ class Male(Cohort):
     def is_deletable(self):
         """ When to delete this cohort? (bool) - (metabolically inactive) """
         return self.age > self.t_maturity
+
+
+# the related cohort classes (see "Cohort._stalk_class")
+Indeterminate._female_class = Female
+Indeterminate._male_class = Male
+Female._fruit_classes = (MesocarpFibers, MesocarpOil, Kernels)
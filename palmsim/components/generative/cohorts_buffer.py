@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+''' Age-ordered storage of the inflorescence cohorts. '''
+
+from math import ceil
+from itertools import islice
+
+
+class CohortBuffer(object):
+    """ An age-ordered ring buffer of inflorescence cohorts.
+
+    One slot is taken per time-step, the slots are ordered by age
+    (oldest first). A slot holds the indeterminate cohort initiated
+    at that time-step or - after sex differentiation - the associated
+    female and male cohort.
+
+    Cohorts leave the buffer in (roughly) age order:
+
+        - Male's past maturity age
+        - Female's past harvestible age
+
+    so removal happens at the head of the buffer and new cohorts
+    are added at the tail; both in amortized O(1).
+
+    Iterating over the buffer gives the cohorts in the same order as
+    the list-based bookkeeping did: oldest first, per slot the female
+    before the male.
+
+    Notes
+    -----
+    The capacity follows from the maximum duration of bunch development
+    and the time-step, see "capacity_for". In case the capacity turns out
+    to be too small (e.g. after changing the parameters) the buffer grows.
+
+    Examples
+    --------
+    >>> buffer = CohortBuffer(capacity=4)
+    >>> buffer.append(Indeterminate())
+    >>> len(buffer)
+    1
+    """
+
+    def __init__(self, capacity=16):
+
+        capacity = max(1, int(capacity))
+
+        # the female or indeterminate cohort of a slot
+        self._primary = [None] * capacity
+
+        # the male cohort of a slot (if differentiated)
+        self._secondary = [None] * capacity
+
+        # position of the oldest slot and the number of slots in use
+        self._head = 0
+        self._size = 0
+
+        # number of leading slots that have been differentiated
+        self._differentiated = 0
+
+        # number of cohorts
+        self._count = 0
+
+    @staticmethod
+    def capacity_for(max_age, dt=1):
+        """ The number of slots needed to hold cohorts up to max_age (days). """
+        return int(ceil(max_age / max(1, dt))) + 2
+
+    @property
+    def capacity(self):
+        """ The number of slots. """
+        return len(self._primary)
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+
+        primary = self._primary
+        secondary = self._secondary
+        capacity = len(primary)
+
+        i = self._head
+
+        for _ in range(self._size):
+
+            first = primary[i]
+            if first is not None:
+                yield first
+
+            second = secondary[i]
+            if second is not None:
+                yield second
+
+            i += 1
+            if i == capacity:
+                i = 0
+
+    def __getitem__(self, index):
+        """ The cohort(s) at index in the age order, see "__iter__".
+
+        The slots are visited from the nearest end of the buffer.
+        """
+
+        if isinstance(index, slice):
+            (start, stop, step) = index.indices(self._count)
+            if step > 0:
+                return list(islice(self, start, stop, step))
+            return [self[i] for i in range(start, stop, step)]
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError('cohort index out of range')
+
+        primary = self._primary
+        secondary = self._secondary
+        capacity = len(primary)
+
+        if index < self._count // 2:
+
+            i = self._head
+
+            while True:
+
+                for cohort in (primary[i], secondary[i]):
+                    if cohort is not None:
+                        if index == 0:
+                            return cohort
+                        index -= 1
+
+                i = (i + 1) % capacity
+
+        else:
+
+            # the position from the youngest cohort
+            index = self._count - 1 - index
+
+            i = (self._head + self._size - 1) % capacity
+
+            while True:
+
+                for cohort in (secondary[i], primary[i]):
+                    if cohort is not None:
+                        if index == 0:
+                            return cohort
+                        index -= 1
+
+                i = (i - 1) % capacity
+
+    @property
+    def tail(self):
+        """ The youngest cohort, if not yet differentiated (else None). """
+
+        if self._differentiated < self._size:
+            i = (self._head + self._size - 1) % len(self._primary)
+            return self._primary[i]
+        else:
+            return None
+
+    #~~~~~~~~~~~~~~~~
+
+    def _grow(self):
+        """ Doubles the capacity, keeping the age order. """
+
+        capacity = len(self._primary)
+        order = [(self._head + k) % capacity for k in range(self._size)]
+
+        padding = [None] * (2 * capacity - self._size)
+
+        self._primary = [self._primary[i] for i in order] + padding
+        self._secondary = [self._secondary[i] for i in order] + list(padding)
+        self._head = 0
+
+    def append(self, cohort):
+        """ Adds a new (youngest) cohort at the tail of the buffer. """
+
+        if self._size == len(self._primary):
+            self._grow()
+
+        i = (self._head + self._size) % len(self._primary)
+
+        self._primary[i] = cohort
+        self._secondary[i] = None
+
+        self._size += 1
+        self._count += 1
+
+    def differentiate(self, pool=None):
+        """ Splits the indeterminate cohorts due for sex differentiation.
+
+        The oldest indeterminate cohorts are the first to differentiate,
+        thus only the slots just after the differentiated ones are visited.
+        The split is done in place: the female takes the place of the
+        indeterminate cohort and the male is stored alongside.
+
+        Given a pool (CohortPool) the female and male cohort objects are
+        taken from it, and the indeterminate cohorts are returned to it.
+        """
+
+        capacity = len(self._primary)
+        primary = self._primary
+        secondary = self._secondary
+
+        while self._differentiated < self._size:
+
+            i = (self._head + self._differentiated) % capacity
+            cohort = primary[i]
+
+            if cohort is None:
+                self._differentiated += 1
+
+            elif cohort.age > cohort.t_differentiation:
+
+                if pool is None:
+                    primary[i] = cohort.to_female()
+                    secondary[i] = cohort.to_male()
+                else:
+                    primary[i] = cohort.to_female(pool.get('female'))
+                    secondary[i] = cohort.to_male(pool.get('male'))
+                    pool.put(cohort)
+
+                self._differentiated += 1
+                self._count += 1
+
+            else:
+                break
+
+    def pop_deletable(self):
+        """ Removes the deletable cohorts at the head of the buffer.
+
+        Returns
+        -------
+        The removed cohorts, in age order (oldest first).
+
+        Notes
+        -----
+        The visit stops at the first slot of which all cohorts are alive;
+        a male can outlive its female counterpart by a time-step, such a
+        partly emptied slot does not stop the visit.
+        """
+
+        removed = []
+
+        capacity = len(self._primary)
+        primary = self._primary
+        secondary = self._secondary
+
+        for k in range(self._size):
+
+            i = (self._head + k) % capacity
+
+            first = primary[i]
+            second = secondary[i]
+
+            # a differentiated slot of which one of the pair was removed earlier
+            alive = (first is not None) and \
+                    (second is not None or k >= self._differentiated)
+
+            if first is not None and first.is_deletable:
+                removed.append(first)
+                primary[i] = None
+                alive = False
+
+            if second is not None and second.is_deletable:
+                removed.append(second)
+                secondary[i] = None
+                alive = False
+
+            if alive:
+                break
+
+        self._count -= len(removed)
+
+        # drop the emptied slots at the head
+        while self._size > 0:
+
+            i = self._head
+
+            if primary[i] is None and secondary[i] is None:
+
+                self._head = (i + 1) % capacity
+                self._size -= 1
+
+                if self._differentiated > 0:
+                    self._differentiated -= 1
+
+            else:
+                break
+
+        return removed
+
+
+class CohortPool(object):
+    """ Deleted cohort objects, kept for re-use.
+
+    In the steady state as many cohorts are deleted as are initiated
+    (and differentiated), re-using the deleted cohort objects saves
+    allocating new ones - and their bunch components - every time-step.
+
+    Notes
+    -----
+    A cohort put in the pool should no longer be referenced elsewhere,
+    it is re-initialized upon re-use (see e.g. "Female.reset").
+
+    Examples
+    --------
+    >>> pool = CohortPool()
+    >>> pool.put(Indeterminate())
+    >>> pool.get('indeterminate')
+    """
+
+    def __init__(self):
+
+        self._spare = {'indeterminate': [], 'female': [], 'male': []}
+
+    def __len__(self):
+        return sum(len(x) for x in self._spare.values())
+
+    def get(self, sex):
+        """ A spare cohort of the sex, None if there is none. """
+
+        spare = self._spare[sex]
+
+        if spare:
+            return spare.pop()
+        else:
+            return None
+
+    def put(self, cohort):
+        """ Keeps a deleted cohort for re-use. """
+        self._spare[cohort.sex].append(cohort)
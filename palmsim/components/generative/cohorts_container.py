@@ -6,9 +6,12 @@
 from ..helpers import add_dumps
 from ..helpers import sigmoid
 
-from .cohorts import Indeterminate
+from .cohorts import Indeterminate, Female
+from .cohorts_buffer import CohortBuffer, CohortPool
+from .harvest_ledger import HarvestLedger
 
 import yaml
+import numpy as np
 
 from math import exp
 
@@ -143,22 +146,43 @@ class Cohorts(object):
 
     _prefix = 'generative'
 
-    def __init__(self,palm=None):
+    # the cohort classes; replaced in the classes bound to
+    # a parameter set, see "ParameterSet"
+    _indeterminate_class = Indeterminate
+    _female_class = Female
+
+    def __init__(self,palm=None,lumping_width=0):
 
-        self.cohorts = []
         self._palm = palm
 
+        # width (days) of the age classes in which new cohorts are lumped
+        # - no lumping if not larger than dt
+        self._lumping_width = lumping_width or 0
+
+        # days since the age class of the youngest cohort was opened
+        self._lumping_age = 0
+
+        # age-ordered - oldest first
+        self.cohorts = CohortBuffer(capacity=self._cohort_capacity)
+
+        # deleted cohorts for re-use
+        self._pool = CohortPool()
+
         # rate
         self._assim_growth = 0
         self.assim_growth = 0
         self.potential_sink_strength = 0
+        self._maintenance_requirement = 0
         self._initiation_rate = 0
 
-        # pool of cohorts marked for deletion
-        self.to_delete = []
+        # all harvest events, and the index of the record of the
+        # last harvest (None if none yet, or if only empty cohorts matured)
+        self.harvest_ledger = HarvestLedger()
+        self._last_harvest = None
 
-        # harvested cohorts
-        self._bunches = []
+        # the female cohorts and their abortion/failure windows
+        # - see "_get_abortion_windows"
+        self._abortion_windows = None
 
     @property
     def t_maturity(self):
@@ -177,6 +201,12 @@ class Cohorts(object):
 
         return maturity
 
+    @property
+    def _cohort_capacity(self):
+        """ The number of time-steps a cohort lives at most (1). """
+        a0 = self.parameters['bunch_development_asymptote_t0']['value']
+        return CohortBuffer.capacity_for(max_age=a0, dt=self._dt)
+
     @property
     def _dt(self):
         if self._palm is None:
@@ -219,6 +249,14 @@ class Cohorts(object):
         else:
             return self._palm.MAP
 
+    @property
+    def _date(self):
+        """ The current date (None if standalone). """
+        if self._palm is None:
+            return None
+        else:
+            return self._palm.time
+
     @property
     def _YAP(self):
         if self._palm is None:
@@ -240,8 +278,11 @@ class Cohorts(object):
 
     @property
     def maintenance_requirement(self):
-        """ The generative maintenance requirement (kg_CH2O/ha/day). """
-        return sum([x.maintenance_requirement * x.num_inflorescences for x in self.cohorts])
+        """ The generative maintenance requirement (kg_CH2O/ha/day).
+
+        Set upon update, see "_aggregate".
+        """
+        return self._maintenance_requirement
 
     ###############
     # Sink-strength
@@ -310,21 +351,85 @@ class Cohorts(object):
         #   - Female's past harvestible age
         #   - Empty cohorts (num_inflorescences ~= 0)
 
-        harvest = [x for x in self._females if x.is_harvestible]
+        deleted = self.cohorts.pop_deletable()
+
+        harvest = [x for x in deleted if x.sex == 'female' and x.is_harvestible]
 
-        # take the youngest cohort as being representative
         if harvest:
-            last_cohort = harvest[0]
-            self._bunches = [last_cohort]
+            self.record_harvest(harvest)
 
-        self.cohorts = [x for x in self.cohorts if not x.is_deletable]
+        for cohort in deleted:
+            self._pool.put(cohort)
 
         # Potential/relative SS is independent of RSS
         # Potential determines realized SS thus should be set
         # before calculating realized SS.
-        self.potential_sink_strength = self.get_potential_sink_strength()
+        #
+        # The abortion windows are used by the abortion diagnostics
+        # and the next update.
+        aggregates = self._aggregate()
+
+        self.potential_sink_strength = aggregates[0]
+        self._maintenance_requirement = aggregates[1]
+        self._abortion_windows = aggregates[2]
+
         self.set_relative_sink_strengths()
 
+    def record_harvest(self, harvest):
+        """ Adds the harvested female cohorts to the harvest ledger.
+
+        The harvest outputs (e.g. "FFB_production") follow from the
+        record, until the next harvest.
+        """
+
+        span = max(self._dt, sum([x._span for x in harvest]))
+
+        recorded = self.harvest_ledger.record(
+            date=self._date,
+            bunches=harvest,
+            FM_to_DM_ratio=self.parameters['bunch_FM_to_DM_ratio']['value'],
+            span=span)
+
+        if recorded:
+            self._last_harvest = len(self.harvest_ledger) - 1
+        else:
+            self._last_harvest = None
+
+    def _aggregate(self):
+        """ Collects in a single pass over the cohorts:
+
+            - the total potential sink strength (kg_CH2O/ha/day)
+            - the maintenance requirement (kg_CH2O/ha/day)
+            - the abortion windows, see "_get_abortion_windows"
+        """
+
+        potential_sink_strength = 0
+        maintenance_requirement = 0
+
+        females = []
+        windows = []
+
+        for x in self.cohorts:
+
+            potential_sink_strength += x.cohort_sink_strength
+            maintenance_requirement += x.maintenance_requirement * x.num_inflorescences
+
+            if x.sex == 'female':
+                females.append(x)
+                windows.append((x.age,
+                                x.inflorescence_abortion_t0,
+                                x.inflorescence_abortion_t1,
+                                x.bunch_failure_t0,
+                                x.bunch_failure_t1))
+
+        age, t0, t1, t2, t3 = np.array(windows, dtype=float).reshape(-1, 5).T
+
+        in_abortion = (age >= t0) & (age < t1)
+        in_failure = (age >= t2) & (age < t3)
+
+        return (potential_sink_strength, maintenance_requirement,
+                (females, in_abortion, in_failure))
+
     def set_relative_sink_strengths(self):
         """ Sets the relative sink strengh of the cohorts. """
 
@@ -334,38 +439,66 @@ class Cohorts(object):
             cohort.set_relative_sink_strength()
 
     def update_existing_cohorts(self,dt):
-        """ Updates the existing cohorts. """
-        for cohort in self.cohorts:
-            cohort.update(dt=dt)
+        """ Updates the existing cohorts.
 
-    def update_sex(self):
-        """ Updates the cohorts by applying sex differentiation. """
+        The abortion fractions of the female cohorts are calculated
+        at once, see "_get_abortion_fractions".
+        """
 
-        cohorts_ = []
+        females, abortion, failure = self._get_abortion_fractions()
+        fractions = (abortion + failure).tolist()
 
+        # (a female cohort added since, falls back to its own fraction)
+        k = 0
         for cohort in self.cohorts:
+            if k < len(females) and cohort is females[k]:
+                cohort.update(dt=dt, abortion_fraction=fractions[k])
+                k += 1
+            else:
+                cohort.update(dt=dt)
+
+        # the ages changed
+        self._abortion_windows = None
 
-            if (cohort.sex == 'indeterminate') \
-                    and (cohort.age > cohort.t_differentiation):
+    def update_sex(self):
+        """ Updates the cohorts by applying sex differentiation.
 
-                f = cohort.to_female()
-                m = cohort.to_male()
+        Differentiation is done in place, the female and male
+        cohort take the age slot of the indeterminate cohort.
+        Deleted cohort objects are re-used.
+        """
+        self.cohorts.differentiate(pool=self._pool)
 
-                cohorts_.append(f)
-                cohorts_.append(m)
+    def update_new_cohorts(self,dt=1):
+        """ Introduces a new indeterminate cohort.
 
-            else:
-                cohorts_.append(cohort)
+        In case of lumping the new cohort is merged into the youngest cohort,
+        as long as the age class of the latter is still open.
+        """
 
-        self.cohorts = cohorts_
+        new_cohort = self._pool.get('indeterminate')
 
-    def update_new_cohorts(self,dt=1):
-        # introduce new cohorts
+        if new_cohort is None:
+            new_cohort = self._indeterminate_class(container=self)
+        else:
+            new_cohort.reset(container=self)
 
-        new_cohort = Indeterminate(container=self)
         new_cohort.num_inflorescences = self.initiation_rate*dt
+        new_cohort._span = dt
+
+        youngest = self.cohorts.tail
 
-        self.cohorts.append(new_cohort)
+        if (youngest is not None) and (self._lumping_age + dt <= self._lumping_width):
+
+            youngest.merge(new_cohort)
+            self._lumping_age += dt
+
+            self._pool.put(new_cohort)
+
+        else:
+
+            self.cohorts.append(new_cohort)
+            self._lumping_age = dt
 
     ################
     # Mass
@@ -380,10 +513,6 @@ class Cohorts(object):
     ##############
     # Cohort Sets
     ##############
-    @property
-    def __bunches(self):
-        return [x for x in self._females if x.is_harvestible]
-
     @property
     def _females(self):
         """ Female cohorts. """
@@ -403,33 +532,38 @@ class Cohorts(object):
     # Bunch details
     ###############
 
+    @property
+    def _harvest(self):
+        """ The ledger record of the last harvest (None if none). """
+        if self._last_harvest is None:
+            return None
+        else:
+            return self.harvest_ledger.records[self._last_harvest]
+
+    def _harvest_rate(self, field):
+        """ A field of the last harvest per day of initiation it represents. """
+
+        harvest = self._harvest
+
+        if harvest is None:
+            return 0
+        else:
+            return float(harvest[field] / harvest['span'])
+
     @property
     def CPO_production(self):
         """ (kg/ha/day). """
-        res = 0
-        for bunch in self._bunches:
-            res += bunch.num_inflorescences * bunch.mesocarp_oil.mass
-
-        return res/self._dt
+        return self._harvest_rate('oil')
 
     @property
     def PKO_production(self):
         """ (kg/ha/day). """
-        res = 0
-        for bunch in self._bunches:
-            res += bunch.num_inflorescences * bunch.kernel.mass
-
-        return res/self._dt
+        return self._harvest_rate('kernel')
 
     @property
     def EFB_production(self):
         """ (kg/ha/day). """
-        res = 0
-        for bunch in self._bunches:
-            mass = bunch.stalk.mass + bunch.mesocarp_fibers.mass
-            res += bunch.num_inflorescences * mass
-
-        return res/self._dt
+        return self._harvest_rate('EFB')
 
     @property
     def FFB_production(self):
@@ -446,11 +580,8 @@ class Cohorts(object):
         """ (1/ha/day). """
 
         # harvestible number of bunches --- every dt days
-
-        N = sum([x.num_inflorescences for x in self._bunches])
-        dt = self._dt
-
-        return N/dt
+        # (the days of initiation they represent, if cohorts are lumped)
+        return self._harvest_rate('bunch_count')
 
     @property
     def bunch_count(self):
@@ -465,63 +596,109 @@ class Cohorts(object):
     def bunch_weight_dry(self):
         """ (kg_DM/bunch). """
 
-        if self._bunches:
-
-            total_mass = sum([x.mass * x.num_inflorescences for x in self._bunches])
-            nbunches = sum([x.num_inflorescences for x in self._bunches])
+        harvest = self._harvest
 
-            if nbunches == 0:
-                res = 0
-            else:
-                res = total_mass / nbunches
-
-            return res
-        else:
+        if harvest is None:
             return 0
+        else:
+            return float(harvest['bunch_weight_dry'])
 
     @property
     def bunch_weight(self):
         """ (kg_FM/bunch). """
 
-        c = self.parameters['bunch_FM_to_DM_ratio']['value']
+        harvest = self._harvest
 
-        return c * self.bunch_weight_dry
+        if harvest is None:
+            return 0
+        else:
+            return float(harvest['bunch_weight'])
 
     ##################
     # Abortion details
     ##################
 
-    @property
-    def inflorescence_abortion_fraction(self):
-        """ The mean of the non-zero values for the female cohorts (1). """
+    def _get_abortion_windows(self):
+        """ The female cohorts, and masks of whom is in the time window of
 
-        N = len(self._females)
-        if N > 0:
-            values = [x.inflorescence_abortion_fraction for x in self._females]
-            nzvalues = [x for x in values if x > 0]
-            M = len(nzvalues)
-            if M > 0:
-                return sum(nzvalues)/M
-            else:
-                return 0
+            - inflorescence abortion
+            - bunch failure
+
+        Note, the windows only change with age i.e. upon update.
+        """
+
+        females = self._females
+        N = len(females)
+
+        age = np.fromiter((x.age for x in females), float, N)
+
+        t0 = np.fromiter((x.inflorescence_abortion_t0 for x in females), float, N)
+        t1 = np.fromiter((x.inflorescence_abortion_t1 for x in females), float, N)
+
+        in_abortion = (age >= t0) & (age < t1)
+
+        t0 = np.fromiter((x.bunch_failure_t0 for x in females), float, N)
+        t1 = np.fromiter((x.bunch_failure_t1 for x in females), float, N)
+
+        in_failure = (age >= t0) & (age < t1)
+
+        return females, in_abortion, in_failure
+
+    def _get_abortion_fractions(self):
+        """ The female cohorts and their (1/day)
+
+            - inflorescence abortion fractions
+            - bunch failure fractions
+
+        Same as those of the cohorts themselves: within its time window
+        each cohort has the same fraction - given the stress index.
+        """
+
+        if self._abortion_windows is None:
+            self._abortion_windows = self._get_abortion_windows()
+
+        females, in_abortion, in_failure = self._abortion_windows
+
+        x = self.stress_index
+
+        female = self._female_class
+
+        if female.parameters['stress_inflorescence_abortion']['value'] != 1:
+            abortion = 0
+        elif in_abortion.any():
+            abortion = female.calc_inflorescence_abortion_fraction(x)
+        else:
+            abortion = 0
+
+        if female.parameters['stress_bunch_failure']['value'] != 1:
+            failure = 0
+        elif in_failure.any():
+            failure = female.calc_bunch_failure_fraction(x)
+        else:
+            failure = 0
+
+        return females, abortion * in_abortion, failure * in_failure
+
+    @staticmethod
+    def _nonzero_mean(values):
+        """ The mean of the non-zero values (0 if none). """
+        values = values[values > 0]
+        if len(values) > 0:
+            return float(values.mean())
         else:
             return 0
 
     @property
-    def bunch_failure_fraction(self):
+    def inflorescence_abortion_fraction(self):
         """ The mean of the non-zero values for the female cohorts (1). """
+        females, abortion, failure = self._get_abortion_fractions()
+        return self._nonzero_mean(abortion)
 
-        N = len(self._females)
-        if N > 0:
-            values = [x.bunch_failure_fraction for x in self._females]
-            nzvalues = [x for x in values if x > 0]
-            M = len(nzvalues)
-            if M > 0:
-                return sum(nzvalues)/M
-            else:
-                return 0
-        else:
-            return 0
+    @property
+    def bunch_failure_fraction(self):
+        """ The mean of the non-zero values for the female cohorts (1). """
+        females, abortion, failure = self._get_abortion_fractions()
+        return self._nonzero_mean(failure)
 
     ######################
     # Assimilation details
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+''' Record of the harvest events. '''
+
+import numpy as np
+import pandas as pd
+
+
+class HarvestLedger(object):
+    """ A growable record array of the harvest events.
+
+    One record is added per time-step at which bunches are harvested,
+    holding the harvest as a whole i.e. all female cohorts that reached
+    maturity during the time-step:
+
+        date             : the date of harvest
+        bunch_count      : the number of bunches (1/ha)
+        bunch_weight_dry : the mean bunch weight (kg_DM/bunch)
+        bunch_weight     : the mean bunch weight (kg_FM/bunch)
+        oil              : the mesocarp oil (kg_DM/ha)
+        kernel           : the kernels (kg_DM/ha)
+        EFB              : the empty fruit bunches; stalk and fibers (kg_DM/ha)
+        span             : the days of initiation the bunches represent (day)
+
+    Notes
+    -----
+    The harvest outputs of the container (e.g. "FFB_production") are
+    read from the last record; they repeat it at the time-steps without
+    a harvest. The ledger only holds the actual harvests: time-steps at
+    which only empty cohorts mature are left out (the outputs are zero).
+
+    The records are filled as the simulation runs; new records can be
+    streamed by keeping track of the number of records read
+
+        n = 0
+        for i in range(steps):
+            pf.update()
+            new = ledger.read(start=n)
+            n += len(new)
+
+    Examples
+    --------
+    >>> ledger = pf.generative.harvest_ledger
+    >>> ledger.records['bunch_count'].sum()
+    """
+
+    dtype = np.dtype([
+        ('date', 'datetime64[D]'),
+        ('bunch_count', 'f8'),
+        ('bunch_weight_dry', 'f8'),
+        ('bunch_weight', 'f8'),
+        ('oil', 'f8'),
+        ('kernel', 'f8'),
+        ('EFB', 'f8'),
+        ('span', 'f8'),
+    ])
+
+    units = {
+        'bunch_count': '1/ha',
+        'bunch_weight_dry': 'kg_DM',
+        'bunch_weight': 'kg',
+        'oil': 'kg_DM/ha',
+        'kernel': 'kg_DM/ha',
+        'EFB': 'kg_DM/ha',
+        'span': 'day',
+    }
+
+    def __init__(self, capacity=64):
+
+        self._records = np.zeros(max(1, int(capacity)), dtype=self.dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def records(self):
+        """ The harvest records - a view, oldest first. """
+        return self._records[:self._size]
+
+    def read(self, start=0):
+        """ The records from index start onwards (a view). """
+        return self._records[start:self._size]
+
+    def clear(self):
+        """ Removes all records. """
+        self._size = 0
+
+    def _grow(self):
+        """ Doubles the capacity. """
+
+        records = np.zeros(2 * len(self._records), dtype=self.dtype)
+        records[:self._size] = self._records[:self._size]
+
+        self._records = records
+
+    def record(self, date, bunches, FM_to_DM_ratio=1, span=1):
+        """ Adds the harvest of a time-step, returns whether it was added.
+
+        Input
+        -----
+        date: datetime or None
+            The date of harvest.
+        bunches: list
+            The harvested female cohorts.
+        FM_to_DM_ratio: float
+            The fresh to dry mass ratio of a bunch.
+        span: float
+            The days of initiation the bunches represent; dt, unless the
+            cohorts are lumped.
+        """
+
+        count = 0
+        mass = 0
+        oil = 0
+        kernel = 0
+        EFB = 0
+
+        for bunch in bunches:
+
+            n = bunch.num_inflorescences
+
+            count += n
+            mass += n * bunch.mass
+
+            if bunch.mesocarp_oil is not None:
+                oil += n * bunch.mesocarp_oil.mass
+                kernel += n * bunch.kernel.mass
+                EFB += n * (bunch.stalk.mass + bunch.mesocarp_fibers.mass)
+            else:
+                EFB += n * bunch.stalk.mass
+
+        # e.g. the empty cohorts initiated before the onset of production
+        if count <= 0:
+            return False
+
+        weight_dry = mass / count
+
+        if self._size == len(self._records):
+            self._grow()
+
+        rec = self._records[self._size]
+
+        rec['date'] = np.datetime64('NaT') if date is None else np.datetime64(date, 'D')
+        rec['bunch_count'] = count
+        rec['bunch_weight_dry'] = weight_dry
+        rec['bunch_weight'] = FM_to_DM_ratio * weight_dry
+        rec['oil'] = oil
+        rec['kernel'] = kernel
+        rec['EFB'] = EFB
+        rec['span'] = span
+
+        self._size += 1
+
+        return True
+
+    def to_dataframe(self):
+        """ The records as a data frame indexed by date. """
+
+        df = pd.DataFrame(self.records).set_index('date')
+        df.columns = ['{:} ({:})'.format(x, self.units[x]) for x in df.columns]
+
+        return df
@@ -8,6 +8,7 @@ import traceback
 
 from scipy import interpolate
 from math import exp, pi
+from functools import lru_cache
 
 def rad(deg):
     """ Convert from degrees to radials. """
@@ -62,6 +63,22 @@ def make_quadratic_function(x1,x2,A):
 
     return func
 
+def calc_quadratic_function(x,x1,x2,A):
+    """ Evaluates the quadratic function of "make_quadratic_function" at x.
+
+    Saves keeping a function (closure) around, e.g. per bunch component.
+    """
+
+    if x <= x1:
+        return 0
+    elif x >= x2:
+        return 0
+    else:
+        W = x2 - x1
+        h = 1.5*A/W
+        hw = .5*(x2-x1)
+        return max(0,-h*(x-x1)*(x-x2)/(hw)**2)
+
 def make_linear_function(x1,y1,x2,y2):
     """ Returns a linear function f(x) through (x1,y1) and (x2,y2). """
     c = (y2-y1)/(x2-x1)
@@ -165,9 +182,12 @@ def add_dumps(klass):
     decorations_to_add = {k:v for (k,v) in decorations if k not in dir(klass)}
     decorations_to_add['__repr__'] = __repr__
 
-    return type(klass.__name__,
-               (klass,),
-               decorations_to_add)
+    # decorate the class itself - a (dynamically created) sub-class
+    # would add an instance dict to classes using __slots__
+    for name, decoration in decorations_to_add.items():
+        setattr(klass, name, decoration)
+
+    return klass
 
 
 class Spline(object):
@@ -201,8 +221,23 @@ class Spline(object):
     >>> y = s.calc(x=5)
     >>> y
     10
+
+    or for many x at once:
+
+    >>> s.calc_array([5, 15])
+    array([10., 20.])
+
+    Notes
+    -----
+    The values of "calc" are memoized; in practice a spline is evaluated
+    at a few distinct values only (e.g. whole years after planting), the
+    first _max_values of them are kept. Splines can be shared, see
+    "get_spline".
     '''
 
+    # the maximum number of memoized values
+    _max_values = 1000
+
     def __init__(self,coords,k=3):
         '''
 
@@ -219,13 +254,47 @@ class Spline(object):
         self.k = k
         self.tck = interpolate.splrep(self.xs, self.ys, k = self.k)
 
+        self._values = {}
+
     def calc(self,x):
-        return float(interpolate.splev(x, self.tck))
+
+        try:
+            return self._values[x]
+        except KeyError:
+            y = float(interpolate.splev(x, self.tck))
+
+            if len(self._values) < self._max_values:
+                self._values[x] = y
+
+            return y
+
+    def calc_array(self,xs):
+        ''' The values for an array of x. '''
+        return interpolate.splev(np.asarray(xs, dtype=float), self.tck)
 
     def __repr__(self):
         return 'order: {:}\ncoords: {:}'.format(self.k,self.coords)
 
 
+def get_spline(coords,k=3):
+    ''' Returns the spline through coords of order k, shared process-wide.
+
+    E.g. all trunks (of all palm fields) with the same potential growth
+    rates share a single spline - and its memoized values. The most
+    recently used splines are kept (see "_get_spline"), so calibrations
+    varying the coordinates do not pile up splines.
+    '''
+
+    coords = tuple(tuple(float(v) for v in coord) for coord in coords)
+
+    return _get_spline(coords, k)
+
+
+@lru_cache(maxsize=256)
+def _get_spline(coords, k):
+    return Spline([list(coord) for coord in coords], k=k)
+
+
 def read_yaml(data):
     ''' Reads in a yaml data file either a path or the actual yaml-text.'''
     if isinstance(data,str):
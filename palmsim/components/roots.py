@@ -4,7 +4,7 @@
 import yaml
 
 from .helpers import add_dumps
-from .helpers import Spline
+from .helpers import get_spline
 ''' Provides the roots modelling. '''
 @add_dumps
 class Roots(object):
@@ -121,10 +121,7 @@ class Roots(object):
         mass_per_palm = self.initial_values['mass']['value']
         self.mass = self._planting_density * mass_per_palm
 
-        # convert potential growth rate values (pgr) to a pgr function
-        # - a (cubic: k=3) spline
-        pgrs = self.parameters['potential_growth_rates']['value']
-        self._potential_growth_rate_spline = Spline(pgrs, k=3)
+        self.set_derived_parameters()
 
         # only used for testing - e.g. to see if the roots grow
         # when supplied with assimilates.
@@ -132,6 +129,16 @@ class Roots(object):
 
     #~~~~~~~~~~~~~~
 
+    def set_derived_parameters(self):
+        ''' Sets the values derived from the parameters.
+
+        Converts the potential growth rate values (pgr) to a pgr function:
+        a (cubic: k=3) spline, shared by all instances with the same values.
+        Called again when the parameters are switched, see "ParameterSet.rebind".
+        '''
+        pgrs = self.parameters['potential_growth_rates']['value']
+        self._potential_growth_rate_spline = get_spline(pgrs, k=3)
+
     @property
     def _YAP(self):
         ''' Years after planting (year). '''
@@ -2,6 +2,7 @@
 ''' Provides the soil-water balance models. '''
 
 import yaml
+import numpy as np
 
 from math import exp
 from .helpers import add_dumps
@@ -186,6 +187,55 @@ class PTF(object):
         return self.water_content_FC - self.water_content_PWP
 
 
+# the soil texture classes, the texture code is the index in this list
+TEXTURE_CLASSES = list(PTF.parameter_library)
+
+PTF_PROPERTIES = [
+    'alpha', 'n', 'm', 'saturated_moisture_content',
+    'residual_moisture_content', 'water_content_FC', 'water_content_PWP',
+    'plant_available_water_content'
+]
+
+# see "get_ptf_table"
+_PTF_TABLE = {}
+
+
+def get_ptf_table():
+    """ The water retention properties of all soil texture classes.
+
+    Built once (upon first use) and shared, e.g. by all Soil instances.
+
+    Returns
+    -------
+    A dict of read-only arrays per property (see PTF_PROPERTIES),
+    indexed by texture code - see "get_texture_code".
+
+    Examples
+    --------
+    >>> table = get_ptf_table()
+    >>> codes = [get_texture_code(x) for x in ['clay loam', 'sand']]
+    >>> table['plant_available_water_content'][codes]
+    """
+
+    if not _PTF_TABLE:
+
+        ptfs = [PTF(x) for x in TEXTURE_CLASSES]
+
+        for key in PTF_PROPERTIES:
+
+            values = np.array([getattr(x, key) for x in ptfs])
+            values.flags.writeable = False
+
+            _PTF_TABLE[key] = values
+
+    return _PTF_TABLE
+
+
+def get_texture_code(texture_class):
+    """ The texture code (row in the PTF table) of a soil texture class. """
+    return TEXTURE_CLASSES.index(texture_class)
+
+
 @add_dumps
 class Soil(object):
     ''' '''
@@ -277,7 +327,7 @@ class Soil(object):
     @property
     def soil_texture_class_options(self):
         """ List of soil texture class options. """
-        return PTF.options
+        return list(TEXTURE_CLASSES)
 
     @property
     def soil_texture_class(self):
@@ -291,11 +341,13 @@ class Soil(object):
         # eg sandy loam, silty clay
         self._soil_texture_class = soil_texture_class
 
-        # the associated pedo-transfer-function
-        ptf = PTF(soil_texture_class)
+        # the associated pedo-transfer-function (shared table)
+        code = get_texture_code(soil_texture_class)
+        table = get_ptf_table()
 
         # m3/m3
-        self._plant_available_water_content = ptf.plant_available_water_content
+        self._plant_available_water_content = float(
+            table['plant_available_water_content'][code])
 
     #~~~~~~~~~~~~~~~~
 
@@ -331,15 +383,25 @@ class Soil(object):
     #~~~~~~~~~~~~~~~~
 
     def update(self, dt=1):
-        ''' Update by dt days. '''
+        ''' Update by dt days.
 
-        for i in range(dt):
-            self._update(dt=1)
+        Same as dt daily steps of the water balance (see
+        "available_water_change_rate"): the drivers - rainfall, potential
+        ET and the water holding capacity - are fixed within a time-step,
+        so they are evaluated once and only the water balance itself is
+        stepped through day by day.
+        '''
+
+        P = self.rainfall
+        ET_potential = self.evapotranspiration_potential
+        AWC = self.water_holding_capacity
+
+        AW = self.available_water
 
-    def _update(self, dt=1):
-        ''' Update by dt days. '''
+        for i in range(dt):
+            AW += self.calc_available_water_change_rate(AW, P, ET_potential, AWC)
 
-        self.available_water += self.available_water_change_rate * dt
+        self.available_water = AW
 
     #~~~~~~~~~~~~~~~~
 
@@ -353,9 +415,21 @@ class Soil(object):
             d/dt(AW) = P - ET - D
         '''
 
-        P = self.rainfall
-        ET = self.evapotranspiration
-        D = self.drainage
+        return self.calc_available_water_change_rate(
+            self.available_water, self.rainfall,
+            self.evapotranspiration_potential, self.water_holding_capacity)
+
+    def calc_available_water_change_rate(self, AW, P, ET_potential, AWC):
+        ''' The rate with which the water held changes (mm/day), given
+
+            - the available water AW (mm)
+            - the rainfall P (mm/day)
+            - the potential evapotranspiration (mm/day)
+            - the water holding capacity AWC (mm)
+        '''
+
+        ET = self.calc_relative_evapotranspiration(AW / AWC) * ET_potential
+        D = self.calc_drainage(AW, P, ET, AWC)
 
         return P - ET - D
 
@@ -475,10 +549,18 @@ class Soil(object):
         P = self.rainfall
         ET = self.evapotranspiration
 
-        AW_potential = AW + (P - ET)
-
         AWC = self.water_holding_capacity
 
+        return self.calc_drainage(AW, P, ET, AWC)
+
+    @staticmethod
+    def calc_drainage(AW, P, ET, AWC):
+        ''' The drainage rate (mm/day) given the available water, rainfall,
+        evapotranspiration and water holding capacity, see "drainage".
+        '''
+
+        AW_potential = AW + (P - ET)
+
         # any AW > AWC := drainage
         D_potential = AW_potential - AWC
 
@@ -4,7 +4,7 @@
 import yaml
 
 from .helpers import add_dumps
-from .helpers import Spline
+from .helpers import get_spline
 
 from math import exp
 
@@ -146,10 +146,7 @@ class Trunk(object):
         self.mass = self._planting_density * mass_per_palm
         self.lignified_mass = 0
 
-        # convert potential growth rate values (pgr) to a pgr function
-        # - a (cubic: k=3) spline
-        pgrs = self.parameters['potential_growth_rates']['value']
-        self._potential_growth_rate_spline = Spline(pgrs, k=3)
+        self.set_derived_parameters()
 
         # only used for testing - e.g. to see that the trunks grow
         # when supplied with assimilates
@@ -157,6 +154,16 @@ class Trunk(object):
 
     #~~~~~~~~~~~~~~
 
+    def set_derived_parameters(self):
+        ''' Sets the values derived from the parameters.
+
+        Converts the potential growth rate values (pgr) to a pgr function:
+        a (cubic: k=3) spline, shared by all instances with the same values.
+        Called again when the parameters are switched, see "ParameterSet.rebind".
+        '''
+        pgrs = self.parameters['potential_growth_rates']['value']
+        self._potential_growth_rate_spline = get_spline(pgrs, k=3)
+
     @property
     def _planting_density(self):
         ''' Planting density (1/ha). '''
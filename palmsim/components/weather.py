@@ -14,6 +14,11 @@ PI = pi
 
 SECONDS_PER_DAY = 24*60*60
 
+# the sine of the solar height (mean, amplitude) by
+# (day of year, days in year, latitude, tilt of the earth),
+# shared by all the weather instances
+_SOLAR_HEIGHTS = {}
+
 @add_dumps
 class Weather(object):
     """ Weather related logic.
@@ -280,8 +285,22 @@ class Weather(object):
         self.update()
 
     def set_sine_solar_height(self):
-        self.sine_solar_height_mean = self.calc_sine_solar_height_mean()
-        self.sine_solar_height_amplitude = self.calc_sine_solar_height_amplitude()
+
+        key = (self._DOY, self._palm._days_in_year, self._latitude,
+               self.parameters['tilt_of_earth']['value'])
+
+        try:
+            solar_height = _SOLAR_HEIGHTS[key]
+        except KeyError:
+            solar_height = (self.calc_sine_solar_height_mean(),
+                            self.calc_sine_solar_height_amplitude())
+            _SOLAR_HEIGHTS[key] = solar_height
+
+        (self.sine_solar_height_mean,
+         self.sine_solar_height_amplitude) = solar_height
+
+        # computed on first use, see "radiation_extraterrestrial_daily"
+        self._radiation_extraterrestrial_daily = None
 
     def _set_DOY(self):
 
@@ -292,6 +311,18 @@ class Weather(object):
         self._set_DOY()
         self.set_sine_solar_height()
 
+    def copy_series(self, weather):
+        """ Takes over the time-series of another weather.
+
+        The time-series are shared, not copied - e.g. to couple the weather
+        of a site to many palm fields without converting the series each time.
+        """
+
+        for name in ['radiation', 'rainfall', 'humidity', 'temperature', 'windspeed']:
+            for attr in ['_{:}_series', '_{:}_series_mean']:
+                attr = attr.format(name)
+                setattr(self, attr, getattr(weather, attr))
+
     @property
     def _date_tuple(self):
         if self._palm:
@@ -668,6 +699,15 @@ class Weather(object):
         See page 31 of the 2004 book by Goudriaan and Van Laar, equation 3.7.
 
         """
+        if self._radiation_extraterrestrial_daily is None:
+            self._radiation_extraterrestrial_daily = \
+                self.calc_radiation_extraterrestrial_daily()
+
+        return self._radiation_extraterrestrial_daily
+
+    def calc_radiation_extraterrestrial_daily(self):
+        """ See "radiation_extraterrestrial_daily", computed once per time-step. """
+
         d = self.daylength
         a = self.sine_solar_height_mean
         b = self.sine_solar_height_amplitude
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+''' Parameter grids run at several sites, sharded over processes and machines.
+
+The grid is generated in one go (see "sample_grid" and "full_grid"),
+duplicate parameter vectors are removed by hash, and each (vector, site)
+run is assigned to one of n shards by a hash of its key - so machines
+generating the same grid (e.g. given the seed) split the runs without
+talking to each other:
+
+    schema = ParameterSchema()
+    X = deduplicate(sample_grid(schema, 5000, rng=1), schema)
+
+    # on machine i of 4
+    run_grid(X, schema, sites, SQLiteStore('grid.sqlite'),
+             shard=i, n_shards=4, workers=32)
+
+or from the command line:
+
+    python -m palmsim.grid grid.sqlite --locations sites.csv --n 5000 --seed 1 \
+        --shard 0 --shards 4 --workers 32
+'''
+
+import hashlib
+import argparse
+import itertools
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .params import get_parameter_schema, apply_vector
+from .store import SQLiteStore, ParquetStore
+
+# the variation of the parameters: factors of the defaults (see
+# "full_sensitivity_analysis/1.ParametersGrid.R")
+VARIATION = (1.0, 0.8, 0.9, 1.1, 1.2)
+
+# parameters set to 1 minus another one, the fractions of the fronds
+COMPLEMENTS = {
+    'fronds.fraction_rachis': 'fronds.fraction_leaflets',
+}
+
+
+def grid_levels(schema, variation=VARIATION):
+    ''' The levels of the parameters of the schema, shape (d, levels). '''
+    return schema.defaults[:, None] * np.asarray(variation, dtype=float)[None, :]
+
+
+def _complement(X, schema):
+    """ Sets the complementary parameters of the rows of X (in place). """
+
+    for (name, other) in COMPLEMENTS.items():
+        if name in schema.names and other in schema.names:
+            X[:, schema.index(name)] = 1 - X[:, schema.index(other)]
+
+    return X
+
+
+def sample_grid(schema=None, n=5000, variation=VARIATION, rng=None):
+    ''' n parameter vectors, each parameter at a random level.
+
+    Input
+    -----
+    schema: ParameterSchema
+        The parameters, see "get_parameter_schema" if None.
+    n: int
+        The number of vectors.
+    variation: list
+        The levels, as factors of the defaults.
+    rng: int or np.random.Generator
+        The random generator (or its seed).
+
+    Returns
+    -------
+    The vectors, shape (n, len(schema)); may hold duplicates, see "deduplicate".
+
+    Notes
+    -----
+    The complementary parameters (see "COMPLEMENTS") follow the ones they
+    complement, so the frond fractions add up to 1.
+    '''
+
+    schema = schema or get_parameter_schema()
+
+    rng = np.random.default_rng(rng)
+
+    levels = grid_levels(schema, variation)
+
+    choice = rng.integers(0, levels.shape[1], size=(n, len(schema)))
+
+    X = levels[np.arange(len(schema))[None, :], choice]
+
+    return _complement(X, schema)
+
+
+def full_grid(schema=None, variation=VARIATION):
+    ''' All the combinations of the levels of the parameters.
+
+    Meant for a few parameters: levels ** d vectors.
+    '''
+
+    schema = schema or get_parameter_schema()
+
+    levels = grid_levels(schema, variation)
+
+    (d, k) = levels.shape
+
+    choice = np.indices((k,) * d).reshape(d, -1).T
+
+    X = levels[np.arange(d)[None, :], choice]
+
+    return _complement(X, schema)
+
+
+def deduplicate(X, schema):
+    ''' The distinct rows of X by their hash (see "ParameterSchema.hashes"), in order. '''
+
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+
+    (_, first) = np.unique(schema.hashes(X), return_index=True)
+
+    return X[np.sort(first)]
+
+
+def get_shard(key, n_shards):
+    ''' The shard (0 -- n_shards - 1) of a run key, the same on every machine. '''
+
+    digest = hashlib.sha256(key.encode()).digest()
+
+    return int.from_bytes(digest[:8], 'little') % n_shards
+
+
+# the sites and the schema of the worker processes
+_WORKER_STATE = None
+
+
+def _set_worker_state(sites, schema, outputs):
+    global _WORKER_STATE
+    _WORKER_STATE = (sites, schema, outputs)
+
+
+def _run_task(task):
+    """ The results and the harvest records of a (site name, vector) run, in a worker. """
+
+    (site_name, x) = task
+    (sites, schema, outputs) = _WORKER_STATE
+
+    site = sites[site_name]
+
+    pf = site.make_palm_field()
+    apply_vector(pf, x, schema)
+
+    df = pf.run(duration=site.duration)
+
+    if outputs is not None:
+        df = df[list(outputs)]
+
+    return df, pf.generative.harvest_ledger.records.copy()
+
+
+def run_grid(X, schema, sites, store, shard=0, n_shards=1, workers=1, outputs=None,
+             verbose=False):
+    ''' Runs the vectors (rows) of X at the sites, the runs of one shard.
+
+    The runs already in the store are skipped, so an interrupted shard is
+    resumed by running it again.
+
+    Input
+    -----
+    X: array
+        The parameter vectors, shape (n, len(schema)); duplicates are run once.
+    schema: ParameterSchema
+        The layout of the vectors.
+    sites: list
+        The sites, see "Site".
+    store: SQLiteStore or ParquetStore
+        The store of the results and the harvests, shared by the shards.
+    shard: int
+        The shard to run (0 -- n_shards - 1).
+    n_shards: int
+        The number of shards.
+    workers: int
+        The number of processes.
+    outputs: list
+        The result columns to store, all if None.
+
+    Returns
+    -------
+    The number of runs done.
+    '''
+
+    X = deduplicate(X, schema)
+    hashes = schema.hashes(X)
+
+    done = store.keys()
+
+    tasks = [
+        (site.name, i) for (i, site) in itertools.product(range(len(X)), sites)
+        if get_shard('{:}/{:}'.format(site.name, hashes[i]), n_shards) == shard
+        and (site.name, hashes[i]) not in done
+    ]
+
+    if verbose:
+        print('shard {:}/{:}: {:} runs ({:} vectors, {:} sites)'.format(
+            shard, n_shards, len(tasks), len(X), len(sites)))
+
+    site_map = {site.name: site for site in sites}
+
+    def record(task, result):
+        (site_name, i) = task
+        (df, harvests) = result
+        store.append(site_name, hashes[i], schema.to_dict(X[i]), df, harvests=harvests)
+
+    try:
+
+        if workers <= 1:
+
+            _set_worker_state(site_map, schema, outputs)
+
+            for task in tasks:
+                record(task, _run_task((task[0], X[task[1]])))
+
+        else:
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_set_worker_state,
+                                     initargs=(site_map, schema, outputs)) as executor:
+
+                results = executor.map(_run_task, [(name, X[i]) for (name, i) in tasks])
+
+                for (task, result) in zip(tasks, results):
+                    record(task, result)
+
+    finally:
+        # the buffered runs (if any) of an interrupted shard are kept
+        store.flush()
+
+    return len(tasks)
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m palmsim.grid',
+                                     description='Runs a parameter grid at the sites of a locations file.')
+    parser.add_argument('store', help='the result store: an SQLite file (.sqlite) or a Parquet directory')
+    parser.add_argument('--locations', required=True,
+                        help='see "calibration_lhoat/InfoMejoresLotesSeleccionadosParaCalibracion.csv"')
+    parser.add_argument('--n', type=int, default=5000, help='the number of sampled vectors')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shard', type=int, default=0)
+    parser.add_argument('--shards', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--dt', type=int, default=1)
+    parser.add_argument('--outputs', nargs='*', default=None)
+
+    args = parser.parse_args(argv)
+
+    from .calibrate import read_sites
+
+    schema = get_parameter_schema()
+    sites = read_sites(args.locations, dt=args.dt)
+
+    X = sample_grid(schema, args.n, rng=args.seed)
+
+    if args.store.endswith('.sqlite'):
+        store = SQLiteStore(args.store)
+    else:
+        store = ParquetStore(args.store)
+
+    run_grid(X, schema, sites, store, shard=args.shard,
+             n_shards=args.shards, workers=args.workers, outputs=args.outputs,
+             verbose=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,524 @@
+#!/usr/bin/env python
+''' A durable queue of simulation jobs, for long campaigns.
+
+The jobs - a parameter vector at a site - are kept in an SQLite file with
+their status and result, so a campaign survives crashed workers and
+sessions: submitting is idempotent, and a job claimed by a worker that
+died is claimed again once its lease expires.
+
+    queue = JobQueue('campaign.sqlite')
+    queue.submit(X, schema, sites=['Manuelita/QUITASUENO/313'])
+
+    run(queue.filepath, sites, workers=4, cache=ResultCache('results'))
+
+The progress is shown from the command line:
+
+    python -m palmsim.jobs status campaign.sqlite --watch 60
+'''
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import argparse
+import traceback
+
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .params import ParameterSet, ParameterSchema, apply_vector
+
+STATUSES = ['pending', 'running', 'done', 'failed']
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    site TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    base TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    submitted REAL,
+    claimed REAL,
+    finished REAL,
+    value REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished);
+CREATE TABLE IF NOT EXISTS parameter_sets (
+    key TEXT PRIMARY KEY,
+    parameters TEXT NOT NULL
+);
+'''
+
+
+def get_job_key(site, parameters, base=None):
+    ''' The key of a job: a digest of its site, parameter values and base set. '''
+
+    content = json.dumps([site, sorted(parameters.items())] + ([base] if base else []))
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_worker_name():
+    ''' The name of the current worker (process): host:pid. '''
+    return '{:}:{:}'.format(socket.gethostname(), os.getpid())
+
+
+class JobQueue(object):
+    ''' A queue of (parameter vector, site) jobs in an SQLite file.
+
+    Input
+    -----
+    filepath: str
+        The queue file, created if needed.
+    lease: float
+        The time (s) after which a running job is considered abandoned
+        (its worker died) and is claimed again.
+    max_attempts: int
+        The number of times a failing job is tried.
+
+    Notes
+    -----
+    Workers claim jobs in a write transaction, so a job is claimed by one
+    worker at a time - across the processes of one host: the queue file
+    is in WAL mode, which needs shared memory and thus does not work on
+    network file systems.
+
+    A job is recorded by the worker holding it only: once its lease
+    expired (and another worker claimed it) its result is ignored.
+    '''
+
+    def __init__(self, filepath, lease=6 * 3600, max_attempts=3):
+
+        self.filepath = os.path.abspath(os.path.expanduser(filepath))
+        self.lease = lease
+        self.max_attempts = max_attempts
+
+        self._connection = sqlite3.connect(self.filepath, timeout=60,
+                                           isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(_SCHEMA)
+
+        # see "claim"
+        self._parameter_sets = {}
+
+    def __getstate__(self):
+        return {'filepath': self.filepath, 'lease': self.lease,
+                'max_attempts': self.max_attempts}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def __repr__(self):
+        counts = self.counts()
+        return 'JobQueue({:}, {:})'.format(self.filepath, ', '.join(
+            '{:} {:}'.format(counts[status], status) for status in STATUSES))
+
+    def close(self):
+        self._connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        """ A write transaction, locking out the other writers. """
+
+        self._connection.execute('BEGIN IMMEDIATE')
+
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+
+        self._connection.execute('COMMIT')
+
+    def submit(self, X, schema, sites=('',)):
+        ''' Adds the jobs of each parameter vector (row) of X at each site.
+
+        Jobs already in the queue (same site and parameter values) are
+        not added again, so a campaign can be re-submitted as a whole.
+        The parameters outside the vectors are those of the parameter set
+        of the schema, kept in the queue for the workers.
+
+        Input
+        -----
+        X: array
+            The parameter vectors, shape (n, len(schema)).
+        schema: ParameterSchema
+            The layout of the parameter vectors.
+        sites: list
+            The names of the sites, see "Site".
+
+        Returns
+        -------
+        The number of jobs added.
+        '''
+
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+
+        base = {prefix: {name: entry['value'] for (name, entry) in params.items()}
+                for (prefix, params) in schema.parameter_set.to_dict().items()}
+        base = json.dumps(base, sort_keys=True)
+        base_key = hashlib.sha256(base.encode()).hexdigest()
+
+        now = time.time()
+        rows = []
+
+        for x in X:
+            parameters = schema.to_dict(x)
+            for site in sites:
+                rows.append((get_job_key(site, parameters, base_key), site,
+                             json.dumps(parameters), base_key, now))
+
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO parameter_sets (key, parameters) VALUES (?, ?)',
+                (base_key, base))
+            before = connection.total_changes
+            connection.executemany(
+                'INSERT OR IGNORE INTO jobs (key, site, parameters, base, submitted) '
+                'VALUES (?, ?, ?, ?, ?)', rows)
+            added = connection.total_changes - before
+
+        return added
+
+    def claim(self, worker=None):
+        ''' Claims the next job, None if there is none.
+
+        A job of which the lease expired is claimed again, unless it was
+        tried max_attempts times already: then it failed.
+
+        Returns
+        -------
+        The job id, the site, the parameter values per "sub-model.parameter"
+        name and the parameter set of the other parameters (None if unknown).
+        '''
+
+        worker = worker or get_worker_name()
+
+        now = time.time()
+
+        with self._transaction() as connection:
+
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, "
+                "error = 'The lease expired (the worker died?)' "
+                "WHERE status = 'running' AND claimed < ? AND attempts >= ?",
+                (now, now - self.lease, self.max_attempts))
+
+            row = connection.execute(
+                "SELECT id, site, parameters, base FROM jobs WHERE status = 'pending' "
+                "OR (status = 'running' AND claimed < ?) ORDER BY id LIMIT 1",
+                (now - self.lease,)).fetchone()
+
+            if row is not None:
+                connection.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, claimed = ?, "
+                    "attempts = attempts + 1 WHERE id = ?", (worker, now, row[0]))
+
+        if row is None:
+            return None
+
+        return row[0], row[1], json.loads(row[2]), self._get_parameter_set(row[3])
+
+    def _get_parameter_set(self, key):
+        """ The (submitted) parameter set of key, None if None. """
+
+        if key is None:
+            return None
+
+        if key not in self._parameter_sets:
+            (parameters,) = self._connection.execute(
+                'SELECT parameters FROM parameter_sets WHERE key = ?', (key,)).fetchone()
+            self._parameter_sets[key] = ParameterSet(json.loads(parameters))
+
+        return self._parameter_sets[key]
+
+    def complete(self, job_id, value=None, result=None, worker=None):
+        ''' Records the result of a job: a value and/or a pointer e.g. a cache key.
+
+        Returns
+        -------
+        Whether the result is recorded, i.e. whether worker held the job.
+        '''
+
+        cursor = self._connection.execute(
+            "UPDATE jobs SET status = 'done', finished = ?, value = ?, result = ?, "
+            "error = NULL WHERE id = ? AND status = 'running' AND worker = ?",
+            (time.time(), value, result, job_id, worker or get_worker_name()))
+
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, error='', worker=None):
+        ''' Records the failure of a job, to be tried again up to max_attempts.
+
+        Returns
+        -------
+        Whether the failure is recorded, i.e. whether worker held the job.
+        '''
+
+        cursor = self._connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' "
+            "ELSE 'failed' END, finished = ?, error = ? "
+            "WHERE id = ? AND status = 'running' AND worker = ?",
+            (self.max_attempts, time.time(), error, job_id, worker or get_worker_name()))
+
+        return cursor.rowcount == 1
+
+    def retry_failed(self):
+        ''' Puts the failed jobs back in the queue; returns their number. '''
+
+        cursor = self._connection.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0 WHERE status = 'failed'")
+
+        return cursor.rowcount
+
+    def counts(self):
+        ''' The number of jobs per status. '''
+
+        counts = dict.fromkeys(STATUSES, 0)
+
+        counts.update(self._connection.execute(
+            'SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+        return counts
+
+    def progress(self, window=600):
+        ''' The number of jobs per status, the throughput and the time left.
+
+        Input
+        -----
+        window: float
+            The throughput is that of the last window seconds (jobs/hour).
+        '''
+
+        progress = self.counts()
+        progress['total'] = sum(progress.values())
+
+        now = time.time()
+
+        finished = self._connection.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'done' AND finished > ?",
+            (now - window,)).fetchone()[0]
+
+        throughput = finished / window * 3600
+        left = progress['pending'] + progress['running']
+
+        progress['throughput'] = throughput
+        progress['hours_left'] = left / throughput if throughput > 0 else float('nan')
+
+        return progress
+
+    def results(self, status='done'):
+        ''' The jobs as a data frame: a row per job, a column per parameter.
+
+        Input
+        -----
+        status: str
+            The status of the jobs, all jobs if None.
+        '''
+
+        query = 'SELECT id, site, parameters, status, attempts, worker, value, result, error FROM jobs'
+        args = ()
+
+        if status is not None:
+            query += ' WHERE status = ?'
+            args = (status,)
+
+        rows = self._connection.execute(query + ' ORDER BY id', args).fetchall()
+
+        columns = ['id', 'site', 'parameters', 'status', 'attempts', 'worker',
+                   'value', 'result', 'error']
+
+        df = pd.DataFrame(rows, columns=columns).set_index('id')
+
+        parameters = pd.DataFrame([json.loads(p) for p in df.pop('parameters')],
+                                  index=df.index)
+
+        return pd.concat([df, parameters], axis=1)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Workers
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def work(filepath, sites, cache=None, max_jobs=None, lease=6 * 3600, max_attempts=3):
+    ''' Runs the jobs of a queue until it is empty.
+
+    Per job the palm field of the site is run with the parameter values
+    (and the other parameters of the submitted parameter set), and the
+    statistic of the site (if any) is recorded as the value of the job;
+    given a cache the results are cached and the cache key is recorded
+    as the result of the job.
+
+    Input
+    -----
+    filepath: str
+        The queue file, see "JobQueue".
+    sites: list
+        The sites of the jobs, see "Site".
+    cache: ResultCache
+        The cache of the simulation results, none if None.
+    max_jobs: int
+        Stops after this many jobs, never if None.
+    lease, max_attempts:
+        See "JobQueue".
+
+    Returns
+    -------
+    The number of jobs run.
+    '''
+
+    queue = JobQueue(filepath, lease=lease, max_attempts=max_attempts)
+
+    sites = {site.name: site for site in sites}
+    schemas = {}
+
+    n = 0
+
+    while max_jobs is None or n < max_jobs:
+
+        job = queue.claim()
+
+        if job is None:
+            break
+
+        (job_id, site_name, parameters, parameter_set) = job
+
+        try:
+            site = sites[site_name]
+
+            names = tuple(parameters)
+
+            if names not in schemas:
+                schemas[names] = ParameterSchema(names=list(names))
+
+            pf = site.make_palm_field(parameter_set)
+            apply_vector(pf, np.array(list(parameters.values())), schemas[names])
+
+            if cache is None:
+                key = None
+                df = pf.run(duration=site.duration)
+            else:
+                (key, df) = cache.run_with_key(pf, duration=site.duration)
+
+            value = None if site.statistic is None else float(site.statistic(df))
+
+        except Exception:
+            queue.fail(job_id, traceback.format_exc())
+        else:
+            queue.complete(job_id, value=value, result=key)
+
+        n += 1
+
+    queue.close()
+
+    return n
+
+
+def run(filepath, sites, workers=1, cache=None, **kwargs):
+    ''' Runs the jobs of a queue with several worker processes, see "work".
+
+    Returns
+    -------
+    The number of jobs run (by all workers).
+    '''
+
+    if workers <= 1:
+        return work(filepath, sites, cache=cache, **kwargs)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(work, filepath, sites, cache=cache, **kwargs)
+                   for _ in range(workers)]
+
+        return sum(future.result() for future in futures)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Command line
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _print_progress(queue, window):
+
+    progress = queue.progress(window)
+
+    print('{:} | {:} / {:} done, {:} running, {:} pending, {:} failed | '
+          '{:.1f} jobs/h, {:.1f} h left'.format(
+              time.strftime('%Y-%m-%d %H:%M:%S'), progress['done'], progress['total'],
+              progress['running'], progress['pending'], progress['failed'],
+              progress['throughput'], progress['hours_left']))
+
+    sys.stdout.flush()
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m palmsim.jobs',
+                                     description='A durable queue of simulation jobs.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    status = subparsers.add_parser('status', help='show the progress')
+    status.add_argument('filepath')
+    status.add_argument('--window', type=float, default=600,
+                        help='the throughput is that of the last window seconds')
+    status.add_argument('--watch', type=float, default=None,
+                        help='show the progress every this many seconds')
+
+    retry = subparsers.add_parser('retry', help='put the failed jobs back in the queue')
+    retry.add_argument('filepath')
+
+    worker = subparsers.add_parser('work', help='run the jobs at the sites of a locations file')
+    worker.add_argument('filepath')
+    worker.add_argument('--locations', required=True,
+                        help='see "calibration_lhoat/InfoMejoresLotesSeleccionadosParaCalibracion.csv"')
+    worker.add_argument('--observed', default=None,
+                        help='see "calibration_lhoat/obs_data/obs_yield.csv"')
+    worker.add_argument('--dt', type=int, default=1)
+    worker.add_argument('--cache', default=None, help='the result cache directory')
+    worker.add_argument('--workers', type=int, default=1)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+
+        queue = JobQueue(args.filepath)
+
+        _print_progress(queue, args.window)
+
+        while args.watch:
+            time.sleep(args.watch)
+            _print_progress(queue, args.window)
+
+    elif args.command == 'retry':
+
+        print('{:} jobs back in the queue'.format(JobQueue(args.filepath).retry_failed()))
+
+    elif args.command == 'work':
+
+        from .cache import ResultCache
+        from .calibrate import read_sites
+
+        observed = None if args.observed is None else pd.read_csv(args.observed)
+        sites = read_sites(args.locations, observed=observed, dt=args.dt)
+        cache = None if args.cache is None else ResultCache(args.cache)
+
+        run(args.filepath, sites, workers=args.workers, cache=cache)
+
+        _print_progress(JobQueue(args.filepath), 600)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+''' Goodness-of-fit metrics of simulation ensembles.
+
+The metrics compare simulated values of shape (runs, time) - or a single
+run of shape (time,) - to the observed values of shape (time,), per run
+and in one go:
+
+    simulated = np.array([monthly_FFB(df).values for df in results])
+    rmse(simulated, observed)  # shape (runs,)
+
+Missing observations (NaN) and missing simulated values are left out;
+a mask (True where valid) leaves out more e.g. a calibration period.
+A run without a valid value scores NaN.
+'''
+
+import numpy as np
+import pandas as pd
+
+# aggregation periods, see "aggregate"
+FREQUENCIES = {'M': 'M', 'monthly': 'M', 'A': 'Y', 'Y': 'Y', 'annual': 'Y'}
+
+
+def _prepare(simulated, observed, mask=None):
+    """ The simulated and observed values (zero where invalid), validity and count. """
+
+    simulated = np.asarray(simulated, dtype=float)
+    observed = np.asarray(observed, dtype=float)
+
+    if observed.shape[-1] != simulated.shape[-1]:
+        raise ValueError('Expected as many observed as simulated values, got {:} and {:}'.format(
+            observed.shape[-1], simulated.shape[-1]))
+
+    valid = ~np.isnan(simulated) & ~np.isnan(observed)
+
+    if mask is not None:
+        valid &= np.asarray(mask, dtype=bool)
+
+    simulated = np.where(valid, simulated, 0.)
+    observed = np.where(valid, observed, 0.)
+
+    n = valid.sum(axis=-1)
+
+    return simulated, observed, valid, n
+
+
+def _divide(a, b):
+    """ a / b, NaN where b is 0. """
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b != 0, a / np.where(b != 0, b, 1), np.nan)
+
+
+def _moments(x, valid, n):
+    """ The mean and the deviations from it (zero where invalid). """
+
+    mean = _divide(x.sum(axis=-1), n)
+
+    deviations = np.where(valid, x - np.expand_dims(mean, -1), 0.)
+
+    return mean, deviations
+
+
+def _result(value):
+    """ A float for a single run. """
+
+    if np.ndim(value) == 0:
+        return float(value)
+    return value
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Metrics
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def rmse(simulated, observed, mask=None):
+    ''' The root mean square error (in the units of the values). '''
+
+    (s, o, valid, n) = _prepare(simulated, observed, mask)
+
+    return _result(np.sqrt(_divide(((s - o) ** 2).sum(axis=-1), n)))
+
+
+def bias(simulated, observed, mask=None):
+    ''' The mean error, simulated minus observed (in the units of the values). '''
+
+    (s, o, valid, n) = _prepare(simulated, observed, mask)
+
+    return _result(_divide((s - o).sum(axis=-1), n))
+
+
+def pbias(simulated, observed, mask=None):
+    ''' The percent bias: the total error relative to the observed total (%). '''
+
+    (s, o, valid, n) = _prepare(simulated, observed, mask)
+
+    return _result(100 * _divide((s - o).sum(axis=-1), o.sum(axis=-1)))
+
+
+def nse(simulated, observed, mask=None):
+    ''' The Nash-Sutcliffe efficiency (1 is a perfect fit, -inf--1). '''
+
+    (s, o, valid, n) = _prepare(simulated, observed, mask)
+
+    (_, do) = _moments(o, valid, n)
+
+    return _result(1 - _divide(((s - o) ** 2).sum(axis=-1), (do ** 2).sum(axis=-1)))
+
+
+def r2(simulated, observed, mask=None):
+    ''' The coefficient of determination: the squared Pearson correlation (0--1). '''
+
+    return _result(_correlation(simulated, observed, mask)[0] ** 2)
+
+
+def _correlation(simulated, observed, mask=None):
+    """ The correlation, the ratio of the standard deviations and of the means. """
+
+    (s, o, valid, n) = _prepare(simulated, observed, mask)
+
+    (ms, ds) = _moments(s, valid, n)
+    (mo, do) = _moments(o, valid, n)
+
+    ss = np.sqrt((ds ** 2).sum(axis=-1))
+    so = np.sqrt((do ** 2).sum(axis=-1))
+
+    r = _divide((ds * do).sum(axis=-1), ss * so)
+
+    return r, _divide(ss, so), _divide(ms, mo)
+
+
+def kge(simulated, observed, mask=None):
+    ''' The Kling-Gupta efficiency (1 is a perfect fit, -inf--1).
+
+    Combines the correlation r, the ratio of the standard deviations alpha
+    and of the means beta (Gupta et al., 2009):
+
+        1 - sqrt((r - 1)**2 + (alpha - 1)**2 + (beta - 1)**2)
+    '''
+
+    (r, alpha, beta) = _correlation(simulated, observed, mask)
+
+    return _result(1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2))
+
+
+METRICS = {
+    'RMSE': rmse,
+    'NSE': nse,
+    'KGE': kge,
+    'bias': bias,
+    'PBIAS': pbias,
+    'R2': r2,
+}
+
+
+def goodness_of_fit(simulated, observed, mask=None, metrics=None):
+    ''' Several metrics per run.
+
+    Input
+    -----
+    simulated: array
+        The simulated values, shape (runs, time) or (time,).
+    observed: array
+        The observed values, shape (time,).
+    mask: array
+        True where the values count, all valid values if None.
+    metrics: list
+        The names of the metrics, see "METRICS"; all if None.
+
+    Returns
+    -------
+    A pd.DataFrame with a row per run and a column per metric.
+    '''
+
+    metrics = list(METRICS) if metrics is None else list(metrics)
+
+    simulated = np.atleast_2d(np.asarray(simulated, dtype=float))
+
+    return pd.DataFrame({name: METRICS[name](simulated, observed, mask)
+                         for name in metrics})
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Aggregation
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def aggregate(values, dates, freq='M', how='sum'):
+    ''' The monthly or annual totals (or means) of values over time.
+
+    Input
+    -----
+    values: array
+        The values, shape (runs, time) or (time,); NaN values are left out.
+    dates: array
+        The dates of the values (time,), e.g. the index of the simulation results.
+    freq: str
+        'M' (monthly) or 'Y' (annual).
+    how: str
+        'sum' or 'mean'.
+
+    Returns
+    -------
+    The aggregated values, shape (runs, periods) or (periods,) - NaN for
+    periods without a value, or without a date - and the pd.DatetimeIndex
+    of the consecutive periods from the first to the last date (their
+    first days).
+    '''
+
+    if freq not in FREQUENCIES:
+        raise ValueError('Unknown frequency: {:}'.format(freq))
+
+    if how not in ('sum', 'mean'):
+        raise ValueError('Unknown aggregation: {:}'.format(how))
+
+    values = np.asarray(values, dtype=float)
+
+    periods = pd.DatetimeIndex(dates).to_period(FREQUENCIES[freq])
+
+    if len(periods) != values.shape[-1]:
+        raise ValueError('Expected a date per value, got {:} and {:}'.format(
+            len(periods), values.shape[-1]))
+
+    if len(periods) == 0:
+        return values, pd.DatetimeIndex([])
+
+    # contiguous periods, for the reductions per slice
+    order = np.argsort(periods.asi8, kind='stable')
+    ordinals = periods.asi8[order]
+    values = values[..., order]
+
+    starts = np.flatnonzero(np.r_[True, ordinals[1:] != ordinals[:-1]])
+
+    valid = ~np.isnan(values)
+
+    totals = np.add.reduceat(np.where(valid, values, 0.), starts, axis=-1)
+    counts = np.add.reduceat(valid, starts, axis=-1)
+
+    if how == 'sum':
+        result = np.where(counts > 0, totals, np.nan)
+    else:
+        result = _divide(totals, counts)
+
+    # all periods, also those without a date
+    full = pd.period_range(periods.min(), periods.max(), freq=periods.freq)
+
+    aggregated = np.full(values.shape[:-1] + (len(full),), np.nan)
+    aggregated[..., ordinals[starts] - full[0].ordinal] = result
+
+    return aggregated, full.to_timestamp()
@@ -124,6 +124,23 @@ class PalmField():
 
         pf = PalmField(month_of_planting = 0, year_of_planting = 2017)
 
+    At daily time-steps a cohort of inflorescences is initiated every day.
+    To bound the number of cohorts, new cohorts can be lumped into age
+    classes of e.g. 10 days
+
+        pf = PalmField(dt = 1, cohort_lumping_width = 10)
+
+    note, wider age classes concentrate the sink strength of the bunches
+    in time - keep the width well below the growth period of the mesocarp
+    oil (~60 days).
+
+    To run a palm field with its own parameters - without changing those
+    of other palm fields - pass a parameter set
+
+        ps = ParameterSet().with_values({'trunk.specific_maintenance': 0.001})
+
+        pf = PalmField(parameter_set = ps)
+
     '''
 
     units = yaml.load("""
@@ -161,7 +178,9 @@ class PalmField():
                  latitude=0,
                  soil_texture_class='loamy sand',
                  soil_depth=1,
-                 dt=10):
+                 dt=10,
+                 cohort_lumping_width=0,
+                 parameter_set=None):
 
         # simulation run-time is kept by instances of this class
 
@@ -178,23 +197,35 @@ class PalmField():
         self.time = datetime(year_of_planting, month_of_planting,
                              day_of_planting)
 
+        # the calendar of the current time, see "_calendar"
+        self._calendar_time = None
+        self._calendar_entry = None
+
         # assignment by value
         self.time_of_planting = self.time
 
+        # the sub-model classes - holding the parameters of the set (if any)
+        self.parameter_set = parameter_set
+
+        if parameter_set is None:
+            bind = lambda kls: kls
+        else:
+            bind = parameter_set.bind
+
         # Link the sub-models
-        self.weather = Weather(self)
-        self.soil = Soil(self,
-                         soil_texture_class=soil_texture_class,
-                         soil_depth=soil_depth)
-        self.fronds = Fronds(self)
-        self.roots = Roots(self)
-        self.trunk = Trunk(self)
-        self.generative = Cohorts(self)
-        self.indeterminate = Indeterminate(self.generative)
-        self.female = Female(self.generative)
-        self.male = Male(self.generative)
-
-        self.assimilates = Assimilates(self)
+        self.weather = bind(Weather)(self)
+        self.soil = bind(Soil)(self,
+                               soil_texture_class=soil_texture_class,
+                               soil_depth=soil_depth)
+        self.fronds = bind(Fronds)(self)
+        self.roots = bind(Roots)(self)
+        self.trunk = bind(Trunk)(self)
+        self.generative = bind(Cohorts)(self, lumping_width=cohort_lumping_width)
+        self.indeterminate = bind(Indeterminate)(self.generative)
+        self.female = bind(Female)(self.generative)
+        self.male = bind(Male)(self.generative)
+
+        self.assimilates = bind(Assimilates)(self)
 
         self.components = [
             self.fronds,
@@ -208,6 +239,21 @@ class PalmField():
 
         self._units = {}
 
+    def set_parameter_set(self, parameter_set):
+        """ Switches the sub-models to the parameters of a parameter set.
+
+        Meant for a palm field that did not run yet, e.g. to try several
+        parameter sets on the same palm field (see "apply_vector"); the
+        cohorts already initiated keep their parameters. Values derived
+        from the parameters (e.g. the potential growth rate splines) are
+        set again, see "ParameterSet.rebind".
+        """
+
+        self.parameter_set = parameter_set
+
+        for obj in [self.indeterminate, self.female, self.male] + self.components:
+            parameter_set.rebind(obj)
+
     @property
     def DOY(self):
         ''' Day of the year (1--366). '''
@@ -244,15 +290,30 @@ class PalmField():
     @property
     def _days_in_year(self):
         """ Number of days in year. """
+        return self._calendar[1]
 
-        year = self.year
+    @property
+    def _calendar(self):
+        """ The (year, month, day) and the number of days in the year.
 
-        leap_year = calendar.isleap(year)
+        Computed once per time-step, the sub-models look them up many times.
+        """
 
-        if leap_year:
-            return 366
-        else:
-            return 365
+        time = self.time
+
+        if time is not self._calendar_time:
+
+            year = time.year
+
+            if calendar.isleap(year):
+                days_in_year = 366
+            else:
+                days_in_year = 365
+
+            self._calendar_entry = ((year, time.month, time.day), days_in_year)
+            self._calendar_time = time
+
+        return self._calendar_entry
 
     @property
     def year(self):
@@ -276,7 +337,7 @@ class PalmField():
 
     @property
     def date_tuple(self):
-        return (self.year, self.month, self.day)
+        return self._calendar[0]
 
     def update(self):
         ''' Update by dt days. '''
@@ -1,6 +1,12 @@
 import sys
 import os
+import csv
 import yaml
+import hashlib
+
+import numpy as np
+
+from types import MappingProxyType
 
 from .components.fronds import Fronds
 from .components.trunk import Trunk
@@ -12,6 +18,7 @@ from .components.soil import Soil
 from .components.weather import Weather
 from .components.generative import Indeterminate, Male, Female
 from .components.generative import Stalk, MesocarpFibers, MesocarpOil, Kernels
+from .components.generative import Cohorts
 
 MODULE_FILEPATH = sys.modules[__name__].__file__
 MODULE_DIR = os.path.dirname(MODULE_FILEPATH)
@@ -103,18 +110,535 @@ def set_parameters(obj, settings=None):
     settings: dict
         A nested-dictionary of parameters per sub-model.
 
+    Notes
+    -----
+    The cohorts (female, male and indeterminate) are slotted and keep
+    their parameters on the class, so their parameters are set via the
+    parameter set of the palm field (see "ParameterSet" and
+    "PalmField.set_parameter_set"): for that palm field only.
     '''
     if settings is None:
         return False
     else:
         print('Setting settings...')
 
+        cohort_settings = {}
+
         for pars in settings:
             if pars in dir(obj):
                 sub_obj = getattr(obj, pars)
                 for kls in CLASSES:
                     if isinstance(sub_obj, kls):
-                        sub_obj.parameters = settings[pars]
+                        if hasattr(sub_obj, '__dict__'):
+                            sub_obj.parameters = settings[pars]
+                            if hasattr(sub_obj, 'set_derived_parameters'):
+                                sub_obj.set_derived_parameters()
+                        else:
+                            cohort_settings[kls._prefix] = settings[pars]
+
+        if cohort_settings:
+
+            if not hasattr(obj, 'set_parameter_set'):
+                raise ValueError('The parameters of the cohorts are set per palm field')
+
+            parameter_set = obj.parameter_set or ParameterSet()
+            obj.set_parameter_set(parameter_set.with_values(cohort_settings))
+
+
+# the sub-models of which the parameters make up a parameter set
+PARAMETER_SET_CLASSES = CLASSES + [Kernels, Cohorts]
+
+# class attributes referring to related sub-model classes
+_CLASS_LINKS = [
+    '_stalk_class', '_fruit_classes', '_female_class', '_male_class',
+    '_indeterminate_class'
+]
+
+
+def _freeze(value):
+    """ A hashable version of a parameter value (lists become tuples). """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(x) for x in value)
+    else:
+        return value
+
+
+class ParameterSet(object):
+    ''' An immutable set of parameters of all sub-models.
+
+    Unlike "set_parameters", which changes the parameters of the sub-model
+    objects, a parameter set is handed to a palm field upon creation and
+    is only seen by that palm field (and its cohorts):
+
+        ps = ParameterSet()
+        ps_low = ps.with_values({'trunk': {'specific_maintenance': 0.001}})
+
+        pf = PalmField(parameter_set=ps_low)
+
+    Palm fields with different parameter sets can thus run side by side,
+    e.g. in threads. Parameter sets compare by value and are hashable.
+
+    Input
+    -----
+    settings: dict
+        A nested-dictionary of parameters per sub-model, as returned by
+        "get_parameters"; sub-models or parameters not given take the
+        current (class) values.
+
+    Notes
+    -----
+    The sub-models of the palm field are instances of sub-classes holding
+    the parameters of the set, see "bind"; the model code reads its
+    parameters as usual, at no extra cost.
+    '''
+
+    def __init__(self, settings=None):
+
+        parameters = {}
+
+        for kls in PARAMETER_SET_CLASSES:
+            parameters[kls._prefix] = {
+                name: dict(entry)
+                for (name, entry) in kls.parameters.items()
+            }
+
+        for (prefix, params) in (settings or {}).items():
+
+            if prefix not in parameters:
+                raise ValueError('Unknown sub-model: {:}'.format(prefix))
+
+            for (name, entry) in params.items():
+
+                if name not in parameters[prefix]:
+                    raise ValueError('Unknown parameter: {:}.{:}'.format(prefix, name))
+
+                if isinstance(entry, dict):
+                    parameters[prefix][name].update(entry)
+                else:
+                    parameters[prefix][name]['value'] = entry
+
+        # read-only views
+        self._parameters = {}
+
+        for (prefix, params) in parameters.items():
+
+            for entry in params.values():
+                entry['value'] = _freeze(entry['value'])
+
+            self._parameters[prefix] = MappingProxyType(
+                {name: MappingProxyType(entry) for (name, entry) in params.items()})
+
+        # see "_key" and "bind"
+        self._sorted_values = None
+        self._classes = {}
+
+    @property
+    def _key(self):
+        """ The sorted (prefix, name, value) triplets, identifying the set. """
+
+        if self._sorted_values is None:
+            self._sorted_values = tuple(sorted(
+                (prefix, name, entry['value'])
+                for (prefix, params) in self._parameters.items()
+                for (name, entry) in params.items()))
+
+        return self._sorted_values
+
+    def __getitem__(self, prefix):
+        return self._parameters[prefix]
+
+    def __iter__(self):
+        return iter(self._parameters)
+
+    def __eq__(self, other):
+        return isinstance(other, ParameterSet) and self._key == other._key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __reduce__(self):
+        return (ParameterSet, (self.to_dict(),))
+
+    def __repr__(self):
+        return 'ParameterSet({:} parameters, hash: {:x})'.format(
+            len(self._key), hash(self) & 0xffffffff)
+
+    def value(self, prefix, name):
+        """ The value of parameter "name" of sub-model "prefix". """
+        return self._parameters[prefix][name]['value']
+
+    def to_dict(self):
+        """ The nested-dictionary of parameters per sub-model (a copy). """
+        return {
+            prefix: {name: dict(entry) for (name, entry) in params.items()}
+            for (prefix, params) in self._parameters.items()
+        }
+
+    def with_values(self, values):
+        """ A new parameter set with some parameter values replaced.
+
+        Input
+        -----
+        values: dict
+            Either nested per sub-model, e.g.
+
+                {'trunk': {'specific_maintenance': 0.001}}
+
+            or flat with "sub-model.parameter" keys, e.g.
+
+                {'trunk.specific_maintenance': 0.001}
+        """
+
+        settings = {}
+
+        for (key, value) in values.items():
+
+            if isinstance(value, dict) and 'value' not in value:
+                settings.setdefault(key, {}).update(value)
+            else:
+                prefix, name = key.split('.', 1)
+                settings.setdefault(prefix, {})[name] = value
+
+        parameters = self.to_dict()
+
+        for (prefix, params) in settings.items():
+
+            if prefix not in parameters:
+                raise ValueError('Unknown sub-model: {:}'.format(prefix))
+
+            for (name, value) in params.items():
+
+                if name not in parameters[prefix]:
+                    raise ValueError('Unknown parameter: {:}.{:}'.format(prefix, name))
+
+                if isinstance(value, dict):
+                    parameters[prefix][name].update(value)
+                else:
+                    parameters[prefix][name]['value'] = value
+
+        return ParameterSet(parameters)
+
+    def _with_scalars(self, changes):
+        """ A new parameter set with the values of (prefix, name, value) changes.
+
+        A fast path of "with_values" for scalar values, e.g. from a parameter
+        vector: only the changed entries are copied, the others are shared
+        with this set. The names are assumed to be valid.
+        """
+
+        parameters = dict(self._parameters)
+        copied = {}
+
+        for (prefix, name, value) in changes:
+
+            if prefix not in copied:
+                copied[prefix] = parameters[prefix].copy()
+
+            entry = copied[prefix][name].copy()
+            entry['value'] = value
+
+            copied[prefix][name] = MappingProxyType(entry)
+
+        for (prefix, params) in copied.items():
+            parameters[prefix] = MappingProxyType(params)
+
+        new = object.__new__(ParameterSet)
+        new._parameters = parameters
+        new._sorted_values = None
+        new._classes = {}
+
+        return new
+
+    def bind(self, kls):
+        """ The sub-class of sub-model class kls holding the parameters of this set.
+
+        The sub-classes refer to each other, e.g. the female cohorts of a
+        cohort container made with bind(Cohorts) are of class bind(Female).
+        Classes without parameters in the set are returned as is.
+        """
+
+        if not self._classes:
+            self._classes = self._make_classes()
+
+        return self._classes.get(kls, kls)
+
+    def rebind(self, obj):
+        """ Switches sub-model object obj to the parameters of this set.
+
+        The object becomes an instance of the bound class (see "bind") of
+        its sub-model class, whether bound to another set or not; values
+        derived from the parameters are set again (if any, see e.g.
+        "Trunk.set_derived_parameters").
+        """
+
+        for kls in type(obj).__mro__:
+            if kls in PARAMETER_SET_CLASSES:
+                obj.__class__ = self.bind(kls)
+                break
+
+        if hasattr(obj, 'set_derived_parameters'):
+            obj.set_derived_parameters()
+
+        return obj
+
+    def _make_classes(self):
+
+        classes = {}
+
+        for kls in PARAMETER_SET_CLASSES:
+
+            attributes = {
+                'parameters': self._parameters[kls._prefix],
+                '__module__': kls.__module__,
+            }
+
+            # keep slotted classes without instance dicts
+            if hasattr(kls, '__slots__'):
+                attributes['__slots__'] = ()
+
+            classes[kls] = type(kls.__name__, (kls,), attributes)
+
+        for bound in classes.values():
+            for link in _CLASS_LINKS:
+
+                if not hasattr(bound, link):
+                    continue
+
+                target = getattr(bound, link)
+
+                if isinstance(target, tuple):
+                    setattr(bound, link, tuple(classes.get(x, x) for x in target))
+                else:
+                    setattr(bound, link, classes.get(target, target))
+
+        return classes
+
+
+# the sub-models of which the parameters make up a parameter vector, in the
+# order of the sensitivity analysis (see "full_parameters_list.csv"); the
+# weather parameters are mostly physical constants
+SCHEMA_CLASSES = [kls for kls in CLASSES if kls is not Weather]
+
+PARAMETERS_LIST_FILEPATH = os.path.join(
+    MODULE_DIR, '..', 'full_sensitivity_analysis', 'full_parameters_list.csv')
+
+
+class ParameterSchema(object):
+    ''' The layout of a flat parameter vector, e.g. for optimizers.
+
+    Index i of a vector x holds the value of parameter names[i], i.e. of
+    parameter parameters[i] of sub-model components[i]. All scalar
+    parameters of the sub-models are included - in the order of
+    "full_parameters_list.csv" - the list-valued ones (e.g. the potential
+    growth rates of the trunk) are left out.
+
+        schema = ParameterSchema()
+        x = schema.defaults.copy()
+        x[schema.index('trunk.specific_maintenance')] *= 1.1
+
+        pf = PalmField()
+        apply_vector(pf, x, schema)
+
+    Input
+    -----
+    parameter_set: ParameterSet
+        The parameter set of the defaults, the current (class) values if None.
+    relative_range: float
+        The bounds relative to the defaults, i.e. the defaults -/+ 10%
+        as in the LH-OAT sensitivity analysis.
+    names: list
+        The "sub-model.parameter" names of a sub-set of the parameters,
+        all if None.
+
+    Notes
+    -----
+    The bounds of a zero default are zero as well; set them e.g. via
+
+        schema.lower[schema.index('stalk.t_growth_start')] = -5
+    '''
+
+    def __init__(self, parameter_set=None, relative_range=0.1, names=None):
+
+        if parameter_set is None:
+            parameter_set = ParameterSet()
+
+        all_names = [
+            '{:}.{:}'.format(kls._prefix, name)
+            for kls in SCHEMA_CLASSES
+            for (name, entry) in parameter_set[kls._prefix].items()
+            if isinstance(entry['value'], (int, float))
+        ]
+
+        if names is None:
+            names = all_names
+        else:
+            unknown = set(names) - set(all_names)
+            if unknown:
+                raise ValueError('Unknown parameter(s): {:}'.format(sorted(unknown)))
+
+        self.parameter_set = parameter_set
+
+        self.names = tuple(names)
+        self.components = tuple(x.split('.', 1)[0] for x in self.names)
+        self.parameters = tuple(x.split('.', 1)[1] for x in self.names)
+
+        self._indices = {name: i for (i, name) in enumerate(self.names)}
+
+        self.defaults = np.array([
+            parameter_set.value(prefix, name)
+            for (prefix, name) in zip(self.components, self.parameters)
+        ], dtype=float)
+
+        # integer defaults stay integers when given whole numbers
+        self._integral = tuple(
+            isinstance(parameter_set.value(prefix, name), int)
+            for (prefix, name) in zip(self.components, self.parameters))
+
+        bounds = np.sort([
+            self.defaults * (1 - relative_range),
+            self.defaults * (1 + relative_range)
+        ], axis=0)
+
+        self.lower = bounds[0]
+        self.upper = bounds[1]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return 'ParameterSchema({:} parameters)'.format(len(self))
+
+    def index(self, name):
+        """ The index of parameter "sub-model.parameter" in the vector. """
+        return self._indices[name]
+
+    def clip(self, x):
+        """ The vector(s) x limited to the bounds. """
+        return np.clip(x, self.lower, self.upper)
+
+    def to_dict(self, x):
+        """ The values of vector x per "sub-model.parameter" name. """
+        return dict(zip(self.names, (float(v) for v in x)))
+
+    def hashes(self, X):
+        """ A digest of the names and values per parameter vector (row) of X. """
+
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+
+        names = hashlib.sha256(repr(self.names).encode())
+
+        digests = []
+
+        for x in X:
+            digest = names.copy()
+            digest.update(x.tobytes())
+            digests.append(digest.hexdigest()[:16])
+
+        return digests
+
+    def to_parameter_set(self, x, parameter_set=None):
+        """ The parameter set with the values of vector x.
+
+        Input
+        -----
+        x: array
+            The parameter vector.
+        parameter_set: ParameterSet
+            The set of the parameters not in the vector, that of the
+            schema if None.
+        """
+
+        if len(x) != len(self.names):
+            raise ValueError('Expected a vector of {:} parameters, got {:}'.format(
+                len(self.names), len(x)))
+
+        if parameter_set is None:
+            parameter_set = self.parameter_set
+
+        values = (
+            int(v) if (integral and float(v).is_integer()) else float(v)
+            for (integral, v) in zip(self._integral, x))
+
+        return parameter_set._with_scalars(
+            zip(self.components, self.parameters, values))
+
+    def validate(self, filepath=PARAMETERS_LIST_FILEPATH):
+        """ Checks the order of the parameters against a parameter list.
+
+        Raises a ValueError if the (component, parameter) pairs of the
+        parameter list (see "full_parameters_list.csv") differ from those of
+        the schema - e.g. after adding a parameter to a sub-model.
+        """
+
+        with open(filepath, 'r') as f:
+            listed = ['{:}.{:}'.format(row['component'], row['parameter'])
+                      for row in csv.DictReader(f)]
+
+        for (i, (expected, found)) in enumerate(zip(listed, self.names)):
+            if expected != found:
+                raise ValueError('Parameter {:} is {:}, expected {:} ({:})'.format(
+                    i, found, expected, filepath))
+
+        if len(listed) != len(self.names):
+            raise ValueError('{:} parameters, expected {:} ({:})'.format(
+                len(self.names), len(listed), filepath))
+
+        return True
+
+
+_PARAMETER_SCHEMA = None
+
+
+def get_parameter_schema():
+    ''' The schema of all the (scalar) parameters, with the current defaults. '''
+
+    global _PARAMETER_SCHEMA
+
+    if _PARAMETER_SCHEMA is None:
+        _PARAMETER_SCHEMA = ParameterSchema()
+
+    return _PARAMETER_SCHEMA
+
+
+def apply_vector(pf_or_batch, x, schema=None):
+    ''' Sets the parameters of palm field(s) to the values of a parameter vector.
+
+    The palm fields get their own parameter set (see "ParameterSet"),
+    based on the one they have; the parameters outside the vector
+    are left as is. Apply the vector before running the palm field.
+
+    Input
+    -----
+    pf_or_batch: PalmField or list
+        A palm field or a list of palm fields.
+    x: array
+        A parameter vector; for a list of palm fields either one vector
+        (for all) or one vector per palm field, shape (len(batch), len(schema)).
+    schema: ParameterSchema
+        The layout of the vector, see "get_parameter_schema" if None.
+
+    Returns
+    -------
+    The parameter set(s) of the palm field(s).
+    '''
+
+    if schema is None:
+        schema = get_parameter_schema()
+
+    x = np.asarray(x, dtype=float)
+
+    if not isinstance(pf_or_batch, (list, tuple)):
+        pf = pf_or_batch
+        parameter_set = schema.to_parameter_set(x, pf.parameter_set)
+        pf.set_parameter_set(parameter_set)
+        return parameter_set
+
+    X = np.broadcast_to(x, (len(pf_or_batch), len(schema)))
+
+    return [apply_vector(pf, xi, schema) for (pf, xi) in zip(pf_or_batch, X)]
 
 
 SETTINGS_FILENAME = 'settings.yaml'
@@ -0,0 +1,829 @@
+#!/usr/bin/env python
+''' Sensitivity analysis of the model parameters. '''
+
+import os
+import time
+
+from math import ceil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from scipy.stats import qmc
+from scipy.spatial.distance import cdist
+
+from .params import get_parameter_schema, apply_vector
+
+
+class ModelObjective(object):
+    ''' The objective of a parameter vector: a statistic of a simulation.
+
+    Evaluating a vector x makes a new palm field, applies the vector (see
+    "apply_vector") and runs it for duration days - loading the results
+    from the cache if given (see "ResultCache"):
+
+        def make_palm_field():
+            pf = PalmField(year_of_planting=2008, latitude=3.9)
+            pf.weather.radiation_series = ...
+            return pf
+
+        def total_FFB(df):
+            return df['generative_FFB_production (t/ha/yr)'].sum()
+
+        objective = ModelObjective(make_palm_field, total_FFB, duration=10 * 365)
+        objective(schema.defaults)
+
+    Input
+    -----
+    make_palm_field: callable
+        Returns a new palm field of the site, ready to run.
+    statistic: callable
+        Returns the objective (float) given the simulation results - or
+        several objectives (a sequence of floats).
+    duration: int
+        The duration of the simulation (days).
+    schema: ParameterSchema
+        The layout of the parameter vectors, see "get_parameter_schema" if None.
+    cache: ResultCache
+        A cache of the simulation results, none if None.
+    outputs: list
+        The columns of the simulation results that are cached, all if None.
+
+    Notes
+    -----
+    To evaluate vectors in other processes make_palm_field and statistic
+    should be picklable e.g. module-level functions.
+    '''
+
+    def __init__(self, make_palm_field, statistic, duration=30 * 365,
+                 schema=None, cache=None, outputs=None):
+
+        self.make_palm_field = make_palm_field
+        self.statistic = statistic
+        self.duration = duration
+        self.schema = schema or get_parameter_schema()
+        self.cache = cache
+        self.outputs = outputs
+
+    def __call__(self, x):
+
+        pf = self.make_palm_field()
+
+        apply_vector(pf, x, self.schema)
+
+        if self.cache is None:
+            df = pf.run(duration=self.duration)
+        else:
+            df = self.cache.run(pf, duration=self.duration, outputs=self.outputs)
+
+        value = self.statistic(df)
+
+        if np.ndim(value) == 0:
+            return float(value)
+        else:
+            return np.asarray(value, dtype=float)
+
+
+def evaluate(objective, X, workers=1, executor=None):
+    ''' The objective of each parameter vector (row) of X.
+
+    Input
+    -----
+    objective: callable
+        Returns the objective (float) of a parameter vector; objectives
+        having a "batch" method - returning the objectives of all rows
+        of X at once, e.g. a surrogate model - are evaluated by it.
+    X: array
+        The parameter vectors, shape (n, len(schema)).
+    workers: int
+        The number of processes; evaluated in this process if 1.
+    executor: Executor
+        A running process pool of workers processes, e.g. to evaluate
+        several batches; a pool is started (and stopped) if None.
+
+    Returns
+    -------
+    An array of n objective values - of shape (n, k) for objectives
+    returning k values.
+    '''
+
+    X = np.asarray(X, dtype=float)
+
+    if hasattr(objective, 'batch'):
+        return np.asarray(objective.batch(X), dtype=float)
+
+    if workers <= 1:
+        return np.array([objective(x) for x in X], dtype=float)
+
+    # a few chunks per worker - balancing the load at little overhead
+    chunksize = max(1, int(ceil(len(X) / (4 * workers))))
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            values = list(executor.map(objective, X, chunksize=chunksize))
+    else:
+        values = list(executor.map(objective, X, chunksize=chunksize))
+
+    return np.array(values, dtype=float)
+
+
+def latin_hypercube(n, lower, upper, rng=None):
+    ''' A Latin hypercube sample of n points within the bounds.
+
+    The range of each parameter is split into n strata of equal width,
+    each stratum holding a single - uniformly distributed - point.
+
+    Returns
+    -------
+    An array of shape (n, len(lower)).
+    '''
+
+    rng = np.random.default_rng(rng)
+
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+
+    d = len(lower)
+
+    # position within the unit range: (stratum + offset) / n
+    strata = np.argsort(rng.random((n, d)), axis=0)
+    U = (strata + rng.random((n, d))) / n
+
+    return lower + U * (upper - lower)
+
+
+def lhoat_design(lower, upper, n_strata=100, f=0.005, rng=None):
+    ''' The parameter vectors of an LH-OAT sensitivity analysis.
+
+    Per Latin hypercube point one vector is added for each parameter,
+    changing that parameter by the fraction f; by -f if +f would exceed
+    the upper bound.
+
+    Returns
+    -------
+    An array of shape (n_strata * (1 + d), d) holding per point the
+    point itself followed by its d one-at-a-time changes.
+    '''
+
+    points = latin_hypercube(n_strata, lower, upper, rng)
+
+    n, d = points.shape
+
+    X = np.repeat(points, d + 1, axis=0).reshape(n, d + 1, d)
+
+    for i in range(d):
+
+        changed = points[:, i] * (1 + f)
+        exceeds = changed > upper[i]
+        changed[exceeds] = points[exceeds, i] * (1 - f)
+
+        X[:, i + 1, i] = changed
+
+    return X.reshape(-1, d)
+
+
+def lhoat_effects(values, d, f=0.005):
+    ''' The partial effects of the parameters per Latin hypercube point.
+
+    The partial effect (%) of parameter i at point j follows from the
+    objective M at the point and at its one-at-a-time change of i:
+
+        S_ij = |100 * (M_ij - M_j) / ((M_ij + M_j) / 2) / f|
+
+    (van Griensven et al., 2006); zero if both objectives are equal.
+
+    Returns
+    -------
+    An array of shape (n_strata, d).
+    '''
+
+    values = np.asarray(values, dtype=float).reshape(-1, d + 1)
+
+    M = values[:, :1]
+    M_changed = values[:, 1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        S = np.abs(100 * (M_changed - M) / ((M_changed + M) / 2) / f)
+
+    S[M_changed == M] = 0
+
+    return S
+
+
+def write_lhoat_ranking(ranking, filepath):
+    ''' Writes the ranking in the layout of hydroPSO's "LH_OAT-Ranking.txt". '''
+
+    with open(filepath, 'w') as f:
+
+        f.write('RankingNmbr ParameterName RelativeImportance RelativeImportance.Norm\n')
+
+        for (rank, row) in ranking.iterrows():
+            f.write('{:<12}{:<47}{:.15g} {:.15g}\n'.format(
+                rank, row['ParameterName'], row['RelativeImportance'],
+                row['RelativeImportance.Norm']))
+
+
+def lhoat(param_schema=None, n_strata=100, f=0.005, objective=None, workers=1,
+          seed=None, drty_out=None):
+    ''' Latin-Hypercube One-factor-At-a-Time (LH-OAT) sensitivity analysis.
+
+    A Python version of the "lhoat" function of the R package hydroPSO:
+    the relative importance of a parameter is the mean of its partial
+    effects (see "lhoat_effects") over n_strata Latin hypercube points
+    within the bounds of the schema, requiring n_strata * (1 + d)
+    evaluations of the objective for d parameters.
+
+        schema = get_parameter_schema()
+        objective = ModelObjective(make_palm_field, total_FFB, duration=10 * 365)
+
+        ranking, effects = lhoat(schema, n_strata=100, f=0.005,
+                                 objective=objective, workers=8,
+                                 drty_out='LH_OAT_FFB')
+
+    Input
+    -----
+    param_schema: ParameterSchema
+        The parameters and their bounds, see "get_parameter_schema" if None.
+    n_strata: int
+        The number of strata (Latin hypercube points).
+    f: float
+        The fraction by which each parameter is changed.
+    objective: callable
+        Returns the objective (float) of a parameter vector, e.g. a
+        "ModelObjective".
+    workers: int
+        The number of processes evaluating the objective, see "evaluate".
+    seed: int
+        The seed of the Latin hypercube sample.
+    drty_out: str
+        The directory to write the results to, not written if None:
+
+            LH_OAT-Ranking.txt  : the ranking (as hydroPSO)
+            LH_OAT-Effects.txt  : the partial effects per point and parameter
+            LH_OAT-out.txt      : the objective of each evaluation
+            LH_OAT-logfile.txt  : the settings and the elapsed time
+
+    Returns
+    -------
+    The ranking - a data frame indexed by the ranking number - and the
+    partial effects - a data frame of n_strata rows, one column per
+    parameter.
+    '''
+
+    schema = param_schema or get_parameter_schema()
+
+    start = time.time()
+
+    names = ['_'.join(name.split('.', 1)) for name in schema.names]
+    d = len(names)
+
+    X = lhoat_design(schema.lower, schema.upper, n_strata, f, seed)
+
+    values = evaluate(objective, X, workers)
+
+    S = lhoat_effects(values, d, f)
+
+    importance = S.mean(axis=0)
+    total = importance.sum()
+
+    ranking = pd.DataFrame({
+        'ParameterName': names,
+        'RelativeImportance': importance,
+        'RelativeImportance.Norm': importance / total if total > 0 else importance,
+    })
+
+    ranking = ranking.sort_values('RelativeImportance', ascending=False, kind='stable')
+    ranking.index = pd.RangeIndex(1, d + 1, name='RankingNmbr')
+
+    effects = pd.DataFrame(S, columns=names)
+
+    if drty_out is not None:
+
+        os.makedirs(drty_out, exist_ok=True)
+
+        write_lhoat_ranking(ranking, os.path.join(drty_out, 'LH_OAT-Ranking.txt'))
+
+        effects.to_csv(os.path.join(drty_out, 'LH_OAT-Effects.txt'), sep=' ', index=False)
+
+        np.savetxt(os.path.join(drty_out, 'LH_OAT-out.txt'), values, fmt='%.15g')
+
+        with open(os.path.join(drty_out, 'LH_OAT-logfile.txt'), 'w') as f_log:
+            f_log.write('N (number of strata) : {:}\n'.format(n_strata))
+            f_log.write('f (changing factor)  : {:}\n'.format(f))
+            f_log.write('parameters           : {:}\n'.format(d))
+            f_log.write('evaluations          : {:}\n'.format(len(values)))
+            f_log.write('workers              : {:}\n'.format(workers))
+            f_log.write('Elapsed Time         : {:.2f} hours\n'.format(
+                (time.time() - start) / 3600))
+
+    return ranking, effects
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Sobol indices
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def sobol_matrices(N, d, sample='QRN', rng=None):
+    ''' The base sample matrices A and B of a Sobol analysis (unit range).
+
+    As the R package sensobol, A and B are the first and last d columns
+    of a sample of 2d dimensions.
+
+    Input
+    -----
+    N: int
+        The number of rows (base sample size).
+    d: int
+        The number of parameters.
+    sample: str
+        The type of sample, either 'QRN' (Sobol quasi-random numbers),
+        'LHS' (Latin hypercube) or 'R' (random).
+
+    Returns
+    -------
+    The arrays A and B, both of shape (N, d).
+    '''
+
+    if sample == 'QRN':
+        U = qmc.Sobol(2 * d, seed=rng).random(N)
+    elif sample == 'LHS':
+        U = latin_hypercube(N, np.zeros(2 * d), np.ones(2 * d), rng)
+    elif sample == 'R':
+        U = np.random.default_rng(rng).random((N, 2 * d))
+    else:
+        raise ValueError('Unknown sample type: {:}'.format(sample))
+
+    return U[:, :d], U[:, d:]
+
+
+def _sobol_estimates(yA, yB, yAB, yBA=None):
+    """ The first-order and total indices of (replicated) model outputs.
+
+    yA and yB are of shape (..., N), yAB and yBA of shape (..., N, d);
+    Saltelli (2010) and Jansen (1999) estimators if yBA is None, else
+    those of Azzini et al. (2020).
+    """
+
+    yA = yA[..., None]
+    yB = yB[..., None]
+
+    if yBA is None:
+
+        V = np.var(np.concatenate([yA, yB], axis=-2), axis=(-2, -1))[..., None]
+
+        Si = np.mean(yB * (yAB - yA), axis=-2) / V
+        Ti = 0.5 * np.mean((yA - yAB) ** 2, axis=-2) / V
+
+    else:
+
+        D = np.sum((yA - yB) ** 2 + (yBA - yAB) ** 2, axis=-2)
+
+        Si = 2 * np.sum((yB - yBA) * (yAB - yA), axis=-2) / D
+        Ti = np.sum((yB - yBA) ** 2 + (yA - yAB) ** 2, axis=-2) / D
+
+    return Si, Ti
+
+
+def sobol_indices(yA, yB, yAB, yBA=None, R=1000, conf=0.95, rng=None, names=None,
+                  max_elements=2**22):
+    ''' The first-order and total Sobol indices, with bootstrap confidence intervals.
+
+    Input
+    -----
+    yA, yB: array
+        The model outputs of the rows of A and B, shape (N,).
+    yAB: array
+        The model outputs of the rows of AB_i (A with column i of B),
+        shape (N, d).
+    yBA: array
+        The model outputs of the rows of BA_i (B with column i of A), shape
+        (N, d); the estimators of Azzini et al. (2020) are used if given,
+        else those of Saltelli (2010) and Jansen (1999).
+    R: int
+        The number of bootstrap replicates.
+    conf: float
+        The confidence level of the (percentile) intervals.
+    names: list
+        The names of the parameters.
+    max_elements: int
+        The bootstrap replicates are computed in batches of at most
+        about max_elements model outputs.
+
+    Returns
+    -------
+    A data frame of the estimates (original), the bootstrap standard
+    error and confidence interval per parameter and sensitivity (Si, Ti).
+    '''
+
+    rng = np.random.default_rng(rng)
+
+    yA = np.asarray(yA, dtype=float)
+    yB = np.asarray(yB, dtype=float)
+    yAB = np.asarray(yAB, dtype=float)
+    yBA = None if yBA is None else np.asarray(yBA, dtype=float)
+
+    N, d = yAB.shape
+
+    Si, Ti = _sobol_estimates(yA, yB, yAB, yBA)
+
+    batch = max(1, max_elements // (N * d * (1 if yBA is None else 2)))
+
+    Si_boot = []
+    Ti_boot = []
+
+    for start in range(0, R, batch):
+
+        idx = rng.integers(0, N, size=(min(batch, R - start), N))
+
+        s, t = _sobol_estimates(
+            yA[idx], yB[idx], yAB[idx], None if yBA is None else yBA[idx])
+
+        Si_boot.append(s)
+        Ti_boot.append(t)
+
+    alpha = (1 - conf) / 2
+
+    if names is None:
+        names = ['X{:}'.format(i + 1) for i in range(d)]
+
+    frames = []
+
+    for (sensitivity, original, boot) in [
+            ('Si', Si, np.concatenate(Si_boot)),
+            ('Ti', Ti, np.concatenate(Ti_boot))]:
+
+        frames.append(pd.DataFrame({
+            'parameters': names,
+            'sensitivity': sensitivity,
+            'original': original,
+            'std.error': boot.std(axis=0, ddof=1),
+            'low.ci': np.quantile(boot, alpha, axis=0),
+            'high.ci': np.quantile(boot, 1 - alpha, axis=0),
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def sobol(param_schema=None, N=1000, objective=None, workers=1,
+          matrices='saltelli', sample='QRN', R=1000, conf=0.95, seed=None,
+          chunk_size=1000):
+    ''' Variance-based (Sobol) sensitivity analysis.
+
+    The parameters are sampled uniformly within the bounds of the schema.
+    Besides the base sample matrices A and B, for each parameter i the
+    matrix AB_i - A with column i of B - is evaluated (and BA_i for the
+    Azzini estimators), N * (2 + d) evaluations in all (N * (2 + 2d)):
+
+        ranking = sobol(schema, N=1000, objective=objective, workers=32)
+
+    Input
+    -----
+    param_schema: ParameterSchema
+        The parameters and their bounds, see "get_parameter_schema" if None.
+    N: int
+        The base sample size.
+    objective: callable
+        Returns the objective (float) of a parameter vector, e.g. a
+        "ModelObjective".
+    workers: int
+        The number of processes evaluating the objective, see "evaluate".
+    matrices: str
+        The estimators, either 'saltelli' (Saltelli first-order and
+        Jansen total indices, as in "6.SensitivitySobolAnalysis_1.R")
+        or 'azzini'.
+    sample: str
+        The type of sample, see "sobol_matrices".
+    R: int
+        The number of bootstrap replicates, see "sobol_indices".
+    conf: float
+        The confidence level.
+    seed: int
+        The seed of the sample and the bootstrap.
+    chunk_size: int
+        The number of parameter vectors built (and evaluated) at once.
+
+    Returns
+    -------
+    The indices, see "sobol_indices".
+
+    Notes
+    -----
+    Only the N x d base matrices and the model outputs are kept in memory,
+    the rows of AB_i (and BA_i) are built per chunk.
+    '''
+
+    schema = param_schema or get_parameter_schema()
+
+    if matrices not in ('saltelli', 'azzini'):
+        raise ValueError('Unknown estimators: {:}'.format(matrices))
+
+    rng = np.random.default_rng(seed)
+
+    d = len(schema)
+
+    lower = schema.lower
+    width = schema.upper - schema.lower
+
+    A, B = sobol_matrices(N, d, sample, rng)
+
+    A = lower + A * width
+    B = lower + B * width
+
+    # per matrix: the base matrix and the column taken from the other one
+    blocks = [(A, None, None), (B, None, None)]
+    blocks += [(A, B, i) for i in range(d)]
+
+    if matrices == 'azzini':
+        blocks += [(B, A, i) for i in range(d)]
+
+    Y = np.empty((len(blocks), N))
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1
+          else nullcontext()) as executor:
+
+        for (k, (base, other, i)) in enumerate(blocks):
+            for start in range(0, N, chunk_size):
+
+                X = base[start:start + chunk_size].copy()
+
+                if other is not None:
+                    X[:, i] = other[start:start + chunk_size, i]
+
+                Y[k, start:start + len(X)] = evaluate(objective, X, workers, executor)
+
+    yAB = Y[2:2 + d].T
+    yBA = Y[2 + d:].T if matrices == 'azzini' else None
+
+    names = ['_'.join(name.split('.', 1)) for name in schema.names]
+
+    return sobol_indices(Y[0], Y[1], yAB, yBA, R=R, conf=conf, rng=rng, names=names)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Morris screening
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def morris_trajectories(r, d, levels=4, n_candidates=None, rng=None):
+    ''' Morris trajectories in the unit hypercube, spread out.
+
+    A trajectory starts at a random point of the grid of levels per
+    parameter and changes one parameter at a time - in random order and
+    direction - by delta = levels / (2 * (levels - 1)).
+
+    Input
+    -----
+    r: int
+        The number of trajectories.
+    d: int
+        The number of parameters.
+    levels: int
+        The number of grid levels (even).
+    n_candidates: int
+        The trajectories are selected out of this many candidates, such
+        that they are far apart (Campolongo et al., 2007); not selected if
+        None or r.
+    rng: np.random.Generator
+        The random generator.
+
+    Returns
+    -------
+    The trajectories, shape (r, d + 1, d).
+    '''
+
+    rng = np.random.default_rng(rng)
+
+    n_candidates = r if n_candidates is None else max(r, n_candidates)
+
+    delta = levels / (2 * (levels - 1))
+
+    # the starting points on the grid - up to 1 - delta, going up by delta
+    grid = np.arange(levels // 2) / (levels - 1)
+    start = rng.choice(grid, size=(n_candidates, d))
+
+    direction = rng.choice([-1., 1.], size=(n_candidates, d))
+    start = start + delta * (direction < 0)
+
+    order = np.argsort(rng.random((n_candidates, d)), axis=1)
+
+    steps = np.zeros((n_candidates, d + 1, d))
+    rows = np.arange(n_candidates)[:, None]
+    steps[rows, np.arange(1, d + 1)[None, :], order] = (direction * delta)[rows, order]
+
+    trajectories = start[:, None, :] + np.cumsum(steps, axis=1)
+
+    if n_candidates > r:
+        trajectories = trajectories[_spread_out(trajectories, r)]
+
+    return trajectories
+
+
+def _spread_out(trajectories, r):
+    """ The indices of r trajectories far apart.
+
+    The distance of two trajectories is the sum of the distances between
+    their points; the trajectory closest to the others is dropped until r
+    are left (cf. Ruano et al., 2012). The distances of a trajectory to
+    itself do not count.
+    """
+
+    (n, m, d) = trajectories.shape
+
+    points = trajectories.reshape(n * m, d)
+
+    distances = np.empty((n, n))
+
+    # per trajectory, its (m, n * m) point distances only
+    for k in range(n):
+        distances[k] = cdist(trajectories[k], points).reshape(m, n, m).sum(axis=(0, 2))
+
+    np.fill_diagonal(distances, 0)
+
+    selected = list(range(n))
+    totals = distances.sum(axis=1)
+
+    while len(selected) > r:
+        k = selected[int(np.argmin(totals[selected]))]
+        selected.remove(k)
+        totals -= distances[:, k]
+
+    return np.array(selected)
+
+
+def morris_effects(trajectories, values):
+    ''' The elementary effects of the trajectories.
+
+    Input
+    -----
+    trajectories: array
+        The trajectories in the unit hypercube, shape (r, d + 1, d).
+    values: array
+        The model outputs of the points of the trajectories, shape (r, d + 1).
+
+    Returns
+    -------
+    The elementary effect of each parameter per trajectory, shape (r, d),
+    per unit of the (scaled) parameter range.
+    '''
+
+    steps = np.diff(trajectories, axis=1)
+    changes = np.diff(np.asarray(values, dtype=float), axis=1)
+
+    # the parameter changed in each step
+    changed = np.argmax(np.abs(steps), axis=2)
+
+    (r, d) = changed.shape
+    rows = np.arange(r)[:, None]
+
+    effects = np.empty((r, d))
+    effects[rows, changed] = changes / np.take_along_axis(steps, changed[:, :, None], 2)[:, :, 0]
+
+    return effects
+
+
+def morris_indices(effects, R=1000, conf=0.95, rng=None, names=None):
+    ''' The Morris statistics of the elementary effects, with bootstrap intervals.
+
+    Input
+    -----
+    effects: array
+        The elementary effects, shape (r, d), see "morris_effects".
+    R: int
+        The number of bootstrap replicates (of the trajectories).
+    conf: float
+        The confidence level of the (percentile) intervals of mu.star.
+    names: list
+        The names of the parameters.
+
+    Returns
+    -------
+    A data frame of the mean (mu), the mean absolute value (mu.star) and
+    the standard deviation (sigma) of the effects per parameter, with the
+    bootstrap standard error and confidence interval of mu.star.
+    '''
+
+    rng = np.random.default_rng(rng)
+
+    effects = np.asarray(effects, dtype=float)
+
+    (r, d) = effects.shape
+
+    magnitudes = np.abs(effects)
+
+    boot = magnitudes[rng.integers(0, r, size=(R, r))].mean(axis=1)
+
+    alpha = (1 - conf) / 2
+
+    if names is None:
+        names = ['X{:}'.format(i + 1) for i in range(d)]
+
+    return pd.DataFrame({
+        'parameters': names,
+        'mu': effects.mean(axis=0),
+        'mu.star': magnitudes.mean(axis=0),
+        'sigma': effects.std(axis=0, ddof=1),
+        'std.error': boot.std(axis=0, ddof=1),
+        'low.ci': np.quantile(boot, alpha, axis=0),
+        'high.ci': np.quantile(boot, 1 - alpha, axis=0),
+    })
+
+
+def morris(param_schema=None, r=20, objective=None, workers=1, levels=4,
+           n_candidates=None, R=1000, conf=0.95, seed=None, chunk_size=1000):
+    ''' Morris elementary-effects screening.
+
+    A cheap first pass before "sobol": r * (d + 1) evaluations in all, to
+    leave out the parameters without effect (see "morris_screen"):
+
+        indices = morris(schema, r=20, objective=objective, workers=32)
+        names = morris_screen(indices, schema)
+
+        ranking = sobol(ParameterSchema(names=names), objective=objective)
+
+    Input
+    -----
+    param_schema: ParameterSchema
+        The parameters and their bounds, see "get_parameter_schema" if None.
+    r: int
+        The number of trajectories.
+    objective: callable
+        Returns the objective (float) of a parameter vector, e.g. a
+        "ModelObjective".
+    workers: int
+        The number of processes evaluating the objective, see "evaluate".
+    levels: int
+        The number of grid levels, see "morris_trajectories".
+    n_candidates: int
+        The number of candidate trajectories, 4 * r if None.
+    R: int
+        The number of bootstrap replicates, see "morris_indices".
+    conf: float
+        The confidence level.
+    seed: int
+        The seed of the trajectories and the bootstrap.
+    chunk_size: int
+        The number of parameter vectors evaluated at once.
+
+    Returns
+    -------
+    The statistics, see "morris_indices"; the effects are per unit of
+    the (scaled) parameter range, so comparable across parameters.
+    '''
+
+    schema = param_schema or get_parameter_schema()
+
+    rng = np.random.default_rng(seed)
+
+    d = len(schema)
+
+    if n_candidates is None:
+        n_candidates = 4 * r
+
+    trajectories = morris_trajectories(r, d, levels, n_candidates, rng)
+
+    X = schema.lower + trajectories.reshape(-1, d) * (schema.upper - schema.lower)
+
+    Y = np.empty(len(X))
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1
+          else nullcontext()) as executor:
+
+        for start in range(0, len(X), chunk_size):
+            Y[start:start + chunk_size] = evaluate(
+                objective, X[start:start + chunk_size], workers, executor)
+
+    effects = morris_effects(trajectories, Y.reshape(r, d + 1))
+
+    names = ['_'.join(name.split('.', 1)) for name in schema.names]
+
+    return morris_indices(effects, R=R, conf=conf, rng=rng, names=names)
+
+
+def morris_screen(indices, param_schema=None, threshold=0.05):
+    ''' The parameters that matter, given the Morris statistics.
+
+    Input
+    -----
+    indices: pd.DataFrame
+        The Morris statistics of the parameters of the schema, see "morris".
+    param_schema: ParameterSchema
+        The parameters, see "get_parameter_schema" if None.
+    threshold: float
+        The parameters are kept if the upper confidence limit of their
+        mu.star is at least this fraction of the largest mu.star.
+
+    Returns
+    -------
+    The names of the kept parameters ("sub-model.parameter"), by
+    decreasing mu.star.
+    '''
+
+    schema = param_schema or get_parameter_schema()
+
+    mu_star = indices['mu.star'].values
+    kept = indices['high.ci'].values >= threshold * np.nanmax(mu_star)
+
+    order = np.argsort(-mu_star, kind='stable')
+
+    return [schema.names[i] for i in order if kept[i]]
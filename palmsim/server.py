@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+''' A long-lived simulation server, for R and Shiny clients.
+
+Instead of starting an interpreter, importing palmsim and reading the
+weather per run, clients send their runs to a server that keeps the
+weather and the sites in memory and runs the simulations in a pool of
+worker processes. The server speaks HTTP on localhost (or a Unix socket):
+
+    python -m palmsim.server --port 8765 --workers 4 \
+        --locations calibration_lhoat/InfoMejoresLotesSeleccionadosParaCalibracion.csv
+
+    POST /run   {"site": "Manuelita/QUITASUENO/313",
+                 "parameters": {"roots.specific_maintenance": 0.003},
+                 "outputs": ["generative_FFB_production (t/ha/yr)"]}
+
+A site is either the name of a known site (GET /sites) or a description
+of one - the weather file (on the server), the palm field settings and
+the duration - kept by each worker after its first run there:
+
+    {"site": {"weather": "/data/climate.csv", "duration": 3650,
+              "settings": {"year_of_planting": 2008, "latitude": 3.9, "dt": 1}}}
+
+The results are returned as binary columns (see "encode_columns"), or
+as JSON given "format": "json" (missing values as null). From R:
+
+    res <- httr::POST('http://127.0.0.1:8765/run', body = request, encode = 'json')
+    con <- rawConnection(httr::content(res, 'raw'))
+    n <- readBin(con, 'integer', size = 4, endian = 'little')
+    header <- jsonlite::fromJSON(rawToChar(readBin(con, 'raw', n)))
+    df <- as.data.frame(sapply(header$columns, function(name)
+        readBin(con, 'double', header$rows, size = 8, endian = 'little'),
+        simplify = FALSE))
+    df$date <- as.Date(df$date, origin = '1970-01-01')
+'''
+
+import os
+import json
+import struct
+import argparse
+import threading
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+import numpy as np
+import pandas as pd
+
+from .params import ParameterSchema, apply_vector
+from .calibrate import CLIMATE_COLUMNS, Site, read_sites
+
+
+def encode_columns(df):
+    ''' The numeric columns of the simulation results df, as bytes.
+
+    The layout is a JSON header - preceded by its length (uint32, little
+    endian) - followed by the columns as little endian float64 arrays, in
+    the order of the header:
+
+        {"columns": ["date", ...], "rows": 3650, "dtype": "<f8"}
+
+    The "date" column holds the days since 1970-01-01.
+    '''
+
+    columns = {'date': ((df.index.values.astype('datetime64[D]')
+                         - np.datetime64('1970-01-01', 'D')).astype(float))}
+
+    for name in df.columns:
+        if pd.api.types.is_numeric_dtype(df[name]):
+            columns[name] = df[name].values
+
+    header = json.dumps({'columns': list(columns), 'rows': len(df), 'dtype': '<f8'}).encode()
+
+    return b''.join([struct.pack('<I', len(header)), header] +
+                    [np.ascontiguousarray(values, dtype='<f8').tobytes()
+                     for values in columns.values()])
+
+
+def decode_columns(data):
+    ''' The simulation results of bytes encoded by "encode_columns". '''
+
+    (n,) = struct.unpack_from('<I', data)
+    header = json.loads(data[4:4 + n])
+
+    values = np.frombuffer(data, dtype=header['dtype'], offset=4 + n).reshape(
+        len(header['columns']), header['rows'])
+
+    df = pd.DataFrame(dict(zip(header['columns'], values)))
+    df.index = pd.to_datetime(df.pop('date'), unit='D')
+
+    return df
+
+
+def to_json_values(series):
+    ''' The values of a numeric column as a list, with None for NaN (and inf). '''
+
+    if not pd.api.types.is_float_dtype(series):
+        return series.tolist()
+
+    values = series.to_numpy().astype(object)
+    values[~np.isfinite(series.to_numpy())] = None
+
+    return values.tolist()
+
+
+def read_weather(filepath):
+    ''' The weather of a climate file, the columns of the weather series only. '''
+
+    weather = pd.read_csv(filepath, index_col='Date')
+    weather.index = pd.to_datetime(weather.index)
+
+    return weather[[c for c in weather.columns if c in CLIMATE_COLUMNS]]
+
+
+# the known sites, the cache and the described sites of a worker, see "_run"
+_WORKER_STATE = None
+
+
+def _set_worker_state(sites, cache):
+    global _WORKER_STATE
+    _WORKER_STATE = (sites, cache, {})
+
+
+def _get_worker_site(site):
+    """ The site of a name, or of a (name, description, weather file version). """
+
+    (sites, _, described) = _WORKER_STATE
+
+    if isinstance(site, str):
+        return sites[site]
+
+    (name, description, version) = site
+
+    known = described.get(name)
+
+    # read again if the weather file changed since
+    if known is None or known[0] != version:
+
+        weather = read_weather(description['weather'])
+
+        known = (version, Site(name, weather, duration=description.get('duration'),
+                               **description.get('settings', {})))
+
+        described[name] = known
+
+    return known[1]
+
+
+def _run(site, parameters, outputs=None, duration=None):
+    """ The results of a run at site with the parameter values (in a worker). """
+
+    site = _get_worker_site(site)
+    cache = _WORKER_STATE[1]
+
+    pf = site.make_palm_field()
+
+    if parameters:
+        schema = ParameterSchema(names=list(parameters))
+        apply_vector(pf, np.array(list(parameters.values()), dtype=float), schema)
+
+    duration = site.duration if duration is None else duration
+
+    if cache is None:
+        df = pf.run(duration=duration)
+        if outputs is not None:
+            df = df[list(outputs)]
+    else:
+        df = cache.run(pf, duration=duration, outputs=outputs)
+
+    return df
+
+
+class SimulationServer(object):
+    ''' Runs simulations on request, keeping the weather and the sites in memory.
+
+    Input
+    -----
+    sites: list
+        The known sites, see "Site" and "read_sites".
+    workers: int
+        The number of worker processes; requests are served concurrently,
+        up to workers simulations at a time.
+    cache: ResultCache
+        A cache of the simulation results, none if None.
+
+    Notes
+    -----
+    The workers get the known sites (and their weather) once, when they
+    start; a request only sends the site name, or the description of a
+    site - of which each worker reads the weather file once (per
+    modification). A pool of which a worker died (e.g. out of memory)
+    is replaced, failing the requests it was running.
+    '''
+
+    def __init__(self, sites=(), workers=1, cache=None):
+
+        self.sites = {site.name: site for site in sites}
+        self.workers = workers
+        self.cache = cache
+
+        self._lock = threading.Lock()
+        self._executor = self._make_executor()
+
+    def _make_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_set_worker_state,
+                                   initargs=(self.sites, self.cache))
+
+    def close(self):
+        self._executor.shutdown()
+
+    def get_site(self, site):
+        """ The site of a request as sent to the workers, see "_get_worker_site".
+
+        A site name, or a description (see the module docs) with the
+        version of its weather file.
+        """
+
+        if isinstance(site, str):
+            if site not in self.sites:
+                raise KeyError('Unknown site: {:}'.format(site))
+            return site
+
+        if not isinstance(site, dict) or 'weather' not in site:
+            raise ValueError('A site is a name or a description with a weather file')
+
+        name = json.dumps(site, sort_keys=True)
+        filepath = os.path.abspath(site['weather'])
+
+        return name, dict(site, weather=filepath), os.path.getmtime(filepath)
+
+    def run(self, request):
+        ''' The results (pd.DataFrame) of a run request, see the module docs. '''
+
+        site = self.get_site(request['site'])
+
+        executor = self._executor
+
+        try:
+            future = executor.submit(
+                _run, site, request.get('parameters'), request.get('outputs'),
+                request.get('duration'))
+
+            return future.result()
+
+        except BrokenProcessPool:
+
+            # replace the pool (once, for all the requests it failed)
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = self._make_executor()
+                    executor.shutdown(wait=False)
+
+            raise
+
+    def serve(self, host='127.0.0.1', port=8765, socket_path=None):
+        ''' Serves requests until interrupted, on a port or a Unix socket. '''
+
+        handler = type('Handler', (_RequestHandler,), {'server_': self})
+
+        if socket_path is None:
+            httpd = ThreadingHTTPServer((host, port), handler)
+            address = 'http://{:}:{:}'.format(host, port)
+        else:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            httpd = _UnixHTTPServer(socket_path, handler)
+            address = socket_path
+
+        print('palmsim server on {:} ({:} workers, {:} sites)'.format(
+            address, self.workers, len(self.sites)), flush=True)
+
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+            self.close()
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+
+    daemon_threads = True
+
+    def get_request(self):
+        (request, _) = super().get_request()
+        return request, ('local', 0)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    server_ = None
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, content):
+        self._send(status, json.dumps(content).encode(), 'application/json')
+
+    def do_GET(self):
+
+        if self.path == '/sites':
+            self._send_json(200, [{'name': name, 'duration': site.duration}
+                                  for (name, site) in self.server_.sites.items()])
+        else:
+            self._send_json(404, {'error': 'Unknown path: {:}'.format(self.path)})
+
+    def do_POST(self):
+
+        if self.path != '/run':
+            self._send_json(404, {'error': 'Unknown path: {:}'.format(self.path)})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+
+            df = self.server_.run(request)
+
+        except (KeyError, ValueError, TypeError, FileNotFoundError) as e:
+            self._send_json(400, {'error': repr(e)})
+            return
+        except Exception:
+            self._send_json(500, {'error': traceback.format_exc()})
+            return
+
+        if request.get('format') == 'json':
+            content = {'date': df.index.strftime('%Y-%m-%d').tolist()}
+            content.update({name: to_json_values(df[name]) for name in df.columns
+                            if pd.api.types.is_numeric_dtype(df[name])})
+            self._send_json(200, content)
+        else:
+            self._send(200, encode_columns(df), 'application/octet-stream')
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m palmsim.server',
+                                     description='A long-lived palmsim simulation server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--socket', default=None, help='serve on this Unix socket instead')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--locations', default=None,
+                        help='the known sites, see "calibration_lhoat/InfoMejoresLotesSeleccionadosParaCalibracion.csv"')
+    parser.add_argument('--observed', default=None,
+                        help='see "calibration_lhoat/obs_data/obs_yield.csv"')
+    parser.add_argument('--dt', type=int, default=1)
+    parser.add_argument('--cache', default=None, help='the result cache directory')
+
+    args = parser.parse_args(argv)
+
+    sites = []
+
+    if args.locations is not None:
+        observed = None if args.observed is None else pd.read_csv(args.observed)
+        sites = read_sites(args.locations, observed=observed, dt=args.dt)
+
+    cache = None
+
+    if args.cache is not None:
+        from .cache import ResultCache
+        cache = ResultCache(args.cache)
+
+    server = SimulationServer(sites, workers=args.workers, cache=cache)
+    server.serve(args.host, args.port, args.socket)
+
+
+if __name__ == '__main__':
+    main()
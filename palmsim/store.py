@@ -0,0 +1,533 @@
+#!/usr/bin/env python
+''' Stores of the results of many simulations.
+
+Both stores keep the runs by site and parameter hash (see
+"ParameterSchema.hashes") and have the same interface: "append",
+"has", "keys", "runs", "read", "read_harvests" and "flush". Next to
+the results (the time series) they keep the harvest events of the runs,
+as recorded by the harvest ledger (see "HarvestLedger"). The "ParquetStore" is meant
+for large ensembles, the "SQLiteStore" needs no extra dependency.
+'''
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from .components.generative import HarvestLedger
+
+# the fields of the harvest records, but the date
+HARVEST_FIELDS = [name for name in HarvestLedger.dtype.names if name != 'date']
+
+
+class SQLiteStore(object):
+    ''' The results of many runs in one SQLite file.
+
+    A run is identified by its site and the hash of its parameter values
+    (see "ParameterSchema.hashes") and gets a run id; its results - the
+    date and the numeric columns - go into one table indexed by run id:
+
+        store = SQLiteStore('grid.sqlite')
+        store.append('Manuelita/QUITASUENO/313', parameter_hash, parameters, df)
+
+        runs = store.runs()
+        df = store.read(columns=['generative_FFB_production (t/ha/yr)'],
+                        sites=['Manuelita/QUITASUENO/313'])
+
+    Input
+    -----
+    filepath: str
+        The store file, created if needed.
+
+    Notes
+    -----
+    Several processes can append to the same store, one at a time (the
+    appends wait for each other). All runs should have the same columns,
+    those of the first run.
+    '''
+
+    def __init__(self, filepath):
+
+        self.filepath = os.path.abspath(os.path.expanduser(filepath))
+
+        self._connection = sqlite3.connect(self.filepath, timeout=600,
+                                           isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY,
+                site TEXT NOT NULL,
+                parameter_hash TEXT NOT NULL,
+                parameters TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                written REAL,
+                UNIQUE (site, parameter_hash)
+            );
+            CREATE TABLE IF NOT EXISTS harvests (run_id INTEGER, date TEXT, {:});
+            CREATE INDEX IF NOT EXISTS harvests_run_id ON harvests (run_id);
+        '''.format(', '.join('{:} REAL'.format(name) for name in HARVEST_FIELDS)))
+
+    def __getstate__(self):
+        return {'filepath': self.filepath}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def __repr__(self):
+        return 'SQLiteStore({:}, {:} runs)'.format(self.filepath, len(self))
+
+    def close(self):
+        self._connection.close()
+
+    def flush(self):
+        """ Nothing to do, the runs are stored as they are appended. """
+
+    @property
+    def columns(self):
+        """ The result columns, none before the first run. """
+
+        rows = self._connection.execute('PRAGMA table_info(results)').fetchall()
+
+        return [row[1] for row in rows][2:]
+
+    def has(self, site, parameter_hash):
+        """ Whether the store holds the run of a site and parameter hash. """
+
+        return self._connection.execute(
+            'SELECT 1 FROM runs WHERE site = ? AND parameter_hash = ?',
+            (site, parameter_hash)).fetchone() is not None
+
+    def keys(self):
+        """ The (site, parameter hash) of the runs. """
+        return set(self._connection.execute('SELECT site, parameter_hash FROM runs'))
+
+    def append(self, site, parameter_hash, parameters, df, harvests=None):
+        ''' Adds the results df of a run, returns its run id.
+
+        Input
+        -----
+        site: str
+            The name of the site.
+        parameter_hash: str
+            The hash of the parameter values.
+        parameters: dict
+            The parameter values per "sub-model.parameter" name.
+        df: pd.DataFrame
+            The results, date-time indexed; the numeric columns are stored.
+        harvests: np.ndarray
+            The harvest records of the run (see "HarvestLedger.records"), none if None.
+
+        Returns
+        -------
+        The run id; that of the run in the store if already stored.
+        '''
+
+        columns = [name for name in df.columns if pd.api.types.is_numeric_dtype(df[name])]
+
+        dates = df.index.strftime('%Y-%m-%d')
+
+        connection = self._connection
+
+        connection.execute('BEGIN IMMEDIATE')
+
+        try:
+            row = connection.execute(
+                'SELECT run_id FROM runs WHERE site = ? AND parameter_hash = ?',
+                (site, parameter_hash)).fetchone()
+
+            if row is not None:
+                connection.execute('ROLLBACK')
+                return row[0]
+
+            if not self.columns:
+                connection.execute('CREATE TABLE results (run_id INTEGER, date TEXT, {:})'.format(
+                    ', '.join('{:} REAL'.format(_quote(name)) for name in columns)))
+                connection.execute('CREATE INDEX results_run_id ON results (run_id)')
+
+            run_id = connection.execute(
+                'INSERT INTO runs (site, parameter_hash, parameters, rows, written) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (site, parameter_hash, json.dumps(parameters), len(df), time.time())).lastrowid
+
+            connection.executemany(
+                'INSERT INTO results (run_id, date, {:}) VALUES ({:})'.format(
+                    ', '.join(_quote(name) for name in columns),
+                    ', '.join('?' * (len(columns) + 2))),
+                zip([run_id] * len(df), dates,
+                    *(df[name].astype(float).tolist() for name in columns)))
+
+            if harvests is not None and len(harvests) > 0:
+                connection.executemany(
+                    'INSERT INTO harvests (run_id, date, {:}) VALUES ({:})'.format(
+                        ', '.join(HARVEST_FIELDS), ', '.join('?' * (len(HARVEST_FIELDS) + 2))),
+                    zip([run_id] * len(harvests),
+                        np.datetime_as_string(harvests['date'], unit='D').tolist(),
+                        *(harvests[name].tolist() for name in HARVEST_FIELDS)))
+
+            connection.execute('COMMIT')
+
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+        return run_id
+
+    def runs(self):
+        ''' The runs: their site, parameter hash and parameter values, by run id. '''
+
+        df = pd.read_sql_query(
+            'SELECT run_id, site, parameter_hash, parameters, rows FROM runs ORDER BY run_id',
+            self._connection, index_col='run_id')
+
+        parameters = pd.DataFrame([json.loads(p) for p in df.pop('parameters')],
+                                  index=df.index)
+
+        return pd.concat([df, parameters], axis=1)
+
+    def read(self, columns=None, run_ids=None, sites=None, parameter_hashes=None):
+        ''' The results of the runs, one row per run and date.
+
+        Input
+        -----
+        columns: list
+            The result columns, all if None.
+        run_ids: list
+            The runs, all if None.
+        sites: list
+            The sites of the runs, all if None.
+        parameter_hashes: list
+            The parameter hashes of the runs, all if None.
+
+        Returns
+        -------
+        A data frame with the run id, the site, the date and the columns.
+        '''
+
+        columns = self.columns if columns is None else list(columns)
+
+        query = 'SELECT r.run_id, runs.site, r.date{:} FROM results r JOIN runs USING (run_id)'.format(
+            ''.join(', r.{:}'.format(_quote(name)) for name in columns))
+
+        return self._query(query, run_ids, sites, parameter_hashes)
+
+    def read_harvests(self, run_ids=None, sites=None, parameter_hashes=None):
+        ''' The harvest records of the runs, one row per run and harvest; see "read". '''
+
+        query = 'SELECT r.run_id, runs.site, r.date{:} FROM harvests r JOIN runs USING (run_id)'.format(
+            ''.join(', r.{:}'.format(name) for name in HARVEST_FIELDS))
+
+        return self._query(query, run_ids, sites, parameter_hashes)
+
+    def _query(self, query, run_ids=None, sites=None, parameter_hashes=None):
+        """ The rows of a query on the results or harvests (r) of the runs. """
+
+        conditions = []
+        args = []
+
+        for (field, values) in [('r.run_id', run_ids), ('runs.site', sites),
+                                ('runs.parameter_hash', parameter_hashes)]:
+            if values is not None:
+                values = [v.item() if isinstance(v, np.generic) else v for v in values]
+                conditions.append('{:} IN ({:})'.format(field, ', '.join('?' * len(values))))
+                args += values
+
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+
+        df = pd.read_sql_query(query + ' ORDER BY r.rowid', self._connection, params=args)
+        df['date'] = pd.to_datetime(df['date'])
+
+        return df
+
+
+class ParquetStore(object):
+    ''' The results of many runs in a directory of compressed Parquet files.
+
+    The results of the appended runs are buffered and written per chunk
+    of about chunk_bytes into a new Parquet file (a part) - rows of
+    the run id, site, parameter hash, date and the numeric columns - next
+    to a part of the run index. Reads are projected on columns and
+    filtered on runs, sites or parameter hashes without loading the rest:
+
+        with ParquetStore('ensemble') as store:
+            store.append(site, parameter_hash, parameters, df)
+
+        df = ParquetStore('ensemble').read(
+            columns=['generative_FFB_production (t/ha/yr)'], sites=[site])
+
+    From R the results are read with arrow::open_dataset('ensemble/results').
+
+    Input
+    -----
+    directory: str
+        The store directory, created if needed.
+    chunk_bytes: int
+        The size (in memory) of the buffered results written per part,
+        128 MB by default; writing a part takes about twice as much.
+    compression: str
+        The Parquet compression codec.
+    row_group_rows: int
+        The number of rows per row group, the unit of the filtered reads.
+
+    Notes
+    -----
+    Requires pyarrow. Each writer (process) writes its own parts - under
+    a temporary name, then renamed - so workers append concurrently
+    without locks; the appended runs are visible to readers once flushed
+    ("flush", "close" or leaving the with-block). The run id is derived
+    from the site and the parameter hash, the same for every writer. All
+    runs should have the same columns.
+    '''
+
+    def __init__(self, directory, chunk_bytes=2**27, compression='zstd', row_group_rows=2**16):
+
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('The ParquetStore requires pyarrow, see the SQLiteStore otherwise')
+
+        self._pa = pyarrow
+
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.chunk_bytes = chunk_bytes
+        self.compression = compression
+        self.row_group_rows = row_group_rows
+
+        for name in ['runs', 'results', 'harvests']:
+            os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+
+        self._runs = []
+        self._results = []
+        self._harvests = []
+        self._bytes = 0
+
+        self._keys = None
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'chunk_bytes': self.chunk_bytes,
+                'compression': self.compression, 'row_group_rows': self.row_group_rows}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        return 'ParquetStore({:}, {:} runs)'.format(self.directory, len(self))
+
+    @staticmethod
+    def run_id(site, parameter_hash):
+        """ The run id of a site and parameter hash (int64). """
+
+        digest = hashlib.sha256('{:}/{:}'.format(site, parameter_hash).encode()).digest()
+
+        return int.from_bytes(digest[:8], 'little') & (2**63 - 1)
+
+    def _dataset(self, name):
+        """ The dataset of the runs, results or harvests parts, None if there are none. """
+
+        directory = os.path.join(self.directory, name)
+
+        filepaths = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                           if f.endswith('.parquet'))
+
+        if not filepaths:
+            return None
+
+        return self._pa.dataset.dataset(filepaths, format='parquet')
+
+    @property
+    def columns(self):
+        """ The result columns, none before the first run. """
+
+        dataset = self._dataset('results')
+
+        if dataset is None:
+            return []
+
+        return [name for name in dataset.schema.names
+                if name not in ('run_id', 'site', 'parameter_hash', 'date')]
+
+    def keys(self):
+        """ The (site, parameter hash) of the runs. """
+
+        if self._keys is None:
+
+            dataset = self._dataset('runs')
+
+            self._keys = set()
+
+            if dataset is not None:
+                table = dataset.to_table(columns=['site', 'parameter_hash'])
+                self._keys.update(zip(table['site'].to_pylist(),
+                                      table['parameter_hash'].to_pylist()))
+
+        return self._keys
+
+    def has(self, site, parameter_hash):
+        """ Whether the store holds the run of a site and parameter hash.
+
+        The runs appended by other writers are known as of the first call.
+        """
+        return (site, parameter_hash) in self.keys()
+
+    def append(self, site, parameter_hash, parameters, df, harvests=None):
+        ''' Adds the results df of a run, returns its run id; see "SQLiteStore.append". '''
+
+        run_id = self.run_id(site, parameter_hash)
+
+        if self.has(site, parameter_hash):
+            return run_id
+
+        results = {
+            'run_id': np.full(len(df), run_id, dtype=np.int64),
+            'site': site,
+            'parameter_hash': parameter_hash,
+            'date': pd.DatetimeIndex(df.index).values,
+        }
+
+        results.update({name: df[name].values.astype(float) for name in df.columns
+                        if pd.api.types.is_numeric_dtype(df[name])})
+
+        results = pd.DataFrame(results)
+
+        if harvests is not None and len(harvests) > 0:
+
+            records = {
+                'run_id': np.full(len(harvests), run_id, dtype=np.int64),
+                'site': site,
+                'parameter_hash': parameter_hash,
+                'date': harvests['date'].astype('datetime64[ns]'),
+            }
+
+            records.update({name: harvests[name] for name in HARVEST_FIELDS})
+
+            self._harvests.append(pd.DataFrame(records))
+
+        self._results.append(results)
+        self._runs.append((run_id, site, parameter_hash, json.dumps(parameters), len(df)))
+        self._bytes += int(results.memory_usage(index=False).sum())
+
+        self._keys.add((site, parameter_hash))
+
+        if self._bytes >= self.chunk_bytes:
+            self.flush()
+
+        return run_id
+
+    def _write(self, name, df):
+        """ Writes a part, in full or not at all. """
+
+        # unique per writer, also in forked copies of the store
+        filepath = os.path.join(self.directory, name, 'part-{:}-{:}-{:}.parquet'.format(
+            socket.gethostname(), os.getpid(), uuid.uuid4().hex[:12]))
+
+        table = self._pa.Table.from_pandas(df, preserve_index=False)
+
+        self._pa.parquet.write_table(table, filepath + '.tmp', compression=self.compression,
+                                     row_group_size=self.row_group_rows)
+
+        os.replace(filepath + '.tmp', filepath)
+
+    def flush(self):
+        """ Writes the buffered runs. """
+
+        if not self._runs:
+            return
+
+        # by site and run, for the row group statistics to skip the others
+        results = pd.concat(self._results, ignore_index=True)
+        results = results.sort_values(['site', 'run_id'], kind='stable', ignore_index=True)
+
+        # the results first: a run in the index is complete
+        self._write('results', results)
+
+        if self._harvests:
+            self._write('harvests', pd.concat(self._harvests, ignore_index=True))
+
+        self._write('runs', pd.DataFrame(self._runs, columns=[
+            'run_id', 'site', 'parameter_hash', 'parameters', 'rows']))
+
+        self._runs = []
+        self._results = []
+        self._harvests = []
+        self._bytes = 0
+
+    def close(self):
+        self.flush()
+
+    def runs(self):
+        ''' The runs: their site, parameter hash and parameter values, by run id. '''
+
+        dataset = self._dataset('runs')
+
+        if dataset is None:
+            return pd.DataFrame(columns=['site', 'parameter_hash', 'rows'],
+                                index=pd.Index([], name='run_id'))
+
+        df = dataset.to_table().to_pandas()
+
+        # runs appended by concurrent writers
+        df = df.drop_duplicates('run_id').set_index('run_id')
+
+        parameters = pd.DataFrame([json.loads(p) for p in df.pop('parameters')],
+                                  index=df.index)
+
+        return pd.concat([df, parameters], axis=1)
+
+    def read(self, columns=None, run_ids=None, sites=None, parameter_hashes=None):
+        ''' The results of the runs, one row per run and date; see "SQLiteStore.read". '''
+
+        columns = self.columns if columns is None else list(columns)
+
+        return self._read('results', columns, run_ids, sites, parameter_hashes)
+
+    def read_harvests(self, run_ids=None, sites=None, parameter_hashes=None):
+        ''' The harvest records of the runs, one row per run and harvest; see "read". '''
+        return self._read('harvests', HARVEST_FIELDS, run_ids, sites, parameter_hashes)
+
+    def _read(self, name, columns, run_ids=None, sites=None, parameter_hashes=None):
+        """ The rows of the results or harvests of the runs. """
+
+        dataset = self._dataset(name)
+
+        if dataset is None:
+            return pd.DataFrame(columns=['run_id', 'site', 'date'] + columns)
+
+        field = self._pa.dataset.field
+
+        condition = None
+
+        for (name, values) in [('run_id', run_ids), ('site', sites),
+                               ('parameter_hash', parameter_hashes)]:
+            if values is not None:
+                expression = field(name).isin(list(values))
+                condition = expression if condition is None else condition & expression
+
+        df = dataset.to_table(columns=['run_id', 'site', 'date'] + columns,
+                              filter=condition).to_pandas()
+
+        return df.drop_duplicates(['run_id', 'date'], ignore_index=True)
+
+
+def _quote(name):
+    """ A quoted SQL identifier. """
+    return '"{:}"'.format(name.replace('"', '""'))
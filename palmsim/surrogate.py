@@ -0,0 +1,494 @@
+#!/usr/bin/env python
+''' Surrogate models (emulators) of model outputs. '''
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import combinations, product
+
+import numpy as np
+
+from scipy.linalg import cho_solve, solve_triangular
+from scipy.optimize import minimize as scipy_minimize
+
+from .params import get_parameter_schema
+from .sensitivity import evaluate, latin_hypercube
+
+
+class GaussianProcess(object):
+    ''' Gaussian process regression of a single output on the unit hypercube.
+
+    A squared exponential kernel with a length scale per input (ARD) plus
+    noise; the hyper-parameters maximize the marginal likelihood.
+
+    Input
+    -----
+    n_restarts: int
+        The number of extra (random) starts of the hyper-parameter fit.
+    seed: int
+        The seed of the restarts.
+    '''
+
+    def __init__(self, n_restarts=5, seed=None):
+
+        self.n_restarts = n_restarts
+        self.rng = np.random.default_rng(seed)
+
+    def _kernel(self, X1, X2, length_scales, variance):
+
+        D = (X1[:, None, :] - X2[None, :, :]) / length_scales
+        return variance * np.exp(-0.5 * np.sum(D ** 2, axis=-1))
+
+    def _nll(self, theta, X, y):
+        """ The negative log marginal likelihood and its gradient.
+
+        The variance is profiled out: given the length scales and the
+        noise (relative to the variance) its optimum follows directly.
+        """
+
+        n, d = X.shape
+
+        length_scales = np.exp(theta[:d])
+        noise = np.exp(theta[d])
+
+        R = self._kernel(X, X, length_scales, 1.)
+        K = R + (noise + 1e-10) * np.eye(n)
+
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return 1e25, np.zeros_like(theta)
+
+        alpha = cho_solve((L, True), y)
+        variance = y @ alpha / n
+
+        nll = 0.5 * n * np.log(variance) + np.sum(np.log(np.diag(L)))
+
+        # d nll / d theta_k = -0.5 tr((alpha alpha' / variance - K^-1) dK/dtheta_k)
+        W = np.outer(alpha, alpha) / variance - cho_solve((L, True), np.eye(n))
+
+        grad = np.empty_like(theta)
+
+        for k in range(d):
+            D2 = (X[:, None, k] - X[None, :, k]) ** 2 / length_scales[k] ** 2
+            grad[k] = -0.5 * np.sum(W * R * D2)
+
+        grad[d] = -0.5 * np.trace(W) * noise
+
+        return nll, grad
+
+    def fit(self, X, y):
+        """ Fits the Gaussian process to outputs y (n,) at inputs X (n, d). """
+
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        d = X.shape[1]
+
+        self._y_mean = y.mean()
+        self._y_std = y.std() or 1.
+
+        z = (y - self._y_mean) / self._y_std
+
+        self._X = X
+
+        # e.g. a zero yield before the onset of production
+        if not np.any(z):
+            self.length_scales = np.ones(d)
+            self.variance = 0.
+            self.noise = 0.
+            self._L = np.eye(len(X))
+            self._alpha = z
+            return self
+
+        bounds = [(np.log(1e-2), np.log(1e2))] * d + [(np.log(1e-8), np.log(1.))]
+
+        starts = [np.concatenate([np.full(d, np.log(0.5)), [np.log(1e-4)]])]
+
+        for _ in range(self.n_restarts):
+            starts.append(np.array([self.rng.uniform(lo, hi) for (lo, hi) in bounds]))
+
+        best = None
+
+        for theta0 in starts:
+
+            res = scipy_minimize(self._nll, theta0, args=(X, z), jac=True,
+                                 method='L-BFGS-B', bounds=bounds)
+
+            if best is None or res.fun < best.fun:
+                best = res
+
+        theta = best.x
+
+        self.length_scales = np.exp(theta[:d])
+        noise = np.exp(theta[d])
+
+        K = self._kernel(X, X, self.length_scales, 1.) + (noise + 1e-10) * np.eye(len(X))
+
+        self._L = np.linalg.cholesky(K)
+        self._alpha = cho_solve((self._L, True), z)
+
+        # the profiled variance, of the signal and the noise
+        self.variance = z @ self._alpha / len(X)
+        self.noise = self.variance * noise
+
+        return self
+
+    def predict(self, X, return_std=False):
+        """ The predicted mean (and standard deviation) at inputs X (m, d). """
+
+        X = np.asarray(X, dtype=float)
+
+        R_s = self._kernel(X, self._X, self.length_scales, 1.)
+
+        mean = self._y_mean + self._y_std * (R_s @ self._alpha)
+
+        if not return_std:
+            return mean
+
+        V = solve_triangular(self._L, R_s.T, lower=True)
+        var = self.variance * np.maximum(1 - np.sum(V ** 2, axis=0), 0)
+
+        return mean, self._y_std * np.sqrt(var)
+
+
+class PolynomialChaos(object):
+    ''' Polynomial chaos expansion of a single output on the unit hypercube.
+
+    Orthonormal Legendre polynomials (uniform inputs) of total degree up to
+    degree, having at most interaction_order inputs per term, fitted by
+    (ridge) least squares. The uncertainty of a prediction is the spread of
+    the predictions of bootstrap fits.
+
+    Input
+    -----
+    degree: int
+        The maximum total degree of the terms.
+    interaction_order: int
+        The maximum number of inputs per term.
+    ridge: float
+        The ridge penalty of the least squares fit.
+    n_bootstrap: int
+        The number of bootstrap fits.
+    seed: int
+        The seed of the bootstrap.
+    '''
+
+    def __init__(self, degree=2, interaction_order=1, ridge=1e-8, n_bootstrap=50, seed=None):
+
+        self.degree = degree
+        self.interaction_order = interaction_order
+        self.ridge = ridge
+        self.n_bootstrap = n_bootstrap
+        self.rng = np.random.default_rng(seed)
+
+    def _multi_indices(self, d):
+        """ The degrees (per input) of the terms, the constant first. """
+
+        indices = [np.zeros(d, dtype=int)]
+
+        for order in range(1, min(self.interaction_order, d) + 1):
+            for inputs in combinations(range(d), order):
+                for degrees in product(range(1, self.degree + 1), repeat=order):
+
+                    if sum(degrees) > self.degree:
+                        continue
+
+                    index = np.zeros(d, dtype=int)
+                    index[list(inputs)] = degrees
+                    indices.append(index)
+
+        return np.array(indices)
+
+    def _basis(self, X):
+        """ The values of the terms at inputs X, shape (m, n_terms). """
+
+        Z = 2 * np.asarray(X, dtype=float) - 1
+
+        # orthonormal Legendre polynomials per degree: sqrt(2n + 1) P_n
+        P = [np.ones_like(Z), Z]
+
+        for n in range(1, self.degree):
+            P.append(((2 * n + 1) * Z * P[n] - n * P[n - 1]) / (n + 1))
+
+        P = np.stack([np.sqrt(2 * n + 1) * p for (n, p) in enumerate(P[:self.degree + 1])])
+
+        Psi = np.ones((len(Z), len(self.multi_indices)))
+
+        for k in range(Z.shape[1]):
+            Psi *= P[self.multi_indices[:, k], :, k].T
+
+        return Psi
+
+    def _lstsq(self, Psi, y):
+
+        A = Psi.T @ Psi + self.ridge * np.eye(Psi.shape[1])
+        return np.linalg.solve(A, Psi.T @ y)
+
+    def fit(self, X, y):
+        """ Fits the expansion to outputs y (n,) at inputs X (n, d). """
+
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        self.multi_indices = self._multi_indices(X.shape[1])
+
+        Psi = self._basis(X)
+
+        self.coefficients = self._lstsq(Psi, y)
+
+        n = len(y)
+
+        self._bootstrap = np.array([
+            self._lstsq(Psi[idx], y[idx])
+            for idx in self.rng.integers(0, n, size=(self.n_bootstrap, n))
+        ])
+
+        return self
+
+    def predict(self, X, return_std=False):
+        """ The predicted mean (and standard deviation) at inputs X (m, d). """
+
+        Psi = self._basis(X)
+
+        mean = Psi @ self.coefficients
+
+        if not return_std:
+            return mean
+
+        return mean, (Psi @ self._bootstrap.T).std(axis=1)
+
+    def sobol_indices(self):
+        """ The first-order and total Sobol indices, from the coefficients. """
+
+        c2 = self.coefficients[1:] ** 2
+        active = self.multi_indices[1:] > 0
+
+        variance = c2.sum()
+
+        only = active & (active.sum(axis=1, keepdims=True) == 1)
+
+        Si = (c2[:, None] * only).sum(axis=0) / variance
+        Ti = (c2[:, None] * active).sum(axis=0) / variance
+
+        return Si, Ti
+
+
+EMULATORS = {'gp': GaussianProcess, 'pce': PolynomialChaos}
+
+
+class Surrogate(object):
+    ''' An emulator of one or more model outputs as functions of the parameter vector.
+
+    One emulator - a Gaussian process ('gp') or a polynomial chaos expansion
+    ('pce') - per output, trained on a design of runs e.g. of an LH-OAT or
+    Sobol analysis:
+
+        schema = ParameterSchema(names=[...])
+        objective = ModelObjective(make_palm_field, annual_FFB_and_LAI, duration=10 * 365)
+
+        X = latin_hypercube(100, schema.lower, schema.upper)
+        Y = evaluate(objective, X, workers=32)
+
+        surrogate = Surrogate(schema, kind='gp').fit(X, Y)
+        surrogate.predict(x)
+
+    The surrogate then stands in for the model, see "SurrogateObjective".
+
+    Input
+    -----
+    schema: ParameterSchema
+        The parameters (and the bounds scaling them), see
+        "get_parameter_schema" if None.
+    kind: str
+        The emulator, 'gp' or 'pce'.
+    options:
+        Passed to the emulator e.g. the degree of the polynomial chaos.
+    '''
+
+    def __init__(self, schema=None, kind='gp', **options):
+
+        if kind not in EMULATORS:
+            raise ValueError('Unknown emulator: {:}'.format(kind))
+
+        self.schema = schema or get_parameter_schema()
+        self.kind = kind
+        self.options = options
+
+        self.emulators = []
+
+    def _unit(self, X):
+        """ Parameter vectors X scaled to the unit hypercube. """
+
+        lower = self.schema.lower
+        width = self.schema.upper - self.schema.lower
+
+        safe_width = np.where(width > 0, width, 1)
+
+        return (np.atleast_2d(np.asarray(X, dtype=float)) - lower) / safe_width
+
+    def fit(self, X, Y):
+        """ Fits an emulator per output (column) of Y to parameter vectors X. """
+
+        Y = np.asarray(Y, dtype=float)
+
+        if Y.ndim == 1:
+            Y = Y[:, None]
+
+        U = self._unit(X)
+
+        self.emulators = [
+            EMULATORS[self.kind](**self.options).fit(U, Y[:, k])
+            for k in range(Y.shape[1])
+        ]
+
+        return self
+
+    @property
+    def n_outputs(self):
+        return len(self.emulators)
+
+    def predict(self, X, return_std=False):
+        """ The predicted outputs at parameter vectors X, shape (m, n_outputs).
+
+        Also the standard deviations if return_std is True.
+        """
+
+        U = self._unit(X)
+
+        if not return_std:
+            return np.stack([em.predict(U) for em in self.emulators], axis=1)
+
+        predictions = [em.predict(U, return_std=True) for em in self.emulators]
+
+        mean = np.stack([p[0] for p in predictions], axis=1)
+        std = np.stack([p[1] for p in predictions], axis=1)
+
+        return mean, std
+
+
+class SurrogateObjective(object):
+    ''' An output of a surrogate, as the objective of a parameter vector.
+
+    Evaluates whole batches at once (see "evaluate"), e.g. to run a
+    calibration or a Sobol analysis on the surrogate:
+
+        minimize(SurrogateObjective(surrogate), schema, method='cmaes')
+    '''
+
+    def __init__(self, surrogate, output=0):
+
+        self.surrogate = surrogate
+        self.output = output
+
+    def __call__(self, x):
+        return float(self.batch(np.atleast_2d(x))[0])
+
+    def batch(self, X):
+        return self.surrogate.predict(X)[:, self.output]
+
+
+def _spread_out(candidates, unit, n, min_distance=0.1):
+    """ The first n candidates at least min_distance apart (unit hypercube, RMS).
+
+    Fills up with the next candidates if too few are far enough apart.
+    """
+
+    U = unit(candidates)
+    d = U.shape[1]
+
+    chosen = []
+
+    for (k, u) in enumerate(U):
+
+        if len(chosen) == n:
+            break
+
+        if all(np.sqrt(np.sum((u - U[j]) ** 2) / d) >= min_distance for j in chosen):
+            chosen.append(k)
+
+    rest = [k for k in range(len(U)) if k not in set(chosen)]
+    chosen += rest[:n - len(chosen)]
+
+    return candidates[chosen]
+
+
+def active_learning(surrogate, objective, X, Y, n_iterations=10, batch_size=8,
+                    n_candidates=2000, kappa=None, workers=1, seed=None, verbose=False):
+    ''' Refines a surrogate by simulating where it is most uncertain.
+
+    Per iteration a Latin hypercube of candidate parameter vectors is
+    predicted; the batch_size candidates with the largest uncertainty
+    (the standard deviation relative to that of the outputs, summed over
+    the outputs) are simulated and added to the design. Given kappa
+    the candidates with the lowest confidence bound of the first output
+
+        mean - kappa * std
+
+    are simulated instead - refining the surrogate where the minimum of
+    an objective may be.
+
+    Input
+    -----
+    surrogate: Surrogate
+        The surrogate, refitted to the growing design.
+    objective: callable
+        Returns the output(s) of a parameter vector e.g. a "ModelObjective".
+    X, Y: array
+        The initial design and its outputs.
+    n_iterations: int
+        The number of refinements.
+    batch_size: int
+        The number of simulations per refinement.
+    n_candidates: int
+        The number of candidates per refinement.
+    kappa: float
+        The weight of the uncertainty in the lower confidence bound.
+    workers: int
+        The number of processes simulating a batch.
+    seed: int
+        The seed of the candidates.
+
+    Returns
+    -------
+    The design X and its outputs Y - the surrogate is fitted to them.
+    '''
+
+    rng = np.random.default_rng(seed)
+    schema = surrogate.schema
+
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+
+    if Y.ndim == 1:
+        Y = Y[:, None]
+
+    surrogate.fit(X, Y)
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1
+          else nullcontext()) as executor:
+
+        for iteration in range(n_iterations):
+
+            candidates = latin_hypercube(n_candidates, schema.lower, schema.upper, rng)
+
+            mean, std = surrogate.predict(candidates, return_std=True)
+
+            if kappa is None:
+                score = -np.sum(std / (Y.std(axis=0) + 1e-12), axis=1)
+            else:
+                score = mean[:, 0] - kappa * std[:, 0]
+
+            chosen = _spread_out(candidates[np.argsort(score)], surrogate._unit, batch_size)
+
+            Y_new = evaluate(objective, chosen, workers, executor).reshape(len(chosen), -1)
+
+            X = np.concatenate([X, chosen])
+            Y = np.concatenate([Y, Y_new])
+
+            surrogate.fit(X, Y)
+
+            if verbose:
+                print('iteration {:>3}: {:} simulations, max. std {:.4g}'.format(
+                    iteration + 1, len(X), float(std.max())))
+
+    return X, Y
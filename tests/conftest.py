@@ -0,0 +1,62 @@
+''' Shared fixtures: palm fields on a site of the calibration data. '''
+
+import os
+
+import pandas as pd
+import pytest
+
+from palmsim import PalmField
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLIMATE_FILEPATH = os.path.join(
+    ROOT_DIR, 'calibration_lhoat', 'climate',
+    'ClimateData_Manuelita_QUITASUENO_313_2008-01-01_2018-12-01.csv')
+
+# the columns holding the harvest and the masses
+HARVEST_COLUMNS = ('FFB', 'CPO', 'PKO', 'EFB', 'bunch')
+MASS_COLUMNS = ('mass',)
+
+
+@pytest.fixture(scope='session')
+def weather():
+    weather = pd.read_csv(CLIMATE_FILEPATH, index_col='Date')
+    weather.index = pd.to_datetime(weather.index)
+    return weather
+
+
+@pytest.fixture(scope='session')
+def make_palm_field(weather):
+    """ A factory of palm fields planted at the start of the weather series. """
+
+    def make_palm_field(dt=10, **kwargs):
+
+        pf = PalmField(year_of_planting=2008, month_of_planting=1, day_of_planting=1,
+                       dt=dt, latitude=3.9, soil_depth=1, soil_texture_class='clay loam',
+                       **kwargs)
+
+        pf.weather.radiation_series = weather['solar (MJ/m2/day)']
+        pf.weather.rainfall_series = weather['precip (mm/day)']
+        pf.weather.temperature_series = weather['temperature (degC)']
+        pf.weather.humidity_series = weather['humidity (%)']
+
+        return pf
+
+    return make_palm_field
+
+
+@pytest.fixture
+def assert_columns_equal():
+    """ Asserts the numeric columns with one of the keys in their name are identical. """
+
+    def assert_columns_equal(result, expected, keys):
+
+        columns = [c for c in expected.columns if any(k in c for k in keys)
+                   and pd.api.types.is_numeric_dtype(expected[c])]
+
+        assert columns
+
+        pd.testing.assert_frame_equal(result[columns], expected[columns],
+                                      check_exact=True, check_dtype=False)
+
+    return assert_columns_equal
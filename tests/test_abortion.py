@@ -0,0 +1,66 @@
+''' The abortion fractions of all female cohorts at once, against the per-cohort formula. '''
+
+from math import exp
+
+import numpy as np
+
+
+def scalar_fractions(female, x):
+    """ The inflorescence abortion and bunch failure fraction of a female cohort (1/day). """
+
+    parameters = female.parameters
+
+    fractions = []
+
+    for (name, t0, t1, formula) in [
+            ('inflorescence_abortion', female.inflorescence_abortion_t0,
+             female.inflorescence_abortion_t1, lambda a: 1 - (1 / exp(a * x))),
+            ('bunch_failure', female.bunch_failure_t0, female.bunch_failure_t1,
+             lambda a: 1 - (exp(-a * x)))]:
+
+        a = parameters['stress_{:}_asymptote'.format(name)]['value']
+
+        if parameters['stress_{:}'.format(name)]['value'] == 1 and t0 <= female.age < t1:
+            fractions.append(formula(a))
+        else:
+            fractions.append(0)
+
+    return fractions
+
+
+def nonzero_mean(values):
+    values = [x for x in values if x > 0]
+    return sum(values) / len(values) if values else 0
+
+
+def test_abortion_fractions(make_palm_field):
+
+    pf = make_palm_field(dt=10)
+
+    compared = 0
+
+    for _ in range(8 * 36):
+
+        pf.update()
+
+        container = pf.generative
+
+        (females, abortion, failure) = container._get_abortion_fractions()
+
+        expected = np.array([scalar_fractions(x, container.stress_index)
+                             for x in females]).reshape(-1, 2)
+
+        assert len(females) == len(container._females)
+
+        np.testing.assert_array_equal(abortion, expected[:, 0])
+        np.testing.assert_array_equal(failure, expected[:, 1])
+
+        # the diagnostics of the container
+        assert np.isclose(container.inflorescence_abortion_fraction,
+                          nonzero_mean(expected[:, 0]), rtol=1e-14, atol=0)
+        assert np.isclose(container.bunch_failure_fraction,
+                          nonzero_mean(expected[:, 1]), rtol=1e-14, atol=0)
+
+        compared += np.count_nonzero(expected)
+
+    assert compared > 0
@@ -0,0 +1,80 @@
+''' The on-disk cache of simulation results. '''
+
+import os
+import copy
+
+import pandas as pd
+
+from palmsim import PalmField, ParameterSet, ResultCache, set_parameters
+from palmsim.cache import get_parameters_key
+
+
+def test_key_follows_the_parameters(tmp_path):
+
+    cache = ResultCache(str(tmp_path))
+
+    key = cache.key(PalmField(), 365)
+
+    assert cache.key(PalmField(parameter_set=ParameterSet()), 365) == key
+
+    pf = PalmField()
+    settings = {'trunk': copy.deepcopy(pf.trunk.parameters)}
+    settings['trunk']['specific_maintenance']['value'] *= 2
+    set_parameters(pf, settings)
+
+    assert ('trunk', 'specific_maintenance', 2 * PalmField().trunk.parameters[
+        'specific_maintenance']['value']) in get_parameters_key(pf)
+    assert cache.key(pf, 365) != key
+
+
+def test_corrupt_result_is_a_miss(tmp_path):
+
+    cache = ResultCache(str(tmp_path))
+
+    cache.put('a', pd.DataFrame({'x': [1.0, 2.0]}))
+
+    # not a pickle, and a pickle of a missing class (AttributeError)
+    for content in (b'not a pickle', b'cbuiltins\nno_such_class\n.'):
+
+        with open(cache._filepath('a'), 'wb') as f:
+            f.write(content)
+
+        assert cache.get('a') is None
+        assert not os.path.exists(cache._filepath('a'))
+
+
+def test_eviction(tmp_path, monkeypatch):
+
+    df = pd.DataFrame({'x': range(1000)}, dtype=float)
+
+    cache = ResultCache(str(tmp_path), max_bytes=100 * 9000)
+
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, '_entries', lambda: scans.append(1) or entries())
+
+    for i in range(200):
+        cache.put(str(i), df)
+        assert cache._size <= cache.max_bytes
+
+    assert cache.size <= cache.max_bytes
+    assert cache.get('199') is not None
+    assert cache.get('0') is None
+
+    # no re-count per result once full
+    assert len(scans) < 20
+
+
+def test_run_with_key(tmp_path):
+
+    cache = ResultCache(str(tmp_path))
+
+    outputs = ['trunk_mass (kg_DM/ha)']
+
+    (key, df) = cache.run_with_key(PalmField(dt=10), duration=365, outputs=outputs)
+
+    assert key == cache.key(PalmField(dt=10), 365, outputs)
+    assert cache.misses == 1
+
+    pd.testing.assert_frame_equal(cache.run(PalmField(dt=10), duration=365, outputs=outputs), df)
+    assert cache.hits == 1
@@ -0,0 +1,145 @@
+''' The optimizers on test functions, and the calibration sites. '''
+
+import os
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import palmsim.calibrate as calibrate
+
+from palmsim import ParameterSchema
+from palmsim.params import get_parameter_schema
+from palmsim.calibrate import minimize, read_sites, MultiSiteObjective
+
+from conftest import ROOT_DIR
+
+CALIBRATION_DIR = os.path.join(ROOT_DIR, 'calibration_lhoat')
+LOCATIONS = 'InfoMejoresLotesSeleccionadosParaCalibracion.csv'
+
+
+def make_schema(lower, upper):
+    """ A schema of len(lower) model parameters, with the bounds given. """
+
+    names = get_parameter_schema().names[:len(lower)]
+
+    schema = ParameterSchema(names=list(names))
+    schema.lower = np.asarray(lower, dtype=float)
+    schema.upper = np.asarray(upper, dtype=float)
+
+    return schema
+
+
+def sphere(x):
+    return float(((np.asarray(x) - 0.3) ** 2).sum())
+
+
+def rosenbrock(x):
+    return float(100 * (x[1] - x[0] ** 2) ** 2 + (1 - x[0]) ** 2)
+
+
+@pytest.mark.parametrize('method', ['pso', 'de', 'cmaes'])
+def test_sphere(method):
+
+    schema = make_schema([-1] * 4, [2] * 4)
+
+    result = minimize(sphere, schema, method=method, popsize=20, max_generations=200, seed=1)
+
+    assert result.value < 1e-6
+    np.testing.assert_allclose(result.x, 0.3, atol=1e-3)
+
+
+@pytest.mark.parametrize('method', ['pso', 'de', 'cmaes'])
+def test_rosenbrock(method):
+
+    schema = make_schema([-2, -1], [2, 3])
+
+    result = minimize(rosenbrock, schema, method=method, popsize=30, max_generations=400, seed=1)
+
+    assert result.value < 1e-4
+    np.testing.assert_allclose(result.x, [1, 1], atol=0.05)
+    assert (result.x >= schema.lower).all() and (result.x <= schema.upper).all()
+
+
+def test_optimum_on_the_bounds():
+
+    schema = make_schema([0.5] * 3, [1] * 3)
+
+    result = minimize(sphere, schema, method='de', popsize=20, max_generations=100, seed=1)
+
+    assert (result.x >= 0.5).all()
+    np.testing.assert_allclose(result.x, 0.5, atol=1e-4)
+
+
+class BatchSphere(object):
+    """ An objective evaluating its batches itself. """
+
+    def __call__(self, x):
+        return sphere(x)
+
+    def batch(self, X):
+        return np.array([sphere(x) for x in X])
+
+
+def test_no_pool_for_batch_objectives(monkeypatch):
+
+    def pool(*args, **kwargs):
+        raise AssertionError('A process pool was started')
+
+    monkeypatch.setattr(calibrate, 'ProcessPoolExecutor', pool)
+
+    schema = make_schema([-1] * 2, [1] * 2)
+
+    result = minimize(BatchSphere(), schema, method='cmaes', max_generations=5, workers=4, seed=1)
+
+    assert result.generations == 5
+
+
+@pytest.fixture(scope='module')
+def sites():
+
+    observed = pd.read_csv(os.path.join(CALIBRATION_DIR, 'obs_data', 'obs_yield.csv'))
+
+    return read_sites(os.path.join(CALIBRATION_DIR, LOCATIONS), observed=observed, dt=10)
+
+
+def test_read_sites(sites):
+
+    locations = pd.read_csv(os.path.join(CALIBRATION_DIR, LOCATIONS), sep=';')
+
+    assert len(sites) == len(locations)
+    assert len(set(site.name for site in sites)) == len(sites)
+
+    site = sites[0]
+
+    assert site.name == 'Manuelita/QUITASUENO/313'
+    assert site.settings['year_of_planting'] == 2008
+    assert site.settings['soil_texture_class'] == 'clay loam'
+    assert site.duration == (pd.Timestamp('2018-12-01') - pd.Timestamp('2008-01-01')).days
+
+    for site in sites:
+        assert site.duration > 0
+        assert len(site.observed) > 0
+        assert site.statistic is not None
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_multi_site_objective(sites, workers):
+
+    sites = copy.deepcopy(sites[:3])
+
+    for site in sites:
+        site.duration = 4 * 365
+
+    schema = ParameterSchema(names=['roots.specific_maintenance', 'trunk.specific_maintenance'])
+    X = np.array([schema.lower, schema.upper])
+    weights = [1, 2, 3]
+
+    expected = np.array([[site.evaluate(x, schema) for site in sites] for x in X])
+
+    with MultiSiteObjective(sites, weights=weights, schema=schema, workers=workers) as objective:
+
+        np.testing.assert_array_equal(objective.site_values(X), expected)
+        np.testing.assert_allclose(objective.batch(X), expected @ weights / 6, rtol=1e-12)
+        assert objective(X[0]) == objective.batch(X)[0]
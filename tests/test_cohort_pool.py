@@ -0,0 +1,53 @@
+''' Re-use of the cohort objects: few allocations in the steady state. '''
+
+import tracemalloc
+
+from palmsim.components.generative import Indeterminate, Female, Male
+
+
+def test_steady_state_allocations(make_palm_field, monkeypatch):
+
+    constructed = {kls: 0 for kls in [Indeterminate, Female, Male]}
+
+    for kls in constructed:
+
+        def __init__(self, *args, _kls=kls, _init=kls.__init__, **kwargs):
+            constructed[_kls] += 1
+            _init(self, *args, **kwargs)
+
+        monkeypatch.setattr(kls, '__init__', __init__)
+
+    pf = make_palm_field(dt=1)
+
+    # the first 5 years fill the pool
+    for i in range(5 * 365):
+        pf.update()
+
+    halfway = sum(constructed.values())
+    cohorts = pf.generative._number_of_cohorts
+
+    for i in range(3 * 365):
+        pf.update()
+
+    # the last 2 years are traced
+    tracemalloc.start()
+
+    try:
+        for i in range(2 * 365):
+            pf.update()
+
+        (_, peak) = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    # over the last 5 years some 1800 cohorts are initiated and differentiated
+    # (one per day), the objects of the deleted ones are re-used: only the
+    # cohorts added to the (growing) number of cohorts alive are constructed
+    added = pf.generative._number_of_cohorts - cohorts
+
+    assert added < 500
+    assert sum(constructed.values()) - halfway <= added + 10
+
+    # the memory allocated (or re-allocated) is that of the cohorts alive
+    assert peak < 1000 * pf.generative._number_of_cohorts
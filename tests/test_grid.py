@@ -0,0 +1,82 @@
+''' The parameter grids: duplicates, shards, complements and resumed runs. '''
+
+import numpy as np
+
+from palmsim import ParameterSchema
+from palmsim.calibrate import Site, CLIMATE_COLUMNS
+from palmsim.grid import sample_grid, full_grid, deduplicate, get_shard, run_grid, _complement
+from palmsim.params import get_parameter_schema
+from palmsim.store import SQLiteStore
+
+
+def test_deduplicate_keeps_first_occurrences():
+
+    schema = ParameterSchema(names=['roots.specific_maintenance', 'trunk.conversion_efficiency'])
+
+    X = np.array([[3., 1.], [1., 2.], [3., 1.], [2., 0.], [1., 2.], [0., 5.]])
+
+    assert np.array_equal(deduplicate(X, schema), [[3., 1.], [1., 2.], [2., 0.], [0., 5.]])
+
+    # a vector of distinct ones is kept as is
+    Y = X[[5, 3, 1, 0]]
+    assert np.array_equal(deduplicate(Y, schema), Y)
+
+
+def test_shards_cover_the_runs_once():
+
+    schema = get_parameter_schema()
+    keys = ['{:}/{:}'.format(site, h) for site in ('a', 'b', 'c')
+            for h in schema.hashes(sample_grid(schema, 200, rng=0))]
+
+    for n_shards in (1, 2, 3, 7):
+
+        shards = [[key for key in keys if get_shard(key, n_shards) == i] for i in range(n_shards)]
+
+        assert sorted(sum(shards, [])) == sorted(keys)
+        assert all(shards)
+
+    # the same on every call (machine)
+    assert [get_shard(key, 7) for key in keys] == [get_shard(key, 7) for key in keys]
+
+
+def test_frond_fractions_add_up_to_one():
+
+    schema = get_parameter_schema()
+
+    (i, j) = (schema.index('fronds.fraction_rachis'), schema.index('fronds.fraction_leaflets'))
+
+    X = sample_grid(schema, 100, rng=0)
+    assert np.allclose(X[:, i] + X[:, j], 1)
+
+    X = np.random.default_rng(0).uniform(size=(10, len(schema)))
+    assert np.allclose(_complement(X, schema)[:, i] + X[:, j], 1)
+
+    schema = ParameterSchema(names=['fronds.fraction_rachis', 'fronds.fraction_leaflets'])
+    X = full_grid(schema)
+    assert len(X) == 25 and np.allclose(X.sum(axis=1), 1)
+
+
+def test_run_grid_resumes(tmp_path, weather):
+
+    site = Site('313', weather[[c for c in weather.columns if c in CLIMATE_COLUMNS]],
+                duration=365, year_of_planting=2008, latitude=3.9, soil_depth=1,
+                soil_texture_class='clay loam', dt=10)
+
+    schema = ParameterSchema(names=['roots.specific_maintenance'])
+    X = np.outer([0.8, 1.0, 1.2, 0.8], schema.defaults)
+
+    store = SQLiteStore(str(tmp_path / 'grid.sqlite'))
+    outputs = ['trunk_mass (kg_DM/ha)']
+
+    # the shards together run each distinct vector once
+    n_runs = [run_grid(X, schema, [site], store, shard=i, n_shards=2, outputs=outputs)
+              for i in range(2)]
+
+    assert sum(n_runs) == 3
+    assert store.keys() == {(site.name, h) for h in schema.hashes(X[:3])}
+
+    # nothing left to run, and only the new vector of a larger grid
+    assert run_grid(X, schema, [site], store, outputs=outputs) == 0
+    assert run_grid(np.outer([0.9], schema.defaults), schema, [site], store,
+                    outputs=outputs) == 1
+    assert len(store) == 4
@@ -0,0 +1,60 @@
+''' The harvest ledger: the harvest outputs and the stores read from it. '''
+
+import numpy as np
+import pytest
+
+from palmsim.store import SQLiteStore, ParquetStore
+
+
+@pytest.fixture(scope='module')
+def palm_field_run(make_palm_field):
+
+    pf = make_palm_field(dt=10)
+    df = pf.run(duration=8 * 365)
+
+    return pf, df
+
+
+def test_outputs_follow_the_ledger(palm_field_run):
+
+    (pf, df) = palm_field_run
+
+    records = pf.generative.harvest_ledger.records
+
+    assert len(records) > 0
+
+    rows = df.loc[records['date'].astype('datetime64[ns]')]
+
+    np.testing.assert_array_equal(rows['generative_bunch_count_daily (1/ha/day)'],
+                                  records['bunch_count'] / records['span'])
+    np.testing.assert_array_equal(rows['generative_CPO_production (kg_DM/ha/day)'],
+                                  records['oil'] / records['span'])
+    np.testing.assert_array_equal(rows['generative_bunch_weight (kg)'], records['bunch_weight'])
+
+
+@pytest.mark.parametrize('kind', ['sqlite', 'parquet'])
+def test_stores_keep_the_ledger(palm_field_run, tmp_path, kind):
+
+    (pf, df) = palm_field_run
+
+    records = pf.generative.harvest_ledger.records
+
+    if kind == 'sqlite':
+        store = SQLiteStore(str(tmp_path / 'store.sqlite'))
+    else:
+        pytest.importorskip('pyarrow')
+        store = ParquetStore(str(tmp_path / 'store'))
+
+    run_id = store.append('site', 'hash', {}, df, harvests=records)
+    store.append('other', 'hash', {}, df)
+    store.flush()
+
+    harvests = store.read_harvests(sites=['site'])
+
+    assert (harvests['run_id'] == run_id).all()
+    np.testing.assert_array_equal(harvests['date'].values, records['date'].astype('datetime64[ns]'))
+
+    for name in records.dtype.names[1:]:
+        np.testing.assert_array_equal(harvests[name].values, records[name])
+
+    assert len(store.read_harvests(sites=['other'])) == 0
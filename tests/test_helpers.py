@@ -0,0 +1,25 @@
+''' The shared splines stay bounded. '''
+
+from palmsim.components.helpers import Spline, get_spline, _get_spline
+
+
+def test_shared_splines_are_bounded():
+
+    coords = [[0, 1], [5, 5], [10, 3], [20, 2]]
+
+    assert get_spline(coords, k=3) is get_spline([tuple(x) for x in coords], k=3)
+
+    for i in range(2 * _get_spline.cache_info().maxsize):
+        get_spline([[0, i], [5, 5], [10, 3], [20, 2]], k=3)
+
+    assert _get_spline.cache_info().currsize == _get_spline.cache_info().maxsize
+
+
+def test_memoized_values_are_bounded():
+
+    s = Spline([[0, 1], [5, 5], [10, 3], [20, 2]], k=3)
+
+    for x in range(2 * s._max_values):
+        assert s.calc(x / 100) == s.calc_array([x / 100])[0]
+
+    assert len(s._values) == s._max_values
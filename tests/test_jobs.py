@@ -0,0 +1,63 @@
+''' The durable queue of simulation jobs. '''
+
+import numpy as np
+
+from palmsim import ParameterSet, ParameterSchema, apply_vector
+from palmsim.calibrate import Site, CLIMATE_COLUMNS
+from palmsim.jobs import JobQueue, run
+
+
+def trunk_mass(df):
+    return df['trunk_mass (kg_DM/ha)'].iloc[-1]
+
+
+def test_results_are_of_the_worker_holding_the_job(tmp_path):
+
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite'), lease=-1)
+    queue.submit([[0.001]], ParameterSchema(names=['trunk.specific_maintenance']))
+
+    (job_id, _, _, _) = queue.claim('a')
+
+    # the lease expired: claimed by another worker
+    assert queue.claim('b')[0] == job_id
+
+    assert not queue.complete(job_id, value=1, worker='a')
+    assert not queue.fail(job_id, worker='a')
+    assert queue.complete(job_id, value=2, worker='b')
+
+    assert queue.results()['value'].tolist() == [2]
+
+
+def test_expired_lease_counts_as_attempt(tmp_path):
+
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite'), lease=-1, max_attempts=2)
+    queue.submit([[0.001]], ParameterSchema(names=['trunk.specific_maintenance']))
+
+    assert queue.claim('a') is not None
+    assert queue.claim('b') is not None
+    assert queue.claim('c') is None
+
+    assert queue.counts()['failed'] == 1
+
+
+def test_run_with_the_submitted_parameter_set(tmp_path, weather):
+
+    site = Site('313', weather[[c for c in weather.columns if c in CLIMATE_COLUMNS]],
+                duration=2 * 365, statistic=trunk_mass, year_of_planting=2008,
+                latitude=3.9, soil_depth=1, soil_texture_class='clay loam', dt=10)
+
+    ps = ParameterSet().with_values({'trunk.conversion_efficiency': 0.5})
+    schema = ParameterSchema(ps, names=['roots.specific_maintenance'])
+    X = np.outer([0.9, 1.1], schema.defaults)
+
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite'))
+    queue.submit(X, schema, sites=[site.name])
+
+    assert run(queue.filepath, [site], workers=2) == 2
+
+    for (x, value) in zip(X, queue.results()['value']):
+        pf = site.make_palm_field(ps)
+        apply_vector(pf, x, schema)
+        assert value == trunk_mass(pf.run(duration=site.duration))
+
+    assert value != site.evaluate(x, ParameterSchema(names=['roots.specific_maintenance']))
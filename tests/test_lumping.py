@@ -0,0 +1,46 @@
+''' Lumping of new cohorts into age classes. '''
+
+import pytest
+
+from conftest import HARVEST_COLUMNS, MASS_COLUMNS
+
+
+def test_merge_conserves_count_and_mass(make_palm_field):
+
+    pf = make_palm_field(dt=10)
+    pf.run(duration=3 * 365)
+
+    cohorts = [x for x in pf.generative._indeterminates if x.mass > 0]
+    (a, b) = cohorts[:2]
+
+    count = a.num_inflorescences + b.num_inflorescences
+    mass = a.num_inflorescences * a.mass + b.num_inflorescences * b.mass
+
+    a.merge(b)
+
+    assert a.num_inflorescences == pytest.approx(count, rel=1e-12)
+    assert a.num_inflorescences * a.mass == pytest.approx(mass, rel=1e-12)
+
+
+def test_no_lumping_within_a_time_step(make_palm_field, assert_columns_equal):
+
+    expected = make_palm_field(dt=10).run(duration=12 * 365)
+    result = make_palm_field(dt=10, cohort_lumping_width=10).run(duration=12 * 365)
+
+    assert_columns_equal(result, expected, HARVEST_COLUMNS + MASS_COLUMNS)
+
+
+def test_lumping_error(make_palm_field):
+
+    duration = 5 * 365
+
+    unlumped = make_palm_field(dt=1)
+    expected = unlumped.run(duration=duration)
+
+    lumped = make_palm_field(dt=1, cohort_lumping_width=10)
+    result = lumped.run(duration=duration)
+
+    assert len(lumped.generative.cohorts) < len(unlumped.generative.cohorts) / 5
+
+    for name in ['generative_FFB_production (t/ha/yr)', 'generative_mass (kg_DM/ha)']:
+        assert result[name].mean() == pytest.approx(expected[name].mean(), rel=0.03)
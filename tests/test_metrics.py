@@ -0,0 +1,62 @@
+''' The goodness-of-fit metrics against hand-computed values. '''
+
+import numpy as np
+import pandas as pd
+
+from palmsim.metrics import rmse, bias, pbias, nse, r2, kge, goodness_of_fit, aggregate
+
+OBSERVED = np.array([1., 2., 3., 4.])
+SIMULATED = np.array([2., 2., 4., 4.])
+
+
+def test_single_run():
+
+    # errors 1, 0, 1, 0; observed mean 2.5, squared deviations 5
+    assert rmse(SIMULATED, OBSERVED) == np.sqrt(0.5)
+    assert bias(SIMULATED, OBSERVED) == 0.5
+    assert pbias(SIMULATED, OBSERVED) == 20
+    assert nse(SIMULATED, OBSERVED) == 1 - 2 / 5
+
+    # simulated mean 3, deviations -1 -1 1 1 (sum of squares 4), covariance sum 4
+    r = 4 / np.sqrt(4 * 5)
+
+    assert np.isclose(r2(SIMULATED, OBSERVED), r ** 2)
+    assert np.isclose(kge(SIMULATED, OBSERVED),
+                      1 - np.sqrt((r - 1) ** 2 + (np.sqrt(4 / 5) - 1) ** 2 + (3 / 2.5 - 1) ** 2))
+
+
+def test_runs_and_missing_values():
+
+    observed = np.r_[OBSERVED, np.nan]
+    simulated = np.array([np.r_[SIMULATED, 7.], np.r_[OBSERVED, 7.], np.full(5, np.nan)])
+
+    df = goodness_of_fit(simulated, observed)
+
+    assert df.loc[0, 'RMSE'] == np.sqrt(0.5)
+    assert df.loc[1, 'RMSE'] == 0 and df.loc[1, 'NSE'] == 1
+    assert np.isclose(df.loc[1, 'KGE'], 1)
+
+    # a run without a valid value
+    assert df.loc[2].isna().all()
+
+    # a mask leaves out the first two values: errors 1, 0
+    assert rmse(SIMULATED, OBSERVED, mask=[False, False, True, True]) == np.sqrt(0.5)
+
+
+def test_aggregate():
+
+    dates = pd.to_datetime(['2010-01-01', '2010-01-15', '2010-03-01', '2010-03-02', '2010-04-01'])
+    values = np.array([[1., 2., 3., np.nan, np.nan],
+                       [1., 1., 1., 1., 1.]])
+
+    totals, index = aggregate(values, dates)
+
+    # February has no date, April no value
+    assert list(index) == list(pd.to_datetime(['2010-01-01', '2010-02-01', '2010-03-01', '2010-04-01']))
+    np.testing.assert_array_equal(totals, [[3., np.nan, 3., np.nan], [2., np.nan, 2., 1.]])
+
+    means, _ = aggregate(values[1], dates, how='mean')
+    np.testing.assert_array_equal(means, [1., np.nan, 1., 1.])
+
+    totals, index = aggregate(values[1], dates, freq='Y')
+    assert totals.tolist() == [5.] and index[0] == pd.Timestamp('2010-01-01')
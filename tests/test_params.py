@@ -0,0 +1,93 @@
+''' Setting parameters: per palm field, per parameter set and per vector. '''
+
+import copy
+
+import pandas as pd
+import pytest
+
+from palmsim import PalmField, ParameterSet, get_parameters, set_parameters
+from palmsim.components.generative import Female
+
+
+def test_set_parameters_of_the_cohorts():
+
+    settings = {'female': copy.deepcopy(Female.parameters)}
+    settings['female']['stress_bunch_failure']['value'] = 0
+
+    default = Female.parameters['stress_bunch_failure']['value']
+    assert default != 0
+
+    pf = PalmField()
+    set_parameters(pf, settings)
+
+    assert pf.female.parameters['stress_bunch_failure']['value'] == 0
+    assert pf.generative._female_class.parameters['stress_bunch_failure']['value'] == 0
+
+    # the other palm fields keep theirs
+    assert Female.parameters['stress_bunch_failure']['value'] == default
+    assert PalmField().female.parameters['stress_bunch_failure']['value'] == default
+
+
+def test_set_parameters_of_a_parameter_set():
+
+    ps = ParameterSet().with_values({'trunk.specific_maintenance': 0.001})
+    pf = PalmField(parameter_set=ps)
+
+    settings = {'female': copy.deepcopy(get_parameters()['female'])}
+    settings['female']['stress_bunch_failure']['value'] = 0
+
+    set_parameters(pf, settings)
+
+    assert pf.parameter_set.value('female', 'stress_bunch_failure') == 0
+    assert pf.parameter_set.value('trunk', 'specific_maintenance') == 0.001
+    assert pf.trunk.parameters['specific_maintenance']['value'] == 0.001
+    assert ps.value('female', 'stress_bunch_failure') != 0
+
+
+def test_set_parameter_set_same_as_constructed(make_palm_field):
+
+    values = {}
+
+    for prefix in ['trunk', 'roots']:
+        pgrs = get_parameters()[prefix]['potential_growth_rates']['value']
+        values[prefix + '.potential_growth_rates'] = [[x, 2 * y] for (x, y) in pgrs]
+
+    ps = ParameterSet().with_values(values)
+
+    default = make_palm_field()
+
+    rebound = make_palm_field()
+    rebound.set_parameter_set(ps)
+
+    constructed = make_palm_field(parameter_set=ps)
+
+    for pf in [rebound, constructed]:
+        assert pf.trunk._potential_growth_rate_spline.calc(5) == \
+            2 * default.trunk._potential_growth_rate_spline.calc(5)
+
+    result = rebound.run(duration=5 * 365)
+    expected = constructed.run(duration=5 * 365)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_splines_are_set_once(make_palm_field, monkeypatch):
+
+    import palmsim.components.roots as roots
+    import palmsim.components.trunk as trunk
+
+    calls = []
+
+    for module in [roots, trunk]:
+        get_spline = module.get_spline
+        monkeypatch.setattr(module, 'get_spline',
+                            lambda *args, _get=get_spline, **kwargs: calls.append(1) or _get(*args, **kwargs))
+
+    pf = make_palm_field()
+    assert len(calls) == 2
+
+    pf.set_parameter_set(ParameterSet())
+    assert len(calls) == 4
+
+    pf.run(duration=2 * 365)
+    assert len(calls) == 4
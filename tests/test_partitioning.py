@@ -0,0 +1,67 @@
+''' The batch (many runs) versions against the scalar functions, on random inputs. '''
+
+import numpy as np
+import pytest
+
+from palmsim.components.assimilates import (
+    prioritized_partitioning, proportionate_partitioning, parametrized_partitioning,
+    prioritized_partitioning_batch, proportionate_partitioning_batch,
+    parametrized_partitioning_batch)
+
+
+def random_cases(seed, n_cases=200):
+    """ Supplies (N,) and demands (N, sinks) - including ties and shortages. """
+
+    rng = np.random.default_rng(seed)
+
+    for _ in range(n_cases):
+
+        N = rng.integers(1, 20)
+        sinks = rng.integers(1, 7)
+
+        Ds = rng.uniform(0.01, 10, size=(N, sinks))
+        S = rng.uniform(0, 2, size=N) * Ds.sum(axis=1)
+
+        # a supply equal to the first demand
+        S[0] = Ds[0, 0]
+
+        yield S, Ds
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_prioritized(seed):
+
+    for (S, Ds) in random_cases(seed):
+
+        expected = np.array([prioritized_partitioning(s, list(D)) for (s, D) in zip(S, Ds)])
+
+        np.testing.assert_array_equal(prioritized_partitioning_batch(S, Ds), expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_proportionate(seed):
+
+    for (S, Ds) in random_cases(seed):
+
+        expected = np.array([proportionate_partitioning(s, list(D)) for (s, D) in zip(S, Ds)])
+
+        np.testing.assert_array_equal(proportionate_partitioning_batch(S, Ds), expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_parametrized(seed):
+
+    rng = np.random.default_rng(seed)
+
+    for (S, Ds) in random_cases(seed):
+
+        # shared by the runs, and per run
+        for k in [rng.uniform(), rng.uniform(size=len(S))]:
+
+            ks = np.broadcast_to(k, S.shape)
+
+            expected = np.array([parametrized_partitioning(s, list(D), kk)
+                                 for (s, D, kk) in zip(S, Ds, ks)])
+
+            np.testing.assert_array_equal(parametrized_partitioning_batch(S, Ds, k), expected)
+
@@ -0,0 +1,133 @@
+''' The sensitivity analyses on functions with known sensitivities. '''
+
+import os
+
+from math import pi, sin
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from palmsim import ParameterSchema
+from palmsim.params import get_parameter_schema
+from palmsim.sensitivity import (
+    lhoat, sobol, morris, morris_screen, morris_trajectories, _spread_out)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COEFFICIENTS = np.array([4., -2., 1., 0.])
+
+
+def make_schema(lower, upper):
+    """ A schema of len(lower) model parameters, with the bounds given. """
+
+    names = get_parameter_schema().names[:len(lower)]
+
+    schema = ParameterSchema(names=list(names))
+    schema.lower = np.asarray(lower, dtype=float)
+    schema.upper = np.asarray(upper, dtype=float)
+
+    return schema
+
+
+def ishigami(x, a=7, b=0.1):
+    return sin(x[0]) + a * sin(x[1]) ** 2 + b * x[2] ** 4 * sin(x[0])
+
+
+def linear(x):
+    return float(np.dot(COEFFICIENTS, x))
+
+
+def ishigami_indices(a=7, b=0.1):
+    """ The analytic first-order and total indices of the Ishigami function. """
+
+    V1 = 0.5 * (1 + b * pi ** 4 / 5) ** 2
+    V2 = a ** 2 / 8
+    V13 = b ** 2 * pi ** 8 * (1 / 18 - 1 / 50)
+
+    V = V1 + V2 + V13
+
+    return np.array([V1, V2, 0]) / V, np.array([V1 + V13, V2, V13]) / V
+
+
+@pytest.mark.parametrize('matrices', ['saltelli', 'azzini'])
+def test_sobol_ishigami(matrices):
+
+    schema = make_schema([-pi] * 3, [pi] * 3)
+
+    indices = sobol(schema, N=2**13, objective=ishigami, matrices=matrices, R=200, seed=1)
+
+    (Si, Ti) = ishigami_indices()
+
+    estimates = indices.set_index('sensitivity')
+
+    np.testing.assert_allclose(estimates.loc['Si', 'original'], Si, atol=0.03)
+    np.testing.assert_allclose(estimates.loc['Ti', 'original'], Ti, atol=0.03)
+
+    assert (indices['std.error'] > 0).all()
+    assert (indices['low.ci'] <= indices['high.ci']).all()
+
+
+def test_morris_linear():
+
+    schema = make_schema([0] * 4, [1] * 4)
+
+    indices = morris(schema, r=10, objective=linear, R=100, seed=1)
+
+    # the elementary effects of a linear function are its coefficients
+    np.testing.assert_allclose(indices['mu'], COEFFICIENTS, atol=1e-12)
+    np.testing.assert_allclose(indices['mu.star'], np.abs(COEFFICIENTS), atol=1e-12)
+    np.testing.assert_allclose(indices['sigma'], 0, atol=1e-12)
+
+    assert morris_screen(indices, schema) == list(schema.names[:3])
+
+
+def test_spread_out():
+
+    trajectories = morris_trajectories(40, 5, rng=1)
+
+    selected = _spread_out(trajectories, 10)
+
+    assert len(set(selected)) == 10
+
+    def spread(indices):
+        points = trajectories[indices].reshape(-1, 5)
+        return np.sqrt(((points[:, None] - points[None]) ** 2).sum(axis=-1)).sum()
+
+    # more spread out than the first 10
+    assert spread(selected) > spread(np.arange(10))
+
+
+def test_lhoat_ranking(tmp_path):
+
+    schema = make_schema([1] * 4, [2] * 4)
+
+    ranking, effects = lhoat(schema, n_strata=20, objective=linear, seed=1,
+                             drty_out=str(tmp_path))
+
+    # ranked by the magnitude of the coefficients
+    names = ['_'.join(name.split('.', 1)) for name in schema.names]
+    assert ranking['ParameterName'].tolist() == [names[i] for i in [0, 1, 2, 3]]
+    assert ranking['RelativeImportance'].iloc[-1] == 0
+    assert np.isclose(ranking['RelativeImportance.Norm'].sum(), 1)
+
+    # the layout of the (hydroPSO) ranking of the repository
+    with open(os.path.join(ROOT_DIR, 'LH_OAT', 'LH_OAT-Ranking.txt')) as f:
+        expected = f.read().splitlines()
+
+    with open(os.path.join(str(tmp_path), 'LH_OAT-Ranking.txt')) as f:
+        result = f.read().splitlines()
+
+    assert result[0] == expected[0]
+    assert len(result) == 1 + len(schema)
+
+    for line in [result[1], expected[1]]:
+        assert line[:12].strip().isdigit()
+        assert line[11] == ' ' and line[12] != ' '
+        assert line[58] == ' ' and line[59] != ' '
+
+    read = pd.read_csv(os.path.join(str(tmp_path), 'LH_OAT-Ranking.txt'), sep=r'\s+')
+    shipped = pd.read_csv(os.path.join(ROOT_DIR, 'LH_OAT', 'LH_OAT-Ranking.txt'), sep=r'\s+')
+
+    assert list(read.columns) == list(shipped.columns)
+    assert (read.dtypes == shipped.dtypes).all()
@@ -0,0 +1,68 @@
+''' The simulation server, without HTTP. '''
+
+import os
+import signal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from concurrent.futures.process import BrokenProcessPool
+
+from palmsim.calibrate import Site
+from palmsim.server import SimulationServer, read_weather, to_json_values
+
+from conftest import CLIMATE_FILEPATH
+
+SETTINGS = {'year_of_planting': 2008, 'latitude': 3.9, 'soil_depth': 1,
+            'soil_texture_class': 'clay loam', 'dt': 10}
+
+OUTPUTS = ['generative_FFB_production (t/ha/yr)', 'trunk_mass (kg_DM/ha)']
+
+
+@pytest.fixture(scope='module')
+def server():
+
+    site = Site('313', read_weather(CLIMATE_FILEPATH), duration=3 * 365, **SETTINGS)
+
+    server = SimulationServer([site], workers=1)
+
+    yield server
+
+    server.close()
+
+
+def test_known_and_described_sites(server):
+
+    expected = server.sites['313'].make_palm_field().run(duration=3 * 365)[OUTPUTS]
+
+    result = server.run({'site': '313', 'outputs': OUTPUTS})
+    pd.testing.assert_frame_equal(result, expected)
+
+    description = {'weather': CLIMATE_FILEPATH, 'duration': 3 * 365, 'settings': SETTINGS}
+
+    for i in range(2):
+        result = server.run({'site': description, 'outputs': OUTPUTS})
+        pd.testing.assert_frame_equal(result, expected)
+
+    with pytest.raises(KeyError):
+        server.run({'site': 'unknown'})
+
+
+def test_broken_pool_is_replaced(server):
+
+    server.run({'site': '313', 'outputs': OUTPUTS, 'duration': 30})
+
+    for process in list(server._executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+
+    with pytest.raises(BrokenProcessPool):
+        server.run({'site': '313', 'outputs': OUTPUTS, 'duration': 30})
+
+    assert len(server.run({'site': '313', 'outputs': OUTPUTS, 'duration': 30})) > 0
+
+
+def test_json_values():
+
+    assert to_json_values(pd.Series([1.0, np.nan, np.inf])) == [1.0, None, None]
+    assert to_json_values(pd.Series([1, 2])) == [1, 2]
@@ -0,0 +1,40 @@
+''' The soil water balance, stepped per time-step or per day. '''
+
+import pytest
+
+
+def daily_steps(soil, dt):
+    """ dt daily updates of the available water, re-evaluating all the rates. """
+    for _ in range(dt):
+        soil.available_water += soil.available_water_change_rate
+
+
+@pytest.fixture
+def soils(make_palm_field):
+    """ The soil of a palm field that ran for some years, and a copy. """
+
+    pf = make_palm_field(dt=10)
+    pf.run(duration=4 * 365)
+
+    other = make_palm_field(dt=10)
+    other.run(duration=4 * 365)
+
+    return pf.soil, other.soil
+
+
+@pytest.mark.parametrize('available_water', [None, 0.5, 1.01])
+def test_same_as_daily_steps(soils, available_water):
+
+    (soil, expected) = soils
+
+    # from wet (draining) to dry soils
+    if available_water is not None:
+        soil.available_water = expected.available_water = \
+            available_water * soil.water_holding_capacity
+
+    for _ in range(36):
+        soil.update(dt=10)
+        daily_steps(expected, dt=10)
+
+        assert soil.available_water == expected.available_water
+
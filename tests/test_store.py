@@ -0,0 +1,37 @@
+''' The Parquet store writes its parts per chunk of bytes. '''
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_parts_per_chunk_bytes(tmp_path):
+
+    pytest.importorskip('pyarrow')
+
+    from palmsim.store import ParquetStore
+
+    index = pd.date_range('2008-01-01', periods=3650)
+    df = pd.DataFrame(np.random.default_rng(0).random((len(index), 100)), index=index,
+                      columns=['x{:}'.format(i) for i in range(100)])
+
+    # some 3 MB per run
+    store = ParquetStore(str(tmp_path / 'store'), chunk_bytes=5 * 2**20)
+
+    def parts():
+        return [x for x in os.listdir(os.path.join(store.directory, 'results'))
+                if x.endswith('.parquet')]
+
+    store.append('site', 'a', {}, df)
+    assert parts() == []
+
+    store.append('site', 'b', {}, df)
+    assert len(parts()) == 1
+
+    store.append('site', 'c', {}, df)
+    store.close()
+
+    assert len(parts()) == 2
+    assert len(store.read(columns=['x0'])) == 3 * len(df)
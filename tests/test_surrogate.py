@@ -0,0 +1,108 @@
+''' The emulators of the surrogate on functions with known fits. '''
+
+import numpy as np
+import pytest
+
+from palmsim.surrogate import GaussianProcess, PolynomialChaos
+
+
+def smooth(X):
+    return np.sin(3 * X[:, 0]) + X[:, 1] ** 2
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_gp_gradient(seed):
+
+    rng = np.random.default_rng(seed)
+
+    X = rng.uniform(size=(15, 2))
+    y = smooth(X)
+    z = (y - y.mean()) / y.std()
+
+    theta = np.concatenate([rng.uniform(np.log(0.2), np.log(2), size=2), [np.log(1e-2)]])
+
+    gp = GaussianProcess()
+    _, grad = gp._nll(theta, X, z)
+
+    h = 1e-6
+    numeric = np.empty_like(theta)
+
+    for k in range(len(theta)):
+        step = np.zeros_like(theta)
+        step[k] = h
+        numeric[k] = (gp._nll(theta + step, X, z)[0] - gp._nll(theta - step, X, z)[0]) / (2 * h)
+
+    assert np.allclose(grad, numeric, rtol=1e-4, atol=1e-6)
+
+
+def test_gp_interpolates():
+
+    rng = np.random.default_rng(0)
+
+    X = rng.uniform(size=(20, 2))
+    y = smooth(X)
+
+    gp = GaussianProcess(n_restarts=2, seed=0).fit(X, y)
+
+    mean, std = gp.predict(X, return_std=True)
+
+    assert np.allclose(mean, y, atol=1e-3 * y.std())
+    assert np.all(std < 1e-2 * y.std())
+
+    # and in between, close to the smooth function
+    X_test = rng.uniform(size=(50, 2))
+    assert np.allclose(gp.predict(X_test), smooth(X_test), atol=0.05)
+
+
+def test_gp_constant():
+
+    X = np.random.default_rng(0).uniform(size=(5, 2))
+
+    gp = GaussianProcess().fit(X, np.zeros(5))
+
+    mean, std = gp.predict(X, return_std=True)
+
+    assert np.all(mean == 0) and np.all(std == 0)
+
+
+def test_pce_coefficients():
+
+    rng = np.random.default_rng(0)
+
+    pce = PolynomialChaos(degree=3, interaction_order=2, n_bootstrap=10, seed=0)
+    pce.multi_indices = pce._multi_indices(2)
+
+    coefficients = rng.normal(size=len(pce.multi_indices))
+
+    X = rng.uniform(size=(100, 2))
+    y = pce._basis(X) @ coefficients
+
+    pce.fit(X, y)
+
+    assert np.allclose(pce.coefficients, coefficients, atol=1e-6)
+    assert np.allclose(pce.predict(X), y, atol=1e-6)
+
+
+def test_pce_polynomial():
+    """ A polynomial in x (not in the Legendre basis), with its Sobol indices. """
+
+    rng = np.random.default_rng(1)
+
+    X = rng.uniform(size=(200, 2))
+
+    # 1 + 2 z0 + 3 z1^2 with z = 2x - 1: z0 = P1 / sqrt(3), z1^2 = (2 P2 / sqrt(5) + 1) / 3
+    Z = 2 * X - 1
+    y = 1 + 2 * Z[:, 0] + 3 * Z[:, 1] ** 2
+
+    pce = PolynomialChaos(degree=2, interaction_order=1, n_bootstrap=10, seed=0).fit(X, y)
+
+    expected = {(0, 0): 2., (1, 0): 2 / np.sqrt(3), (0, 2): 2 / np.sqrt(5)}
+
+    for (index, c) in zip(map(tuple, pce.multi_indices), pce.coefficients):
+        assert np.isclose(c, expected.get(index, 0.), atol=1e-6)
+
+    Si, Ti = pce.sobol_indices()
+
+    variance = 4 / 3 + 4 / 5
+    assert np.allclose(Si, [4 / 3 / variance, 4 / 5 / variance])
+    assert np.allclose(Ti, Si)